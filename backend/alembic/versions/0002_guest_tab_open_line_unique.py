@@ -0,0 +1,59 @@
+"""Merge duplicate open guest tab lines and make them unique
+
+Revision ID: 0002_guest_tab_open_line_unique
+Revises: 0001_user_search_trgm
+Create Date: 2026-10-19 11:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_guest_tab_open_line_unique"
+down_revision: Union[str, None] = "0001_user_search_trgm"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Offene Positionen je (Gast, Produkt, Preis) auf die älteste Zeile zusammenfassen
+OPEN_LINE_GROUPS = """
+    SELECT id,
+           first_value(id) OVER w AS keep_id,
+           sum(quantity) OVER w AS quantity,
+           sum(total_amount) OVER w AS total_amount
+    FROM guest_tabs
+    WHERE paid = false
+    WINDOW w AS (
+        PARTITION BY guest_id, product_id, price_per_item
+        ORDER BY id
+        ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
+    )
+"""
+
+
+def upgrade() -> None:
+    op.execute(f"""
+        UPDATE guest_tabs AS g
+        SET quantity = grp.quantity, total_amount = grp.total_amount
+        FROM ({OPEN_LINE_GROUPS}) AS grp
+        WHERE g.id = grp.id AND grp.id = grp.keep_id
+    """)
+    op.execute(f"""
+        DELETE FROM guest_tabs AS g
+        USING ({OPEN_LINE_GROUPS}) AS grp
+        WHERE g.id = grp.id AND grp.id <> grp.keep_id
+    """)
+    op.create_index(
+        "uq_guest_tabs_open_line",
+        "guest_tabs",
+        ["guest_id", "product_id", "price_per_item"],
+        unique=True,
+        postgresql_where=sa.text("paid = false"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_guest_tabs_open_line", table_name="guest_tabs")
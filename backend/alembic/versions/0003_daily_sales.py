@@ -0,0 +1,76 @@
+"""daily_sales aggregate table, backfilled from history
+
+Revision ID: 0003_daily_sales
+Revises: 0002_guest_tab_open_line_unique
+Create Date: 2026-10-19 14:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_daily_sales"
+down_revision: Union[str, None] = "0002_guest_tab_open_line_unique"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Entspricht DailySalesService.rebuild() ohne Zeitraum
+BACKFILL = """
+    INSERT INTO daily_sales
+        (sales_date, product_id, category, payment_method, customer_type, quantity, revenue, line_count, updated_at)
+    SELECT timezone(:tz, timezone('UTC', t.created_at))::date, NULL, NULL,
+           coalesce(t.payment_method, 'unknown'), 'member', 0, sum(t.amount), count(*), now()
+    FROM transactions t
+    WHERE t.transaction_type = 'purchase' AND t.status = 'successful'
+      AND t.user_id IS NOT NULL AND t.guest_id IS NULL
+    GROUP BY 1, 4
+    UNION ALL
+    SELECT timezone(:tz, timezone('UTC', t.created_at))::date, gt.product_id, p.category,
+           coalesce(t.payment_method, 'unknown'), 'guest', sum(gt.quantity), sum(gt.total_amount), count(*), now()
+    FROM guest_tabs gt
+    JOIN transactions t ON t.guest_id = gt.guest_id
+        AND t.transaction_type = 'purchase' AND t.status = 'successful'
+    JOIN products p ON p.id = gt.product_id
+    WHERE gt.paid = true
+    GROUP BY 1, 2, 3, 4
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        "daily_sales",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("sales_date", sa.Date(), nullable=False),
+        sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id"), nullable=True),
+        sa.Column(
+            "category",
+            postgresql.ENUM("DRINKS", "SNACKS", "FOOD", "OTHER", name="productcategory", create_type=False),
+            nullable=True,
+        ),
+        sa.Column("payment_method", sa.String(50), nullable=False),
+        sa.Column("customer_type", sa.String(10), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("revenue", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("line_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index(
+        "uq_daily_sales_key",
+        "daily_sales",
+        ["sales_date", "product_id", "category", "payment_method", "customer_type"],
+        unique=True,
+        postgresql_nulls_not_distinct=True,
+    )
+    op.execute(sa.text(BACKFILL).bindparams(tz=settings.TIMEZONE))
+
+
+def downgrade() -> None:
+    op.drop_index("uq_daily_sales_key", table_name="daily_sales")
+    op.drop_table("daily_sales")
@@ -0,0 +1,64 @@
+"""Immutable end-of-day closings (Z-report snapshots)
+
+Revision ID: 0004_daily_closings
+Revises: 0003_daily_sales
+Create Date: 2026-10-19 15:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_daily_closings"
+down_revision: Union[str, None] = "0003_daily_sales"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "daily_closings",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("closing_number", sa.Integer(), nullable=False, unique=True),
+        sa.Column("business_date", sa.Date(), nullable=False, index=True),
+        sa.Column("period_start", sa.DateTime(), nullable=True),
+        sa.Column("period_end", sa.DateTime(), nullable=False),
+        sa.Column("transaction_count", sa.Integer(), nullable=False),
+        sa.Column("sales_total", sa.Float(), nullable=False),
+        sa.Column("member_sales_total", sa.Float(), nullable=False),
+        sa.Column("guest_sales_total", sa.Float(), nullable=False),
+        sa.Column("top_up_total", sa.Float(), nullable=False),
+        sa.Column("open_tabs_count", sa.Integer(), nullable=False),
+        sa.Column("open_tabs_total", sa.Float(), nullable=False),
+        sa.Column("member_credit_total", sa.Float(), nullable=False),
+        sa.Column("member_debt_total", sa.Float(), nullable=False),
+        sa.Column("payments", postgresql.JSONB(), nullable=False),
+        sa.Column("tax_rates", postgresql.JSONB(), nullable=False),
+        sa.Column("note", sa.Text(), nullable=True),
+        sa.Column("created_by_admin_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+
+    # Abschlüsse sind unveränderlich
+    op.execute("""
+        CREATE FUNCTION daily_closings_immutable() RETURNS trigger AS $$
+        BEGIN
+            RAISE EXCEPTION 'daily_closings ist unveränderlich';
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER daily_closings_immutable
+        BEFORE UPDATE OR DELETE ON daily_closings
+        FOR EACH ROW EXECUTE FUNCTION daily_closings_immutable()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER daily_closings_immutable ON daily_closings")
+    op.execute("DROP FUNCTION daily_closings_immutable()")
+    op.drop_table("daily_closings")
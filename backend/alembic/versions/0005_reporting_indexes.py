@@ -0,0 +1,29 @@
+"""Indexes for date-range reports and guest tab joins
+
+Revision ID: 0005_reporting_indexes
+Revises: 0004_daily_closings
+Create Date: 2026-10-19 15:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_reporting_indexes"
+down_revision: Union[str, None] = "0004_daily_closings"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_transactions_created_at", "transactions", ["created_at"])
+    op.create_index("ix_transactions_guest_id", "transactions", ["guest_id"])
+    op.create_index("ix_guest_tabs_guest_id", "guest_tabs", ["guest_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_guest_tabs_guest_id", table_name="guest_tabs")
+    op.drop_index("ix_transactions_guest_id", table_name="transactions")
+    op.drop_index("ix_transactions_created_at", table_name="transactions")
@@ -0,0 +1,40 @@
+"""Per-user balance checkpoints for incremental reconciliation
+
+Revision ID: 0006_balance_checkpoints
+Revises: 0005_reporting_indexes
+Create Date: 2026-10-19 18:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_balance_checkpoints"
+down_revision: Union[str, None] = "0005_reporting_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "balance_checkpoints",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("last_transaction_id", sa.Integer(), nullable=False),
+        sa.Column("balance", sa.Float(), nullable=False),
+        sa.Column("expected_balance", sa.Float(), nullable=False),
+        sa.Column("observed_balance", sa.Float(), nullable=False),
+        sa.Column("drift", sa.Float(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_balance_checkpoints_user_latest", "balance_checkpoints", ["user_id", "id"])
+    op.create_index("ix_balance_checkpoints_created_at", "balance_checkpoints", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_balance_checkpoints_created_at", table_name="balance_checkpoints")
+    op.drop_index("ix_balance_checkpoints_user_latest", table_name="balance_checkpoints")
+    op.drop_table("balance_checkpoints")
@@ -0,0 +1,56 @@
+"""Store all monetary columns as integer cents (BIGINT)
+
+Revision ID: 0007_integer_cents
+Revises: 0006_balance_checkpoints
+Create Date: 2026-10-19 19:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007_integer_cents"
+down_revision: Union[str, None] = "0006_balance_checkpoints"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+MONEY_COLUMNS = {
+    "users": ["balance"],
+    "transactions": ["amount", "balance_before", "balance_after"],
+    "guests": ["total_amount"],
+    "guest_tabs": ["price_per_item", "total_amount"],
+    "purchases": ["unit_price", "total_price", "tax_amount", "balance_before", "balance_after"],
+    "products": ["member_price", "guest_price"],
+    "daily_sales": ["revenue"],
+    "daily_closings": [
+        "sales_total", "member_sales_total", "guest_sales_total", "top_up_total",
+        "open_tabs_total", "member_credit_total", "member_debt_total",
+    ],
+    "balance_checkpoints": ["balance", "expected_balance", "observed_balance", "drift"],
+}
+
+# Beträge in JSONB-Snapshots (daily_closings.payments/tax_rates) bleiben Euro
+
+
+def _alter(table: str, columns: list, type_: str, using: str) -> None:
+    # Alle Spalten in EINEM ALTER TABLE -> Tabelle wird nur einmal umgeschrieben;
+    # Indizes (z.B. uq_guest_tabs_open_line auf price_per_item) werden mit
+    # neu aufgebaut. Row-Trigger (daily_closings unveränderlich) feuern nicht.
+    clauses = ", ".join(
+        f"ALTER COLUMN {column} TYPE {type_} USING {using.format(column=column)}"
+        for column in columns
+    )
+    op.execute(f"ALTER TABLE {table} {clauses}")
+
+
+def upgrade() -> None:
+    for table, columns in MONEY_COLUMNS.items():
+        _alter(table, columns, "BIGINT", "round({column}::numeric * 100)::bigint")
+
+
+def downgrade() -> None:
+    for table, columns in MONEY_COLUMNS.items():
+        _alter(table, columns, "DOUBLE PRECISION", "{column} / 100.0")
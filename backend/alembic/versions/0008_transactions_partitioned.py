@@ -0,0 +1,112 @@
+"""Partition transactions by month on created_at, add transaction_archives
+
+Revision ID: 0008_transactions_partitioned
+Revises: 0007_integer_cents
+Create Date: 2026-10-19 22:00:00
+
+"""
+from datetime import date, datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008_transactions_partitioned"
+down_revision: Union[str, None] = "0007_integer_cents"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+
+FOREIGN_KEYS = {
+    "transactions_user_id_fkey": ("user_id", "users"),
+    "transactions_transfer_to_user_id_fkey": ("transfer_to_user_id", "users"),
+    "transactions_created_by_admin_id_fkey": ("created_by_admin_id", "users"),
+    "transactions_guest_id_fkey": ("guest_id", "guests"),
+}
+
+INDEXES = {
+    "ix_transactions_id": "id",
+    "ix_transactions_transaction_reference": "transaction_reference",
+    "ix_transactions_created_at": "created_at",
+    "ix_transactions_guest_id": "guest_id",
+    "ix_transactions_user_id_created_at": "user_id, created_at",
+}
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _swap_table(create_sql: str, pk_columns: str, unique_reference: bool) -> None:
+    """transactions durch eine neu angelegte Tabelle ersetzen (Daten, Sequenz, FKs, Indizes)"""
+    op.execute("ALTER SEQUENCE transactions_id_seq OWNED BY NONE")
+    op.execute(create_sql)
+    op.execute("INSERT INTO transactions_new SELECT * FROM transactions")
+    op.execute("DROP TABLE transactions")
+    op.execute("ALTER TABLE transactions_new RENAME TO transactions")
+    op.execute("ALTER SEQUENCE transactions_id_seq OWNED BY transactions.id")
+
+    op.execute(f"ALTER TABLE transactions ADD CONSTRAINT transactions_pkey PRIMARY KEY ({pk_columns})")
+    for name, (column, target) in FOREIGN_KEYS.items():
+        op.execute(f"ALTER TABLE transactions ADD CONSTRAINT {name} FOREIGN KEY ({column}) REFERENCES {target}(id)")
+    for name, columns in INDEXES.items():
+        unique = "UNIQUE " if unique_reference and columns == "transaction_reference" else ""
+        op.execute(f"CREATE {unique}INDEX {name} ON transactions ({columns})")
+
+
+def upgrade() -> None:
+    # Partitionsschlüssel gehört in den Primärschlüssel -> NOT NULL
+    op.execute("UPDATE transactions SET created_at = coalesce(completed_at, now() AT TIME ZONE 'UTC') WHERE created_at IS NULL")
+    op.execute("ALTER TABLE transactions ALTER COLUMN created_at SET NOT NULL")
+
+    first = op.get_bind().execute(sa.text("SELECT min(created_at) FROM transactions")).scalar()
+    current = date(datetime.utcnow().year, datetime.utcnow().month, 1)
+    month = date(first.year, first.month, 1) if first else current
+
+    partitions = ["CREATE TABLE transactions_default PARTITION OF transactions_new DEFAULT"]
+    while month <= _add_months(current, MONTHS_AHEAD):
+        end = _add_months(month, 1)
+        partitions.append(
+            f"CREATE TABLE transactions_{month.year:04d}_{month.month:02d} PARTITION OF transactions_new "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{end.isoformat()}')"
+        )
+        month = end
+
+    _swap_table(
+        "CREATE TABLE transactions_new (LIKE transactions INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        "PARTITION BY RANGE (created_at);\n" + ";\n".join(partitions),
+        "id, created_at",
+        unique_reference=False,
+    )
+
+    op.create_table(
+        "transaction_archives",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("partition_name", sa.String(63), nullable=False, unique=True),
+        sa.Column("range_start", sa.DateTime(), nullable=False),
+        sa.Column("range_end", sa.DateTime(), nullable=False),
+        sa.Column("file_path", sa.String(500), nullable=False),
+        sa.Column("row_count", sa.Integer(), nullable=False),
+        sa.Column("amount_total", sa.BigInteger(), nullable=False),
+        sa.Column("max_transaction_id", sa.Integer()),
+        sa.Column("archived_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_transaction_archives_range_end", "transaction_archives", ["range_end"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_transaction_archives_range_end", table_name="transaction_archives")
+    op.drop_table("transaction_archives")
+
+    # Archivierte Monate sind nicht mehr in der DB - vorher wiederherstellen
+    _swap_table(
+        "CREATE TABLE transactions_new (LIKE transactions INCLUDING DEFAULTS INCLUDING CONSTRAINTS)",
+        "id",
+        unique_reference=True,
+    )
+    op.execute("DROP INDEX ix_transactions_user_id_created_at")
+    op.execute("ALTER TABLE transactions ALTER COLUMN created_at DROP NOT NULL")
@@ -0,0 +1,29 @@
+"""Track archived purchases per month in transaction_archives
+
+Revision ID: 0009_cold_archive
+Revises: 0008_transactions_partitioned
+Create Date: 2026-10-19 23:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009_cold_archive"
+down_revision: Union[str, None] = "0008_transactions_partitioned"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "transaction_archives",
+        sa.Column("purchase_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("transaction_archives", "purchase_count")
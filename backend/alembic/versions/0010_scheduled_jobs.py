@@ -0,0 +1,39 @@
+"""Run statistics for the in-app job scheduler
+
+Revision ID: 0010_scheduled_jobs
+Revises: 0009_cold_archive
+Create Date: 2026-10-20 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010_scheduled_jobs"
+down_revision: Union[str, None] = "0009_cold_archive"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "scheduled_jobs",
+        sa.Column("name", sa.String(50), primary_key=True),
+        sa.Column("last_started_at", sa.DateTime()),
+        sa.Column("last_finished_at", sa.DateTime()),
+        sa.Column("last_status", sa.String(20)),
+        sa.Column("last_error", sa.Text()),
+        sa.Column("last_result", sa.Text()),
+        sa.Column("runs", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("failures", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_duration_ms", sa.Float()),
+        sa.Column("total_duration_ms", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("max_duration_ms", sa.Float(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("scheduled_jobs")
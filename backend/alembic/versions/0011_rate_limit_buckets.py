@@ -0,0 +1,31 @@
+"""Shared token buckets for outbound API rate limiting
+
+Revision ID: 0011_rate_limit_buckets
+Revises: 0010_scheduled_jobs
+Create Date: 2026-10-20 14:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0011_rate_limit_buckets"
+down_revision: Union[str, None] = "0010_scheduled_jobs"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "rate_limit_buckets",
+        sa.Column("name", sa.String(50), primary_key=True),
+        sa.Column("tokens", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("rate_limit_buckets")
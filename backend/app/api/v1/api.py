@@ -2,7 +2,7 @@
 API Router Aggregation
 """
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, members, products, sumup, transactions, guests, users, health
+from app.api.v1.endpoints import auth, members, products, sumup, transactions, guests, users, health, system, reports
 
 api_router = APIRouter()
 
@@ -14,3 +14,5 @@ api_router.include_router(transactions.router, prefix="/transactions", tags=["tr
 api_router.include_router(guests.router, prefix="/guests", tags=["guests"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(health.router, prefix="/health", tags=["health"])  # NEU
+api_router.include_router(system.router, prefix="/system", tags=["system"])
+api_router.include_router(reports.router, prefix="/reports", tags=["reports"])
@@ -1,13 +1,13 @@
 """
 Auth Endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 from pydantic import BaseModel
 import random  # NEU
-from sqlalchemy import select, or_
-from app.db.session import get_db
+from sqlalchemy import case, select, or_, update
+from app.db.session import get_db, AsyncSessionLocal
 from app.services.auth_service import AuthService
 from app.core.security import create_token_pair, get_current_user, SecurityService
 from app.schemas.user import LoginRequest, RFIDLoginRequest, Token
@@ -34,22 +34,33 @@ async def login(
     user.last_login = datetime.utcnow()
     await db.commit()
     
-    return create_token_pair(user.id)
+    return create_token_pair(user.id, is_admin=user.is_admin)
+
+
+async def _touch_last_login(user_id: int) -> None:
+    """Setzt last_login nach dem Response (eigene Session)"""
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(last_login=datetime.utcnow())
+        )
+        await db.commit()
 
 
 @router.post("/login/rfid", response_model=Token)
 async def login_rfid(
     credentials: RFIDLoginRequest,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db)
 ):
-    """Login mit RFID-Token"""
+    """Login mit RFID-Token (Index-Lookup, last_login nach dem Response)"""
     auth_service = AuthService(db)
-    user = await auth_service.authenticate_rfid(credentials.rfid_token)
+    user_id = await auth_service.resolve_rfid(credentials.rfid_token)
     
-    user.last_login = datetime.utcnow()
-    await db.commit()
+    background_tasks.add_task(_touch_last_login, user_id)
     
-    return create_token_pair(user.id)
+    return create_token_pair(user_id)
 
 
 class PasswordChangeRequest(BaseModel):
@@ -202,35 +213,48 @@ async def verify_password_reset(
 # SHORT-LIVED TOKEN SYSTEM FÜR USER SEARCH
 # ============================================
 
-import secrets
-from datetime import datetime, timedelta
-from typing import Optional
+import hashlib
+import hmac
+import time
+from app.core.config import settings
 
 class SearchTokenManager:
-    """Verwaltet short-lived tokens für User-Search"""
-    def __init__(self, validity_minutes: int = 5):
-        self.validity_minutes = validity_minutes
-        self.current_token: Optional[str] = None
-        self.token_expires_at: Optional[datetime] = None
-        self._generate_token()
+    """
+    Stateless Search-Tokens: HMAC über das aktuelle Zeitfenster mit einem
+    aus SECRET_KEY abgeleiteten Schlüssel. Jeder Worker berechnet denselben
+    Token, Validierung braucht keinen geteilten Zustand (O(1)).
+    """
+    def __init__(self, validity_minutes: int = 5, grace_windows: int = 1):
+        self.window_seconds = validity_minutes * 60
+        self.grace_windows = grace_windows
+        self._key = hashlib.sha256(f"search-token:{settings.SECRET_KEY}".encode()).digest()
+    
+    def _window(self, now: float) -> int:
+        return int(now // self.window_seconds)
     
-    def _generate_token(self):
-        """Generiert neuen Token"""
-        self.current_token = secrets.token_urlsafe(32)
-        self.token_expires_at = datetime.now() + timedelta(minutes=self.validity_minutes)
+    def _token_for_window(self, window: int) -> str:
+        return hmac.new(self._key, str(window).encode(), hashlib.sha256).hexdigest()
     
     def get_token(self) -> str:
-        """Gibt aktuellen Token zurück, rotiert wenn abgelaufen"""
-        if datetime.now() >= self.token_expires_at:
-            self._generate_token()
-        return self.current_token
+        """Gibt Token des aktuellen Zeitfensters zurück"""
+        return self._token_for_window(self._window(time.time()))
+    
+    def expires_in_seconds(self) -> int:
+        """Restlaufzeit eines jetzt ausgegebenen Tokens (inkl. Grace-Fenster)"""
+        now = time.time()
+        window_end = (self._window(now) + 1 + self.grace_windows) * self.window_seconds
+        return int(window_end - now)
     
     def validate_token(self, token: str) -> bool:
-        """Prüft ob Token gültig ist"""
-        if datetime.now() >= self.token_expires_at:
-            self._generate_token()
-            return False
-        return token == self.current_token
+        """Prüft Token gegen aktuelles und die Grace-Fenster davor"""
+        current = self._window(time.time())
+        # Als Bytes vergleichen - compare_digest lehnt str mit Nicht-ASCII
+        # ab (TypeError -> 500 statt 401); Header kommen als latin-1
+        candidate = token.encode()
+        return any(
+            hmac.compare_digest(candidate, self._token_for_window(current - offset).encode())
+            for offset in range(self.grace_windows + 1)
+        )
 
 # Globale Token-Manager Instanz
 search_token_manager = SearchTokenManager(validity_minutes=5)
@@ -240,11 +264,11 @@ search_token_manager = SearchTokenManager(validity_minutes=5)
 async def get_search_token():
     """
     Public Endpoint: Gibt aktuellen Search-Token zurück
-    Token ist 5 Minuten gültig und rotiert automatisch
+    Token rotiert alle 5 Minuten und ist auf allen Workern gültig
     """
     return {
         "token": search_token_manager.get_token(),
-        "expires_in_seconds": 300
+        "expires_in_seconds": search_token_manager.expires_in_seconds()
     }
 
 
@@ -278,26 +302,31 @@ async def search_users_for_login(
             detail="Ungültiger oder abgelaufener Token"
         )
     
-    # Query validieren
-    if not q or len(q.strip()) < 2:
+    # Query validieren - Trigram-Indizes greifen erst ab 3 Zeichen,
+    # kürzere Muster wären ein Full Scan
+    if not q or len(q.strip()) < 3:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Suchbegriff muss mindestens 2 Zeichen haben"
+            detail="Suchbegriff muss mindestens 3 Zeichen haben"
         )
     
-    # Suche durchführen
-    search_term = f"%{q.strip().lower()}%"
+    # Suche durchführen (Trigram-GIN-Indizes, Präfix-Treffer zuerst)
+    term = q.strip().lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    contains_term = f"%{term}%"
+    prefix_term = f"{term}%"
+    search_columns = (User.first_name, User.last_name, User.username)
+    prefix_match = or_(*(column.ilike(prefix_term, escape="\\") for column in search_columns))
     result = await db.execute(
         select(User)
         .where(
             User.is_active == True,
-            or_(
-                User.first_name.ilike(search_term),
-                User.last_name.ilike(search_term),
-                User.username.ilike(search_term)
-            )
+            or_(*(column.ilike(contains_term, escape="\\") for column in search_columns))
+        )
+        .order_by(
+            case((prefix_match, 0), else_=1),
+            User.last_name,
+            User.first_name
         )
-        .order_by(User.last_name, User.first_name)
         .limit(10)
     )
     users = result.scalars().all()
@@ -8,6 +8,8 @@ from datetime import datetime
 from typing import List
 
 from app.db.session import get_db
+from app.core.money import to_cents, to_euros
+from app.db.writes import insert_returning, update_returning
 from app.core.security import get_current_user, get_current_admin_user, get_current_user_optional
 from app.models.user import User
 from app.models.guest import Guest
@@ -21,6 +23,9 @@ from app.schemas.guest import (
     GuestCloseTabRequest,
     GuestTabItemResponse,
 )
+from app.schemas.guest_tab import GuestTabItemsAdd
+from app.services.daily_sales_service import DailySalesService
+from app.services.guest_tab_service import GuestTabService
 
 router = APIRouter()
 
@@ -144,14 +149,13 @@ async def create_guest(
     """
     Neuen Gast anlegen
     """
-    guest = Guest(
+    guest = await insert_returning(
+        db,
+        Guest,
         name=guest_data.name,
         total_amount=0.0,
     )
-    
-    db.add(guest)
     await db.commit()
-    await db.refresh(guest)
     
     return GuestResponse(
         id=guest.id,
@@ -173,29 +177,36 @@ async def update_guest(
     """
     Gast-Daten aktualisieren (nur wenn noch aktiv)
     """
-    result = await db.execute(
-        select(Guest).where(Guest.id == guest_id)
-    )
-    guest = result.scalar_one_or_none()
-    
-    if not guest:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Gast nicht gefunden"
+    guest = None
+    if guest_data.name is not None:
+        # Nur aktive Gäste können bearbeitet werden (closed_at im WHERE)
+        guest = await update_returning(
+            db,
+            Guest,
+            Guest.id == guest_id,
+            Guest.closed_at.is_(None),
+            name=guest_data.name,
         )
     
-    # Nur aktive Gäste können bearbeitet werden
-    if not guest.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Gast ist bereits abgerechnet und kann nicht bearbeitet werden"
+    if guest is None:
+        result = await db.execute(
+            select(Guest).where(Guest.id == guest_id)
         )
-    
-    if guest_data.name is not None:
-        guest.name = guest_data.name
+        guest = result.scalar_one_or_none()
+        
+        if not guest:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Gast nicht gefunden"
+            )
+        
+        if not guest.is_active:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Gast ist bereits abgerechnet und kann nicht bearbeitet werden"
+            )
     
     await db.commit()
-    await db.refresh(guest)
     
     return GuestResponse(
         id=guest.id,
@@ -216,57 +227,32 @@ async def add_item_to_tab(
 ):
     """
     Artikel zum Gast-Tab hinzufügen
+
+    Gleiche offene Positionen werden zusammengeführt (Menge erhöht).
     """
-    # Get guest
-    result = await db.execute(
-        select(Guest).where(Guest.id == guest_id)
-    )
-    guest = result.scalar_one_or_none()
-    
-    if not guest:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Gast nicht gefunden"
-        )
-    
-    if not guest.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Gast-Tab ist bereits geschlossen"
-        )
-    
-    # Get product
-    result = await db.execute(
-        select(Product).where(Product.id == product_id)
-    )
-    product = result.scalar_one_or_none()
-    
-    if not product:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Produkt nicht gefunden"
-        )
-    
-    # Create tab item
-    price_per_item = product.guest_price
-    total_amount = price_per_item * quantity
-    
-    tab_item = GuestTab(
-        guest_id=guest.id,
-        product_id=product.id,
-        quantity=quantity,
-        price_per_item=price_per_item,
-        total_amount=total_amount,
+    total, _ = await GuestTabService(db).add_items(guest_id, [(product_id, quantity)])
+    await db.commit()
+
+    return {"message": "Artikel zum Tab hinzugefügt", "total": total}
+
+
+@router.post("/{guest_id}/add-items")
+async def add_items_to_tab(
+    guest_id: int,
+    request: GuestTabItemsAdd,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Mehrere Artikel in einem Schritt zum Gast-Tab hinzufügen
+
+    Alle Artikel werden in einem Statement gebucht - entweder alle oder keiner.
+    """
+    total, lines = await GuestTabService(db).add_items(
+        guest_id, [(item.product_id, item.quantity) for item in request.items]
     )
-    
-    db.add(tab_item)
-    
-    # Update guest total
-    guest.total_amount += total_amount
-    
     await db.commit()
-    
-    return {"message": "Artikel zum Tab hinzugefügt", "total": guest.total_amount}
+
+    return {"message": "Artikel zum Tab hinzugefügt", "total": total, "items_added": lines}
 
 
 @router.post("/{guest_id}/close-tab")
@@ -278,10 +264,15 @@ async def close_guest_tab(
 ):
     """
     Gast-Tab schließen und Transaktion erstellen
+
+    Die Gast-Zeile bleibt bis zum Commit gesperrt (FOR UPDATE) - dieselbe
+    Sperre nimmt GuestTabService.add_items über sein UPDATE auf guests.
+    Parallel gebuchte Artikel landen so entweder vollständig auf dieser
+    Rechnung oder werden danach abgewiesen (Tab geschlossen).
     """
     # Get guest with tab items
     result = await db.execute(
-        select(Guest).where(Guest.id == guest_id)
+        select(Guest).where(Guest.id == guest_id).with_for_update()
     )
     guest = result.scalar_one_or_none()
     
@@ -315,10 +306,11 @@ async def close_guest_tab(
         )
     
     # Calculate total
-    total = sum(item.total_amount for item in unpaid_items)
+    total = to_euros(sum(to_cents(item.total_amount) for item in unpaid_items))
     
     # Create transaction
     from uuid import uuid4
+    paid_at = datetime.utcnow()
     transaction = Transaction(
         transaction_reference=f"GUEST-{uuid4().hex[:12].upper()}",
         user_id=None,
@@ -329,11 +321,15 @@ async def close_guest_tab(
         payment_method=close_data.payment_method,
         description=f"Gast-Rechnung: {guest.name}",
         created_by_admin_id=current_user.id if current_user else None,
-        completed_at=datetime.utcnow(),
+        created_at=paid_at,
+        completed_at=paid_at,
     )
     
     db.add(transaction)
     
+    # Tagesumsatz buchen (liest die noch offenen Positionen)
+    await DailySalesService(db).record_guest_tab(guest.id, close_data.payment_method, paid_at)
+    
     # Mark all items as paid
     for item in unpaid_items:
         item.paid = True
@@ -4,10 +4,15 @@ Health Check Endpoint - Service Monitoring
 - Internet-Verfügbarkeit
 - SumUp API Status
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 import httpx
 from pydantic import BaseModel
 from typing import Literal
+from app.core.config import settings
+from app.core.security import get_current_admin_user
+from app.db.session import engine, replica_engine, replica_health, pool_limits, pool_status
+from app.models.user import User
+from app.services.sumup_service import PRIORITY_READER, SumUpUnavailable, sumup_request
 
 router = APIRouter()
 
@@ -36,23 +41,28 @@ async def check_internet() -> bool:
 
 async def check_sumup() -> tuple[str, str]:
     """
-    Prüft SumUp API Status
-    Aktuell Mock-Modus bis API Keys konfiguriert sind
-    
-    TODO: Wenn API Keys verfügbar sind, echten Check implementieren:
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            "https://api.sumup.com/v0.1/me",
-            headers={"Authorization": f"Bearer {SUMUP_API_KEY}"},
-            timeout=5.0
-        )
-        if response.status_code == 200:
-            return "ok", "SumUp API erreichbar"
-        else:
-            return "error", f"SumUp API Fehler: {response.status_code}"
+    Prüft SumUp API Status (GET /me mit dem konfigurierten Key)
+
+    Ohne API Key bleibt es beim Mock-Status. SUMUP_API_BASE_URL darf auf
+    den lokalen Simulator zeigen (simulators/sumup_api.py).
     """
-    # Mock-Status bis Keys konfiguriert sind
-    return "mock", "SumUp Mock-Modus"
+    if settings.SUMUP_API_KEY in ("", "your_api_key_here"):
+        return "mock", "SumUp Mock-Modus (kein API Key)"
+
+    try:
+        response = await sumup_request(
+            "GET",
+            f"{settings.SUMUP_API_BASE_URL}/me",
+            headers={"Authorization": f"Bearer {settings.SUMUP_API_KEY}"},
+            deadline=5.0,
+            idempotent=False,
+            priority=PRIORITY_READER,
+        )
+    except SumUpUnavailable as e:
+        return "error", f"SumUp API nicht erreichbar: {e}"
+    if response.status_code == 200:
+        return "ok", "SumUp API erreichbar"
+    return "error", f"SumUp API Fehler: {response.status_code}"
 
 
 @router.get("/", response_model=HealthStatus)
@@ -81,3 +91,31 @@ async def health_check():
         sumup=sumup_status,
         sumup_message=sumup_message,
     )
+
+
+@router.get("/db")
+async def database_health(
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    DB-Pool Metriken dieses Workers (Admin only)
+    
+    Pool-Auslastung, Checkout-Wartezeiten (Histogramm) und Replica-Status.
+    Hohe Wartezeiten zeigen, dass das Verbindungsbudget zu knapp ist.
+    """
+    pool_size, max_overflow = pool_limits()
+    replica = replica_health.status()
+    if replica_engine is not None:
+        replica["pool"] = pool_status(replica_engine)
+    
+    return {
+        "budget": {
+            "total_connections": settings.DB_CONNECTION_BUDGET,
+            "workers": settings.WORKERS,
+            "pool_size_per_worker": pool_size,
+            "max_overflow_per_worker": max_overflow,
+            "pgbouncer_mode": settings.DB_PGBOUNCER_MODE,
+        },
+        "primary": pool_status(engine),
+        "replica": replica,
+    }
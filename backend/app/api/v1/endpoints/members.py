@@ -4,7 +4,7 @@ Member Endpoints
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.db.session import get_db, get_db_replica
 from app.core.security import get_current_active_user
 from app.models.user import User
 from app.services.member_service import MemberService
@@ -37,7 +37,7 @@ async def get_balance(
 async def get_transactions(
     limit: int = 50,
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db_replica)
 ):
     """Transaktionshistorie"""
     service = MemberService(db)
@@ -49,7 +49,7 @@ async def get_transactions(
 async def get_purchases(
     limit: int = 50,
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db_replica)
 ):
     """Kaufhistorie"""
     service = MemberService(db)
@@ -5,6 +5,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.db.session import get_db
+from app.db.writes import insert_returning
 from app.services.product_service import ProductService
 from app.schemas.product import ProductResponse, ProductCreate, ProductUpdate
 from app.models.products import ProductCategory, Product
@@ -49,7 +50,9 @@ async def create_product(
     Neues Produkt erstellen (Admin only)
     """
     # Create product
-    product = Product(
+    product = await insert_returning(
+        db,
+        Product,
         name=product_data.name,
         description=product_data.description,
         category=product_data.category,
@@ -62,10 +65,7 @@ async def create_product(
         is_available=product_data.is_available if product_data.is_available is not None else True,
         sort_order=product_data.sort_order or 0,
     )
-    
-    db.add(product)
     await db.commit()
-    await db.refresh(product)
     
     return product
 
@@ -0,0 +1,347 @@
+"""
+Report Endpoints (Admin only)
+"""
+import time
+from datetime import datetime, timedelta
+from datetime import date as date_type
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.money import round_euros
+from app.core.security import get_current_admin_user
+from app.db.session import get_db, get_db_replica, reporting_sessionmaker
+from app.models.closing import DailyClosing
+from app.models.daily_sales import DailySales
+from app.models.products import Product
+from app.models.user import User
+from app.schemas.report import (
+    BalanceReconciliationReport,
+    DailyClosingCreate,
+    DailyClosingResponse,
+    DailySalesDay,
+    DailySalesLine,
+    DailySalesRebuild,
+    DailySalesReport,
+    PivotReport,
+    TaxReport,
+)
+from app.services.analytics_cube import DIMENSIONS, MEASURES, PERCENTILE_MEASURE, analytics_cube
+from app.services.balance_reconciliation_service import BalanceReconciliationService
+from app.services.closing_service import ClosingService, render_closing_pdf
+from app.services.daily_sales_service import DailySalesService, local_sales_date
+from app.services.tax_report_service import TaxReportService
+
+router = APIRouter()
+
+
+@router.get("/daily", response_model=DailySalesReport)
+async def get_daily_sales(
+    date_from: Optional[date_type] = None,
+    date_to: Optional[date_type] = None,
+    db: AsyncSession = Depends(get_db_replica),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Tagesumsätze aus dem daily_sales Aggregat (Standard: letzte 7 Tage)
+    """
+    date_to = date_to or local_sales_date(datetime.utcnow())
+    date_from = date_from or date_to - timedelta(days=6)
+
+    if date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_from muss vor date_to liegen"
+        )
+
+    result = await db.execute(
+        select(DailySales, Product.name)
+        .outerjoin(Product, Product.id == DailySales.product_id)
+        .where(DailySales.sales_date.between(date_from, date_to))
+        .order_by(DailySales.sales_date, DailySales.customer_type, Product.name)
+    )
+
+    days = {}
+    for row, product_name in result.all():
+        day = days.get(row.sales_date)
+        if day is None:
+            day = days[row.sales_date] = DailySalesDay(
+                sales_date=row.sales_date,
+                revenue=0.0,
+                quantity=0,
+                by_payment_method={},
+                by_customer_type={},
+                lines=[],
+            )
+        # Cent-genau aufsummieren (Float-Addition würde driften)
+        day.revenue = round_euros(day.revenue + row.revenue)
+        day.quantity += row.quantity
+        day.by_payment_method[row.payment_method] = round_euros(day.by_payment_method.get(row.payment_method, 0.0) + row.revenue)
+        day.by_customer_type[row.customer_type] = round_euros(day.by_customer_type.get(row.customer_type, 0.0) + row.revenue)
+        day.lines.append(DailySalesLine(
+            product_id=row.product_id,
+            product_name=product_name,
+            category=row.category,
+            payment_method=row.payment_method,
+            customer_type=row.customer_type,
+            quantity=row.quantity,
+            revenue=row.revenue,
+            line_count=row.line_count,
+        ))
+
+    return DailySalesReport(
+        date_from=date_from,
+        date_to=date_to,
+        revenue=round_euros(sum(day.revenue for day in days.values())),
+        quantity=sum(day.quantity for day in days.values()),
+        days=list(days.values()),
+    )
+
+
+@router.post("/daily/rebuild")
+async def rebuild_daily_sales(
+    request: DailySalesRebuild,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    daily_sales für einen Zeitraum (oder komplett) aus der Historie neu aufbauen
+    """
+    rows = await DailySalesService(db).rebuild(request.date_from, request.date_to)
+    await db.commit()
+
+    return {"message": "Tagesumsätze neu aufgebaut", "rows": rows}
+
+
+@router.post("/closings", response_model=DailyClosingResponse, status_code=status.HTTP_201_CREATED)
+async def create_closing(
+    request: DailyClosingCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Tagesabschluss (Z-Bon) seit dem letzten Abschluss erstellen
+    """
+    closing = await ClosingService(db).create_closing(
+        current_user.id,
+        business_date=request.business_date,
+        note=request.note,
+    )
+    await db.commit()
+
+    return closing
+
+
+@router.get("/closings", response_model=List[DailyClosingResponse])
+async def get_closings(
+    skip: int = 0,
+    limit: int = 50,
+    db: AsyncSession = Depends(get_db_replica),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Gespeicherte Tagesabschlüsse, neueste zuerst
+    """
+    result = await db.execute(
+        select(DailyClosing)
+        .order_by(DailyClosing.closing_number.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+
+async def _get_closing(db: AsyncSession, closing_id: int) -> DailyClosing:
+    result = await db.execute(
+        select(DailyClosing).where(DailyClosing.id == closing_id)
+    )
+    closing = result.scalar_one_or_none()
+
+    if not closing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tagesabschluss nicht gefunden"
+        )
+    return closing
+
+
+@router.get("/closings/{closing_id}", response_model=DailyClosingResponse)
+async def get_closing(
+    closing_id: int,
+    db: AsyncSession = Depends(get_db_replica),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Einzelner Tagesabschluss
+    """
+    return await _get_closing(db, closing_id)
+
+
+@router.get("/closings/{closing_id}/pdf")
+async def get_closing_pdf(
+    closing_id: int,
+    db: AsyncSession = Depends(get_db_replica),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Tagesabschluss als PDF (aus dem Snapshot, ohne Neuberechnung)
+    """
+    closing = await _get_closing(db, closing_id)
+    content = await run_in_threadpool(render_closing_pdf, closing)
+
+    return Response(
+        content=content,
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": f"attachment; filename=z-bon_{closing.closing_number}_{closing.business_date.strftime('%Y%m%d')}.pdf"
+        }
+    )
+
+
+def _tax_period(date_from: Optional[date_type], date_to: Optional[date_type]):
+    """Standard: laufendes Jahr bis heute"""
+    date_to = date_to or local_sales_date(datetime.utcnow())
+    date_from = date_from or date_to.replace(month=1, day=1)
+
+    if date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_from muss vor date_to liegen"
+        )
+    return date_from, date_to
+
+
+@router.get("/tax", response_model=TaxReport)
+async def get_tax_report(
+    date_from: Optional[date_type] = None,
+    date_to: Optional[date_type] = None,
+    period: Literal["day", "month", "quarter", "year"] = "month",
+    db: AsyncSession = Depends(get_db_replica),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Netto/MwSt/Brutto je Steuersatz und Zeitraum
+    """
+    date_from, date_to = _tax_period(date_from, date_to)
+    lines = await TaxReportService(db).tax_breakdown(date_from, date_to, period)
+
+    return TaxReport(date_from=date_from, date_to=date_to, period=period, lines=lines)
+
+
+@router.get("/tax/datev")
+async def export_datev(
+    date_from: Optional[date_type] = None,
+    date_to: Optional[date_type] = None,
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    DATEV-Buchungsstapel als CSV-Stream
+    """
+    date_from, date_to = _tax_period(date_from, date_to)
+    sessionmaker = await reporting_sessionmaker()
+    # 409 noch als normale Antwort, nicht erst mitten im Stream
+    async with sessionmaker() as db:
+        await TaxReportService(db).ensure_not_archived(date_from)
+
+    async def content():
+        # Eigene Session: Request-Dependencies sind beim Streamen schon beendet
+        async with sessionmaker() as db:
+            async for chunk in TaxReportService(db).datev_csv(date_from, date_to):
+                yield chunk
+
+    return StreamingResponse(
+        content(),
+        headers={
+            "Content-Type": "text/csv; charset=windows-1252",
+            "Content-Disposition": f"attachment; filename=datev_{date_from.strftime('%Y%m%d')}_{date_to.strftime('%Y%m%d')}.csv"
+        }
+    )
+
+
+@router.get("/pivot", response_model=PivotReport)
+async def get_pivot(
+    rows: str,
+    columns: Optional[str] = None,
+    measure: str = "sum",
+    date_from: Optional[date_type] = None,
+    date_to: Optional[date_type] = None,
+    db: AsyncSession = Depends(get_db_replica),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Kreuztabelle über die Verkaufszeilen aus dem In-Memory-Würfel
+
+    Dimensionen: hour, weekday, day, month, product, category,
+    customer_type, payment_method. Kennzahlen: sum, count, quantity,
+    avg oder Perzentil des Zeilenbetrags (p50, p90, ...).
+    """
+    for dimension in (rows, columns):
+        if dimension is not None and dimension not in DIMENSIONS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unbekannte Dimension: {dimension}"
+            )
+    if measure not in MEASURES and not PERCENTILE_MEASURE.match(measure):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unbekannte Kennzahl: {measure}"
+        )
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_from muss vor date_to liegen"
+        )
+
+    await analytics_cube.ensure_fresh(db)
+
+    started = time.perf_counter()
+    pivot = await run_in_threadpool(
+        analytics_cube.pivot, rows, columns, measure, date_from, date_to
+    )
+
+    return PivotReport(
+        **pivot,
+        measure=measure,
+        refreshed_at=analytics_cube.refreshed_at,
+        duration_ms=round((time.perf_counter() - started) * 1000, 2),
+    )
+
+
+@router.post("/reconciliation", response_model=BalanceReconciliationReport)
+async def run_balance_reconciliation(
+    accept_drift: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Guthaben aller Mitglieder gegen die Transaktions-Historie abgleichen
+
+    Schreibt neue Checkpoints; gelesen werden nur Transaktionen seit dem
+    letzten Lauf. accept_drift=true übernimmt gefundene Abweichungen als
+    neue Basis (einmalig nach Prüfung, z.B. für Alt-Salden).
+    """
+    service = BalanceReconciliationService(db)
+    run = await service.reconcile(accept_drift=accept_drift)
+    drifts = await service.drifts(run["checked_at"])
+    await db.commit()
+
+    return BalanceReconciliationReport(**run, drifts=drifts)
+
+
+@router.get("/reconciliation", response_model=BalanceReconciliationReport)
+async def get_balance_reconciliation(
+    db: AsyncSession = Depends(get_db_replica),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Abweichungen aus dem letzten Abgleich-Lauf
+    """
+    service = BalanceReconciliationService(db)
+    checked_at = await service.latest_run()
+    drifts = await service.drifts(checked_at) if checked_at else []
+
+    return BalanceReconciliationReport(checked_at=checked_at, drifts=drifts)
@@ -1,13 +1,14 @@
 """
 SumUp Endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 
 from app.db.session import get_db
 from app.core.security import get_current_active_user, get_current_admin_user
 from app.models.user import User
+from app.services.qr_code import MEDIA_TYPES, qr_code_cache
 from app.services.sumup_service import SumUpService
 
 router = APIRouter()
@@ -51,6 +52,29 @@ async def get_transaction_status(
     return status
 
 
+@router.get("/checkouts/{checkout_id}/qr")
+async def get_payment_link_qr(
+    checkout_id: str,
+    request: Request,
+    format: str = Query("svg", pattern="^(svg|png)$"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    QR-Code eines Payment Links (für <img src>, daher ohne Login)
+
+    Die Checkout-ID ist nicht erratbar; das Bild hängt nur von ihr ab und
+    darf vom Browser dauerhaft gecacht werden.
+    """
+    sumup = SumUpService(db)
+    etag = qr_code_cache.etag(sumup.payment_url(checkout_id), format)
+    headers = {"Cache-Control": "public, max-age=86400, immutable", "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    image = await sumup.get_payment_link_qr(checkout_id, format)
+    return Response(content=image, media_type=MEDIA_TYPES[format], headers=headers)
+
+
 @router.post("/reader/pair")
 async def pair_reader(
     request: PairReaderRequest,
@@ -0,0 +1,280 @@
+"""
+System Endpoints - Wartungsmodus, Transaktions-Partitionen, Hintergrund-Tasks
+"""
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.maintenance import maintenance_state, publish_maintenance
+from app.core.scheduler import scheduler
+from app.core.tasks import task_manager
+from app.core.security import get_current_admin_user
+from app.db.session import get_db
+from app.db.writes import update_returning
+from app.models.settings import SystemSettings
+from app.models.user import User
+from app.services.partition_service import PartitionService
+from app.services.sumup_service import poll_metrics, sumup_breaker, sumup_rate_limiter
+
+router = APIRouter()
+
+
+class MaintenanceStatus(BaseModel):
+    maintenance_mode: bool
+    maintenance_message: Optional[str] = None
+
+
+class TaskStats(BaseModel):
+    accepting: bool
+    active: int
+    types: Dict[str, Dict[str, Any]]
+
+
+class JobInfo(BaseModel):
+    name: str
+    description: str
+    schedule: str
+    next_run: datetime
+    last_started_at: Optional[datetime] = None
+    last_finished_at: Optional[datetime] = None
+    last_status: Optional[str] = None
+    last_error: Optional[str] = None
+    last_result: Optional[Dict[str, Any]] = None
+    runs: int
+    failures: int
+    last_duration_ms: Optional[float] = None
+    avg_duration_ms: Optional[float] = None
+    max_duration_ms: Optional[float] = None
+
+
+class SchedulerStatus(BaseModel):
+    enabled: bool
+    is_leader: bool
+    jobs: List[JobInfo]
+
+
+class PartitionInfo(BaseModel):
+    name: str
+    range_start: Optional[date] = None
+    range_end: Optional[date] = None
+    estimated_rows: int
+    size_bytes: int
+
+
+class TransactionArchiveInfo(BaseModel):
+    partition_name: str
+    range_start: datetime
+    range_end: datetime
+    file_path: str
+    row_count: int
+    purchase_count: int
+    amount_total: float
+    max_transaction_id: Optional[int] = None
+    archived_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+@router.get("/maintenance", response_model=MaintenanceStatus)
+async def get_maintenance():
+    """
+    Wartungsstatus dieses Workers (aus dem Speicher, kein DB-Zugriff)
+    """
+    return maintenance_state.status()
+
+
+@router.put("/maintenance", response_model=MaintenanceStatus)
+async def set_maintenance(
+    request: MaintenanceStatus,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Wartungsmodus setzen (Admin only) - alle Worker per NOTIFY
+    """
+    sys_settings = await update_returning(
+        db, SystemSettings,
+        SystemSettings.id == 1,
+        maintenance_mode=request.maintenance_mode,
+        maintenance_message=request.maintenance_message,
+        updated_at=datetime.utcnow(),
+    )
+
+    if sys_settings is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="System-Einstellungen nicht gefunden"
+        )
+
+    await publish_maintenance(db, sys_settings)
+    await db.commit()
+
+    maintenance_state.apply(
+        sys_settings.maintenance_mode,
+        sys_settings.maintenance_message,
+        sys_settings.updated_at,
+    )
+
+    return maintenance_state.status()
+
+
+@router.get("/tasks", response_model=TaskStats)
+async def get_task_stats(
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Hintergrund-Tasks dieses Workers je Typ (Admin only)
+    """
+    return task_manager.stats()
+
+
+@router.get("/circuits")
+async def get_circuits(
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Circuit Breaker externer Dienste auf diesem Worker (Admin only)
+    """
+    return {"sumup": sumup_breaker.stats()}
+
+
+@router.get("/rate-limits")
+async def get_rate_limits(
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Ausgehende Rate-Limits: Tokens, Wartende und Wartezeit je Priorität (Admin only)
+
+    Der Bucket ist gemeinsam für alle Worker, die Zähler gelten pro Worker.
+    """
+    return {"sumup": sumup_rate_limiter.stats()}
+
+
+@router.get("/polling")
+async def get_polling(
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    SumUp-Polling je Profil: Abfragen je Zahlung im Vergleich zum festen Takt (Admin only)
+
+    Zähler pro Worker seit dem Start.
+    """
+    return {"sumup": poll_metrics.stats()}
+
+
+@router.get("/jobs", response_model=SchedulerStatus)
+async def get_jobs(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Geplante Jobs mit Zeitplan und Laufzeiten (Admin only)
+
+    is_leader gilt für den Worker, der die Anfrage beantwortet.
+    """
+    return {
+        "enabled": settings.SCHEDULER_ENABLED,
+        "is_leader": scheduler.is_leader,
+        "jobs": await scheduler.status(db),
+    }
+
+
+@router.post("/jobs/{name}/run", status_code=status.HTTP_202_ACCEPTED)
+async def run_job(
+    name: str,
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Job sofort auf diesem Worker starten (Admin only)
+
+    Läuft er gerade auf einem anderen Worker, wird der Start übersprungen
+    (Advisory-Lock je Job).
+    """
+    if name not in scheduler.jobs:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job nicht gefunden"
+        )
+    if settings.DIRECT_DATABASE_URL is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Scheduler braucht eine direkte DB-Verbindung (POSTGRES_DIRECT_HOST)"
+        )
+    if not scheduler.trigger(name):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Job läuft bereits"
+        )
+    return {"message": f"Job {name} gestartet"}
+
+
+@router.get("/partitions", response_model=List[PartitionInfo])
+async def get_partitions(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Monatspartitionen der transactions-Tabelle (Admin only)
+    """
+    return await PartitionService(db).list_partitions()
+
+
+@router.post("/partitions/ensure", response_model=List[str])
+async def ensure_partitions(
+    months_ahead: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Fehlende Monatspartitionen anlegen (Admin only) - Rückgabe: neu angelegte
+    """
+    created = await PartitionService(db).ensure_partitions(months_ahead)
+    await db.commit()
+
+    return created
+
+
+@router.post("/partitions/archive-expired", response_model=List[TransactionArchiveInfo])
+async def archive_expired_partitions(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Alle Monate älter als TRANSACTION_ARCHIVE_AFTER_MONTHS archivieren (Admin only)
+    """
+    return await PartitionService(db).archive_expired()
+
+
+@router.post("/partitions/{name}/archive", response_model=TransactionArchiveInfo)
+async def archive_partition(
+    name: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Alten Monat samt Käufen ins Cold Archive (ARCHIVE_DIR) auslagern und aus der DB entfernen (Admin only)
+    """
+    archive = await PartitionService(db).archive_partition(name)
+    await db.commit()
+
+    return archive
+
+
+@router.post("/partitions/{name}/restore")
+async def restore_partition(
+    name: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Archivierten Monat wieder als Partition einhängen (Admin only)
+    """
+    rows = await PartitionService(db).restore_partition(name)
+    await db.commit()
+
+    return {"message": "Partition wiederhergestellt", "rows": rows}
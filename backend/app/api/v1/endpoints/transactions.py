@@ -12,15 +12,20 @@ from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph,
 from reportlab.lib.units import cm
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
-from sqlalchemy.orm import selectinload
-from app.db.session import get_db
+from app.db.session import get_db, get_db_replica
+from app.db.writes import insert_returning, update_returning
 from app.models.transaction import Transaction
 from app.models.user import User
 from app.models.guest import Guest
 from app.schemas.transaction import TransactionCreate, TransactionResponse, TopUpRequest
 from app.models.transaction import TransactionStatus, PaymentMethod
 from app.core.security import get_current_user
+from app.core.config import settings
+from app.core.money import to_cents, to_euros
+from app.services.daily_sales_service import DailySalesService
+from app.services.history_service import HistoryService
 from datetime import datetime
+from datetime import date as date_type
 
 router = APIRouter()
 
@@ -34,37 +39,44 @@ async def create_transaction(
     """
     Create a new transaction (Purchase from balance)
     """
-    # Validate balance for purchases
+    balance_before = None
+    balance_after = None
+
+    # Validate and deduct balance atomically (Dispo-Grenze im WHERE)
     if transaction_data.payment_method == "balance":
-        if current_user.balance < transaction_data.amount:
-            # Prüfe ob mit Dispo möglich
-            new_balance = current_user.balance - transaction_data.amount
-            if new_balance < -15.0:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Insufficient balance. Maximum overdraft is -15.00€"
-                )
-
-        # Deduct from balance
-        current_user.balance -= transaction_data.amount
+        user = await update_returning(
+            db,
+            User,
+            User.id == current_user.id,
+            User.balance - transaction_data.amount >= settings.MEMBER_CREDIT_LIMIT,
+            balance=User.balance - transaction_data.amount,
+        )
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Insufficient balance. Maximum overdraft is {settings.MEMBER_CREDIT_LIMIT:.2f}€"
+            )
+        balance_after = user.balance
+        balance_before = to_euros(to_cents(balance_after) + to_cents(transaction_data.amount))
 
     # Create transaction
-    transaction = Transaction(
-    transaction_reference=f"TXN-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}-{current_user.id}",
-    user_id=current_user.id,
-    transaction_type=transaction_data.transaction_type,
-    amount=transaction_data.amount,
-    payment_method=transaction_data.payment_method,
-    description=transaction_data.description,
-    status="successful",
-    balance_before=(current_user.balance + transaction_data.amount) if transaction_data.payment_method == "balance" else None,
-    balance_after=current_user.balance if transaction_data.payment_method == "balance" else None,
-    created_at=datetime.utcnow(),
-)
-
-    db.add(transaction)
+    transaction = await insert_returning(
+        db,
+        Transaction,
+        transaction_reference=f"TXN-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}-{current_user.id}",
+        user_id=current_user.id,
+        transaction_type=transaction_data.transaction_type,
+        amount=transaction_data.amount,
+        payment_method=transaction_data.payment_method,
+        description=transaction_data.description,
+        status="successful",
+        balance_before=balance_before,
+        balance_after=balance_after,
+        created_at=datetime.utcnow(),
+    )
+    if transaction.transaction_type == "purchase":
+        await DailySalesService(db).record_member_purchase(transaction)
     await db.commit()
-    await db.refresh(transaction)
 
     return transaction
 
@@ -81,24 +93,28 @@ async def top_up_balance(
     # TODO: Integrate with SumUp API
     # For now, we just create the transaction and add balance
 
-    # Create transaction
-    transaction = Transaction(
-    transaction_reference=f"TOP-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}-{current_user.id}",
-    user_id=current_user.id,
-    transaction_type="top_up",
-    amount=top_up_data.amount,
-    payment_method=top_up_data.payment_method,
-    description=f"Top-up {top_up_data.amount}€",
-    status="successful",
-    created_at=datetime.utcnow(),
-)
-
     # Add to balance
-    current_user.balance += top_up_data.amount
+    await update_returning(
+        db,
+        User,
+        User.id == current_user.id,
+        balance=User.balance + top_up_data.amount,
+    )
 
-    db.add(transaction)
+    # Create transaction
+    transaction = await insert_returning(
+        db,
+        Transaction,
+        transaction_reference=f"TOP-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}-{current_user.id}",
+        user_id=current_user.id,
+        transaction_type="top_up",
+        amount=top_up_data.amount,
+        payment_method=top_up_data.payment_method,
+        description=f"Top-up {top_up_data.amount}€",
+        status="successful",
+        created_at=datetime.utcnow(),
+    )
     await db.commit()
-    await db.refresh(transaction)
 
     return transaction
 
@@ -107,33 +123,37 @@ async def top_up_balance(
 async def get_my_transactions(
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    date_from: Optional[date_type] = None,
+    date_to: Optional[date_type] = None,
+    db: AsyncSession = Depends(get_db_replica),
     current_user: User = Depends(get_current_user),
 ):
     """
-    Get current user's transactions
+    Get current user's transactions (inkl. archivierter Monate)
+    Optional date_from/date_to (lokale Tage) - liest nur die betroffenen Monatspartitionen
     """
-    result = await db.execute(
-        select(Transaction)
-        .where(Transaction.user_id == current_user.id)
-        .order_by(Transaction.created_at.desc())
-        .offset(skip)
-        .limit(limit)
+    return await HistoryService(db).transactions(
+        user_id=current_user.id,
+        date_from=date_from,
+        date_to=date_to,
+        skip=skip,
+        limit=limit,
     )
-    transactions = result.scalars().all()
-    return transactions
 
 @router.get("/", response_model=List[TransactionResponse])
 async def get_all_transactions(
     skip: int = 0,
     limit: int = 100,
     user_type: str = 'all',
-    db: AsyncSession = Depends(get_db),
+    date_from: Optional[date_type] = None,
+    date_to: Optional[date_type] = None,
+    db: AsyncSession = Depends(get_db_replica),
     current_user: User = Depends(get_current_user),
 ):
     """
     Get all transactions (Admin only)
     Filter by user_type: 'all', 'members', 'guests'
+    Optional date_from/date_to (lokale Tage) - liest nur die betroffenen Monatspartitionen
     Returns transactions with user/guest names
     """
     if not current_user.is_admin:
@@ -142,22 +162,15 @@ async def get_all_transactions(
             detail="Not enough permissions"
         )
 
-    # Build query with filter
-    query = select(Transaction).options(
-        selectinload(Transaction.user),
-        selectinload(Transaction.guest)
+    # Filter: 'all' | 'members' | 'guests', archivierte Monate inklusive
+    transactions = await HistoryService(db).transactions(
+        user_type=user_type,
+        date_from=date_from,
+        date_to=date_to,
+        skip=skip,
+        limit=limit,
+        with_names=True,
     )
-
-    if user_type == 'members':
-        query = query.where(Transaction.user_id.is_not(None))
-    elif user_type == 'guests':
-        query = query.where(Transaction.guest_id.is_not(None))
-    # 'all' = no filter
-
-    query = query.order_by(Transaction.created_at.desc()).offset(skip).limit(limit)
-
-    result = await db.execute(query)
-    transactions = result.scalars().all()
     
     # Manuell die Namen hinzufügen
     response_data = []
@@ -217,11 +230,14 @@ async def get_transaction(
 @router.get("/export/pdf")
 async def export_transactions_pdf(
     user_type: str = 'all',
-    db: AsyncSession = Depends(get_db),
+    date_from: Optional[date_type] = None,
+    date_to: Optional[date_type] = None,
+    db: AsyncSession = Depends(get_db_replica),
     current_user: User = Depends(get_current_user),
 ):
     """
     Export transactions as PDF (Admin only)
+    Optional date_from/date_to (lokale Tage)
     """
     if not current_user.is_admin:
         raise HTTPException(
@@ -229,22 +245,15 @@ async def export_transactions_pdf(
             detail="Not enough permissions"
         )
 
-    # Get transactions with filter and load relationships
-    query = select(Transaction).options(
-        selectinload(Transaction.user),
-        selectinload(Transaction.guest)
+    # Get transactions with filter and load relationships (inkl. archivierter Monate)
+    transactions = await HistoryService(db).transactions(
+        user_type=user_type,
+        date_from=date_from,
+        date_to=date_to,
+        limit=None,
+        with_names=True,
     )
 
-    if user_type == 'members':
-        query = query.where(Transaction.user_id.is_not(None))
-    elif user_type == 'guests':
-        query = query.where(Transaction.guest_id.is_not(None))
-
-    query = query.order_by(Transaction.created_at.desc())
-
-    result = await db.execute(query)
-    transactions = result.scalars().all()
-
     # Create PDF
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=A4)
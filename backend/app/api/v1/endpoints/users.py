@@ -6,6 +6,9 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.db.session import get_db
+from app.db.writes import insert_returning, update_returning
+from app.core.config import settings
+from app.core.money import to_cents, to_euros
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate, UserResponse, UserBalanceAdjustment, UserPasswordReset
 from app.core.security import get_current_user, SecurityService
@@ -77,7 +80,9 @@ async def create_user(
         )
 
     # Create user
-    new_user = User(
+    new_user = await insert_returning(
+        db,
+        User,
         username=user_data.username,
         email=user_data.email,
         first_name=user_data.first_name,
@@ -88,10 +93,7 @@ async def create_user(
         is_active=True,
         created_at=datetime.utcnow(),
     )
-
-    db.add(new_user)
     await db.commit()
-    await db.refresh(new_user)
 
     return new_user
 
@@ -242,35 +244,39 @@ async def adjust_user_balance(
             detail="Not enough permissions"
         )
 
-    result = await db.execute(
-        select(User).where(User.id == user_id)
+    # Update balance atomically (Dispo-Grenze im WHERE)
+    user = await update_returning(
+        db,
+        User,
+        User.id == user_id,
+        User.balance + adjustment.amount >= settings.MEMBER_CREDIT_LIMIT,
+        balance=User.balance + adjustment.amount,
+        updated_at=datetime.utcnow(),
     )
-    user = result.scalar_one_or_none()
 
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
+    if user is None:
+        result = await db.execute(
+            select(User.id).where(User.id == user_id)
         )
-
-     # Store old balance for transaction record
-    old_balance = user.balance
-    new_balance = old_balance + adjustment.amount
-
-    if new_balance < -15.0:  # GEÄNDERT: -15€ Dispo erlaubt
+        if result.scalar_one_or_none() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Balance cannot be less than -15.00€ (Dispo limit)"
+            detail=f"Balance cannot be less than {settings.MEMBER_CREDIT_LIMIT:.2f}€ (Dispo limit)"
         )
 
-    # Update balance
-    user.balance = new_balance
-    user.updated_at = datetime.utcnow()
+    new_balance = user.balance
+    old_balance = to_euros(to_cents(new_balance) - to_cents(adjustment.amount))
 
     # Create transaction record
     from app.models.transaction import Transaction
     
-    transaction = Transaction(
+    await insert_returning(
+        db,
+        Transaction,
         transaction_reference=f"ADJ-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}-{user_id}",
         user_id=user_id,
         transaction_type="admin_adjustment",  # Immer admin_adjustment für diesen Endpoint!
@@ -283,10 +289,7 @@ async def adjust_user_balance(
         created_by_admin_id=current_user.id,
         created_at=datetime.utcnow(),
     )
-    
-    db.add(transaction)
     await db.commit()
-    await db.refresh(user)
     return user
 
 @router.post("/{user_id}/reset-password", response_model=dict)
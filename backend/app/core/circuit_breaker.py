@@ -0,0 +1,107 @@
+"""
+Vereinskasse - Circuit Breaker
+Datei: backend/app/core/circuit_breaker.py
+
+Schützt vor einem langsamen oder ausgefallenen externen Dienst (SumUp):
+nach failure_threshold Fehlern in Folge ist der Kreis offen und Aufrufe
+schlagen sofort fehl, statt auf Timeouts zu warten. Nach reset_seconds
+darf genau ein Probe-Aufruf durch (half-open); gelingt er, ist der Kreis
+wieder geschlossen.
+
+Zustand pro Worker - jeder Worker lernt den Ausfall selbst (nach wenigen
+schnellen Fehlschlägen).
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+
+class CircuitOpenError(Exception):
+    """Kreis offen - Aufruf gar nicht erst versucht"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name}: Circuit offen, nächster Versuch in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    closed -> open (nach failure_threshold Fehlern) -> half_open (nach reset_seconds) -> closed
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_running = False
+
+        self.calls = 0
+        self.failures = 0
+        self.rejected = 0
+        self.opened = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.reset_seconds:
+            return "open"
+        return "half_open"
+
+    def retry_after(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(self.reset_seconds - (time.monotonic() - self.opened_at), 0.0)
+
+    def before_call(self) -> None:
+        """
+        Vor jedem Aufruf - wirft CircuitOpenError statt zu warten
+
+        Im half-open Zustand läuft nur ein Probe-Aufruf gleichzeitig.
+        """
+        state = self.state
+        if state == "open" or (state == "half_open" and self._probe_running):
+            self.rejected += 1
+            raise CircuitOpenError(self.name, self.retry_after() or self.reset_seconds)
+        if state == "half_open":
+            self._probe_running = True
+        self.calls += 1
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._probe_running = False
+
+    def record_failure(self, error: str) -> None:
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_error = error
+        if self._probe_running or self.consecutive_failures >= self.failure_threshold:
+            if self.opened_at is None or self._probe_running:
+                self.opened += 1
+            self.opened_at = time.monotonic()
+        self._probe_running = False
+
+    def release(self) -> None:
+        """Aufruf abgebrochen (Cancel) - zählt weder als Erfolg noch als Fehler"""
+        self._probe_running = False
+
+    def is_open(self) -> bool:
+        return self.state == "open"
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "retry_after_seconds": round(self.retry_after(), 1),
+            "consecutive_failures": self.consecutive_failures,
+            "calls": self.calls,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "opened": self.opened,
+            "last_error": self.last_error,
+        }
@@ -30,7 +30,25 @@ class Settings(BaseSettings):
     POSTGRES_HOST: str = "postgres"
     POSTGRES_PORT: int = 5432
     
+    # Verbindungsbudget für ALLE Worker zusammen (Postgres max_connections=100
+    # minus Reserve für Admin/Backups); wird durch WORKERS geteilt
+    DB_CONNECTION_BUDGET: int = 80
+    DB_POOL_TIMEOUT: float = 30.0
+    # Betrieb hinter PgBouncer (Transaction Pooling): Statement-Cache aus
+    DB_PGBOUNCER_MODE: bool = False
+    # Direkt zu Postgres an PgBouncer vorbei - Session-Advisory-Locks des
+    # Schedulers brauchen eine echte Server-Session
+    POSTGRES_DIRECT_HOST: Optional[str] = None
+    POSTGRES_DIRECT_PORT: int = 5432
+    
+    # Optionales Read-Replica für Reporting/Listen (gleiche Credentials wie Primary)
+    POSTGRES_REPLICA_HOST: Optional[str] = None
+    POSTGRES_REPLICA_PORT: int = 5432
+    REPLICA_MAX_LAG_SECONDS: float = 30.0
+    REPLICA_HEALTH_CHECK_INTERVAL: float = 5.0
+    
     # Email Settings
+    SMTP_ENABLED: bool = False
     SMTP_HOST: str = os.getenv("SMTP_HOST", "localhost")
     SMTP_PORT: int = int(os.getenv("SMTP_PORT", "465"))
     SMTP_USER: str = os.getenv("SMTP_USER", "")
@@ -42,6 +60,21 @@ class Settings(BaseSettings):
     def DATABASE_URL(self) -> str:
         return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
     
+    @property
+    def REPLICA_DATABASE_URL(self) -> Optional[str]:
+        if not self.POSTGRES_REPLICA_HOST:
+            return None
+        return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_REPLICA_HOST}:{self.POSTGRES_REPLICA_PORT}/{self.POSTGRES_DB}"
+    
+    @property
+    def DIRECT_DATABASE_URL(self) -> Optional[str]:
+        """Postgres ohne PgBouncer (asyncpg.connect); None = PgBouncer-Modus ohne POSTGRES_DIRECT_HOST"""
+        if not self.DB_PGBOUNCER_MODE:
+            return self.database_url_sync
+        if not self.POSTGRES_DIRECT_HOST:
+            return None
+        return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_DIRECT_HOST}:{self.POSTGRES_DIRECT_PORT}/{self.POSTGRES_DB}"
+    
     SECRET_KEY: str = Field(default_factory=lambda: secrets.token_urlsafe(32))
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
@@ -61,8 +94,42 @@ class Settings(BaseSettings):
     SUMUP_READER_ID: Optional[str] = None
     SUMUP_MODE: str = "cloud_api"
     SUMUP_API_BASE_URL: str = "https://api.sumup.com/v0.1"
+    # Fester Takt von früher - nur noch Vergleichswert für die Polling-Metrik
     SUMUP_POLLING_INTERVAL: int = 3
-    SUMUP_POLLING_TIMEOUT: int = 120
+    # Polling-Profile: erste Abfrage nach INITIAL, Abstand * FACTOR bis MAX_INTERVAL
+    SUMUP_POLLING_TIMEOUT: int = 120  # Terminal (cloud_api)
+    SUMUP_POLL_CLOUD_API_INITIAL: float = 2.0
+    SUMUP_POLL_CLOUD_API_MAX_INTERVAL: float = 10.0
+    SUMUP_POLL_PAYMENT_LINK_INITIAL: float = 10.0
+    SUMUP_POLL_PAYMENT_LINK_MAX_INTERVAL: float = 60.0
+    SUMUP_POLL_PAYMENT_LINK_TIMEOUT: int = 900
+    SUMUP_POLL_BACKOFF_FACTOR: float = 1.5
+    SUMUP_POLL_CONCURRENCY: int = 20  # Terminal-Poller je Worker
+    SUMUP_POLL_LINK_CONCURRENCY: int = 20  # Payment-Link-Poller je Worker (eigenes Kontingent)
+    SUMUP_MAX_CONNECTIONS: int = 20
+    # Deadlines je Operation (inkl. Retries), Retries nur für GET
+    SUMUP_DEADLINE_CHECKOUT_SECONDS: float = 8.0
+    SUMUP_DEADLINE_STATUS_SECONDS: float = 3.0
+    SUMUP_DEADLINE_READER_SECONDS: float = 10.0
+    SUMUP_RETRY_ATTEMPTS: int = 3
+    SUMUP_RETRY_BASE_DELAY: float = 0.2
+    # Circuit Breaker: offen nach N Fehlern in Folge, Probe nach RESET Sekunden
+    SUMUP_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    SUMUP_CIRCUIT_RESET_SECONDS: float = 30.0
+    # Rate-Limit über alle Worker (Token-Bucket in rate_limit_buckets)
+    SUMUP_RATE_LIMIT_PER_SECOND: float = 10.0
+    SUMUP_RATE_BURST: int = 20
+    SUMUP_RATE_LEASE_SIZE: int = 3
+    # Priorität p lässt p * Anteil * Burst für wichtigere Aufrufe übrig
+    SUMUP_RATE_PRIORITY_RESERVE: float = 0.2
+    # Sweeper: pending-Zahlungen ohne lebenden Poller (> Polling-Timeout des Profils)
+    SUMUP_SWEEP_AFTER_SECONDS: int = 300
+    SUMUP_SWEEP_INTERVAL_SECONDS: int = 300
+    SUMUP_SWEEP_BATCH_SIZE: int = 200
+    SUMUP_SWEEP_CONCURRENCY: int = 5
+    
+    # QR-Codes der Payment Links im Speicher (je Worker, LRU)
+    QR_CODE_CACHE_SIZE: int = 256
     
     MEMBER_CREDIT_LIMIT: float = -15.00
     DEFAULT_CURRENCY: str = "EUR"
@@ -73,14 +140,55 @@ class Settings(BaseSettings):
     DEFAULT_TAX_RATE_DRINKS: float = 0.19
     MEMBER_TAX_EXEMPT: bool = True
     
+    # DATEV-Export (SKR03)
+    DATEV_ACCOUNT_CASH: str = "1000"
+    DATEV_ACCOUNT_SUMUP: str = "1360"
+    DATEV_ACCOUNT_MEMBER_BALANCE: str = "1700"
+    DATEV_ACCOUNT_REVENUE_19: str = "8400"
+    DATEV_ACCOUNT_REVENUE_7: str = "8300"
+    DATEV_ACCOUNT_REVENUE_TAX_FREE: str = "8200"
+    
+    # Hintergrund-Tasks: Wartezeit beim Shutdown bis laufende Tasks abgebrochen werden
+    TASK_DRAIN_TIMEOUT_SECONDS: float = 25.0
+    
+    # In-App-Scheduler (Leader per Advisory-Lock, Zeiten HH:MM in TIMEZONE)
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_TICK_SECONDS: float = 30.0
+    SCHEDULER_CONCURRENCY: int = 2
+    RECONCILIATION_SCHEDULE: str = "03:00"
+    DAILY_SALES_SCHEDULE: str = "03:15"
+    PARTITION_SCHEDULE: str = "03:30"
+    BACKUP_SCHEDULE: Optional[str] = None  # None = Backup weiter per cron (backup.sh)
+    RETENTION_BATCH_SIZE: int = 1000
+    PASSWORD_RESET_RETENTION_DAYS: int = 7
+    BALANCE_CHECKPOINT_RETENTION_DAYS: int = 90
+    
+    ANALYTICS_REFRESH_SECONDS: int = 60
+    # Würfel-Wasserstand bleibt so weit hinter jungen (evtl. uncommitteten) IDs
+    ANALYTICS_COMMIT_LAG_SECONDS: int = 120
+    BALANCE_CHECKPOINT_LAG_SECONDS: int = 600
+    # Z-Bon-Periodenende liegt so weit zurück (Buchungen davor sind committet)
+    CLOSING_COMMIT_LAG_SECONDS: int = 120
+    
     MAX_UPLOAD_SIZE: int = 10485760
     UPLOAD_DIR: str = "./uploads"
     BACKUP_DIR: str = "./backups"
     BACKUP_RETENTION_DAYS: int = 60
     
+    # Transaktions-Partitionen (monatlich) und Archiv
+    TRANSACTION_PARTITION_MONTHS_AHEAD: int = 3
+    TRANSACTION_ARCHIVE_AFTER_MONTHS: int = 24
+    ARCHIVE_DIR: str = "./archive"
+    COLD_ARCHIVE_OPEN_SEGMENTS: int = 24
+    
     RFID_ENABLED: bool = True
     RFID_READER_TYPE: str = "USB"
     RFID_DEVICE_PATH: str = "/dev/ttyUSB0"
+    RFID_INDEX_TTL_SECONDS: int = 300
+    RFID_INDEX_CHECK_INTERVAL: float = 5.0  # Prüfung der LISTEN-Verbindung; fällt sie aus, ist der Index aus
+    
+    MAINTENANCE_POLL_INTERVAL: float = 5.0
+    MAINTENANCE_RETRY_AFTER_SECONDS: int = 120
     
     DEFAULT_LANGUAGE: str = "de"
     TIMEZONE: str = "Europe/Berlin"
@@ -0,0 +1,251 @@
+"""
+Vereinskasse - Wartungsmodus
+Datei: backend/app/core/maintenance.py
+
+In-Memory Wartungs-Flag (pro Worker) + ASGI-Middleware.
+Das Flag spiegelt SystemSettings.maintenance_mode und wird über
+LISTEN/NOTIFY sofort, per Polling der Settings-Version (updated_at)
+als Fallback aktualisiert. Die Middleware fasst die DB nur im
+Wartungsmodus an, und nur für schreibende Requests mit Token ohne
+Admin-Claim (RFID-Login, ältere Tokens).
+"""
+
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import asyncpg
+from jose import JWTError, jwt
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.db.session import READ_ONLY_METHODS, engine
+from app.models.settings import SystemSettings
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "system_settings"
+
+DEFAULT_MESSAGE = "Wartungsarbeiten - bitte später erneut versuchen"
+
+# Bleiben im Wartungsmodus erreichbar (Login, damit Admins sich anmelden können)
+EXEMPT_PATH_PREFIXES = ("/health", "/api/v1/health")
+EXEMPT_PATHS = frozenset({"/api/v1/auth/login", "/api/v1/auth/login/rfid"})
+
+
+class MaintenanceState:
+    """
+    Aktueller Wartungsstatus dieses Workers
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.message: Optional[str] = None
+        self.version: Optional[datetime] = None
+
+    def apply(self, enabled: bool, message: Optional[str], version: Optional[datetime]) -> None:
+        # Verspätete Notification darf keinen neueren Stand überschreiben
+        if version is not None and self.version is not None and version < self.version:
+            return
+        if enabled != self.enabled:
+            logger.warning(f"Wartungsmodus {'aktiviert' if enabled else 'deaktiviert'}")
+        self.enabled = bool(enabled)
+        self.message = message
+        self.version = version
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "maintenance_mode": self.enabled,
+            "maintenance_message": self.message,
+        }
+
+
+maintenance_state = MaintenanceState()
+
+
+async def publish_maintenance(db: AsyncSession, sys_settings: SystemSettings) -> None:
+    """
+    NOTIFY an alle Worker - wird erst mit dem Commit der Transaktion zugestellt
+
+    Args:
+        db: Database Session (gleiche Transaktion wie das Settings-Update)
+        sys_settings: Aktualisierte Settings-Zeile
+    """
+    payload = json.dumps({
+        "maintenance_mode": sys_settings.maintenance_mode,
+        "maintenance_message": sys_settings.maintenance_message,
+        "version": sys_settings.updated_at.isoformat() if sys_settings.updated_at else None,
+    })
+    await db.execute(select(func.pg_notify(NOTIFY_CHANNEL, payload)))
+
+
+class MaintenanceWatcher:
+    """
+    Hält maintenance_state aktuell
+
+    - LISTEN auf eigener asyncpg-Verbindung (nicht aus dem Pool, nicht über
+      PgBouncer - im Transaction-Pooling gehen Notifications verloren)
+    - Polling der Settings-Zeile alle MAINTENANCE_POLL_INTERVAL Sekunden;
+      ist die DB weg (Restore), bleibt der letzte bekannte Stand aktiv
+    """
+
+    def __init__(self, state: MaintenanceState, interval: float):
+        self.state = state
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self._listen_conn: Optional[asyncpg.Connection] = None
+        self._db_ok = True
+
+    async def start(self) -> None:
+        await self.refresh()
+        if not settings.DB_PGBOUNCER_MODE:
+            await self._ensure_listener()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._close_listener()
+
+    async def refresh(self) -> None:
+        """Liest Flag + Version direkt aus system_settings"""
+        try:
+            async with engine.connect() as conn:
+                result = await asyncio.wait_for(
+                    conn.execute(
+                        select(
+                            SystemSettings.maintenance_mode,
+                            SystemSettings.maintenance_message,
+                            SystemSettings.updated_at,
+                        ).where(SystemSettings.id == 1)
+                    ),
+                    timeout=self.interval,
+                )
+                row = result.first()
+        except Exception as e:
+            if self._db_ok:
+                logger.warning(f"Wartungsstatus nicht lesbar, behalte letzten Stand: {e}")
+            self._db_ok = False
+            return
+
+        self._db_ok = True
+        if row is not None:
+            self.state.apply(bool(row.maintenance_mode), row.maintenance_message, row.updated_at)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            if not settings.DB_PGBOUNCER_MODE:
+                await self._ensure_listener()
+            await self.refresh()
+
+    async def _ensure_listener(self) -> None:
+        if self._listen_conn is not None and not self._listen_conn.is_closed():
+            return
+        try:
+            self._listen_conn = await asyncpg.connect(settings.database_url_sync, timeout=self.interval)
+            await self._listen_conn.add_listener(NOTIFY_CHANNEL, self._on_notify)
+        except Exception as e:
+            logger.debug(f"LISTEN {NOTIFY_CHANNEL} nicht möglich: {e}")
+            await self._close_listener()
+
+    async def _close_listener(self) -> None:
+        if self._listen_conn is not None:
+            try:
+                await self._listen_conn.close(timeout=1)
+            except Exception:
+                self._listen_conn.terminate()
+            self._listen_conn = None
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        try:
+            data = json.loads(payload)
+            version = datetime.fromisoformat(data["version"]) if data.get("version") else None
+            self.state.apply(bool(data["maintenance_mode"]), data.get("maintenance_message"), version)
+        except (ValueError, KeyError) as e:
+            logger.warning(f"Ungültige Settings-Notification: {e}")
+
+
+maintenance_watcher = MaintenanceWatcher(maintenance_state, settings.MAINTENANCE_POLL_INTERVAL)
+
+
+def _access_token_payload(scope: Scope) -> Optional[Dict[str, Any]]:
+    """Payload eines gültigen Bearer Access Tokens (nur Signaturprüfung)"""
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer" or not token:
+                return None
+            try:
+                payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+            except JWTError:
+                return None
+            return payload if payload.get("type") == "access" else None
+    return None
+
+
+async def _is_admin_request(scope: Scope) -> bool:
+    """
+    Admin-Claim aus dem Bearer Token; fehlt er (RFID-Login, Tokens von vor
+    dem Claim), entscheidet users.is_admin
+    """
+    payload = _access_token_payload(scope)
+    if payload is None:
+        return False
+    if payload.get("adm") is True:
+        return True
+    try:
+        user_id = int(payload.get("sub"))
+    except (TypeError, ValueError):
+        return False
+    try:
+        async with engine.connect() as conn:
+            result = await conn.execute(
+                select(User.is_admin).where(User.id == user_id, User.is_active.is_(True))
+            )
+            return bool(result.scalar())
+    except Exception as e:
+        logger.warning(f"Admin-Prüfung im Wartungsmodus fehlgeschlagen: {e}")
+        return False
+
+
+class MaintenanceMiddleware:
+    """
+    Lehnt im Wartungsmodus schreibende Requests von Nicht-Admins mit 503 ab
+
+    Lesende Requests, Health-Checks und der Login laufen weiter.
+    """
+
+    def __init__(self, app: ASGIApp, state: MaintenanceState = maintenance_state):
+        self.app = app
+        self.state = state
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or not self.state.enabled
+            or scope["method"] in READ_ONLY_METHODS
+            or scope["path"] in EXEMPT_PATHS
+            or scope["path"].startswith(EXEMPT_PATH_PREFIXES)
+            or await _is_admin_request(scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        response = JSONResponse(
+            {"detail": self.state.message or DEFAULT_MESSAGE},
+            status_code=503,
+            headers={"Retry-After": str(settings.MAINTENANCE_RETRY_AFTER_SECONDS)},
+        )
+        await response(scope, receive, send)
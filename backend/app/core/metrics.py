@@ -0,0 +1,45 @@
+"""
+Vereinskasse - Metrics
+Datei: backend/app/core/metrics.py
+
+Einfache In-Process Metriken (pro Worker) für Health-/Monitoring-Endpoints
+"""
+
+import math
+from typing import Dict
+
+
+class DurationStats:
+    """
+    Zähler, Summe, Maximum und Histogramm für Dauer-Messungen in Sekunden
+    """
+
+    BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, math.inf)
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(self.BUCKETS)
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        for i, upper in enumerate(self.BUCKETS):
+            if seconds <= upper:
+                self.buckets[i] += 1
+                break
+
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 3),
+            "total_seconds": round(self.total, 3),
+            "buckets": {
+                ("le_inf" if math.isinf(upper) else f"le_{upper * 1000:g}ms"): n
+                for upper, n in zip(self.BUCKETS, self.buckets)
+            },
+        }
@@ -0,0 +1,76 @@
+"""
+Vereinskasse - Geldbeträge
+Datei: backend/app/core/money.py
+
+Beträge liegen in der Datenbank als ganze Cent (BIGINT). Im Python-Code
+und in der API bleiben sie Euro-Floats: der SQLAlchemy-Typ Money rechnet
+beim Schreiben/Lesen um, der Pydantic-Typ Euro rundet Eingaben auf Cent.
+"""
+
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Annotated, Optional, Union
+
+from pydantic import AfterValidator
+from sqlalchemy import BigInteger, Integer, Numeric, cast, func
+from sqlalchemy.sql import operators
+from sqlalchemy.types import TypeDecorator
+
+Number = Union[int, float, Decimal]
+
+# Operatoren, bei denen der andere Operand ein Faktor ist (kein Betrag)
+_SCALE_OPERATORS = {operators.mul, operators.truediv, operators.floordiv}
+
+
+def to_cents(euros: Number) -> int:
+    """Euro -> ganze Cent (kaufmännisch gerundet, ohne Float-Artefakte)"""
+    return int((Decimal(str(euros)) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def to_euros(cents: Number) -> float:
+    """Cent -> Euro"""
+    return float(cents) / 100
+
+
+def round_euros(euros: Number) -> float:
+    """Euro-Betrag auf ganze Cent runden"""
+    return to_euros(to_cents(euros))
+
+
+class Money(TypeDecorator):
+    """
+    Geldbetrag: BIGINT Cent in der DB, Euro-Float in Python
+
+    Arithmetik (+, -, Summen, Betrag * Menge) bleibt im SQL ganzzahlig und
+    behält den Typ - Literale wie User.balance - 2.5 >= -15.0 werden
+    dadurch ebenfalls in Cent gebunden.
+    """
+    impl = BigInteger
+    cache_ok = True
+
+    class comparator_factory(TypeDecorator.Comparator):
+        def _adapt_expression(self, op, other_comparator):
+            if op in (operators.add, operators.sub) or (
+                op is operators.mul and not isinstance(other_comparator.type, Money)
+            ):
+                return op, self.type
+            return super()._adapt_expression(op, other_comparator)
+
+    def coerce_compared_value(self, op, value):
+        if op in _SCALE_OPERATORS:
+            return Integer() if isinstance(value, int) else Numeric()
+        return self
+
+    def process_bind_param(self, value: Optional[Number], dialect) -> Optional[int]:
+        return None if value is None else to_cents(value)
+
+    def process_result_value(self, value: Optional[Number], dialect) -> Optional[float]:
+        return None if value is None else to_euros(value)
+
+
+def euros_sql(expr):
+    """Cent-Ausdruck als Euro (NUMERIC, 2 Nachkommastellen) - für JSON/CSV im SQL"""
+    return func.round(cast(expr, Numeric) / 100, 2)
+
+
+# Pydantic: Euro-Float, auf ganze Cent gerundet
+Euro = Annotated[float, AfterValidator(round_euros)]
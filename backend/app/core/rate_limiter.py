@@ -0,0 +1,254 @@
+"""
+Vereinskasse - Rate Limiter (ausgehend)
+Datei: backend/app/core/rate_limiter.py
+
+Token-Bucket für Aufrufe an externe APIs (SumUp), gemeinsam für alle
+Worker in der Tabelle rate_limit_buckets:
+
+- Nachfüllen und Entnehmen in einem UPDATE (Zeilensperre, kein Drift
+  zwischen Workern). Ein Worker least bis zu lease_size Tokens auf
+  einmal und verteilt sie lokal - ein DB-Roundtrip je Lease, nicht je
+  Aufruf. Nicht genutzte Tokens verfallen nach lease_seconds.
+- Prioritäten (0 = wichtigste): lokal bedient eine Warteschlange immer
+  die höchste Priorität zuerst. Worker-übergreifend darf Priorität p
+  den Bucket nur bis priority_reserve * p * burst leeren - Checkouts
+  finden auch dann Tokens, wenn Poller anderer Worker Schlange stehen.
+- 429 vom Dienst: drain() setzt den Bucket für alle Worker ins Minus.
+- Ist die DB nicht erreichbar, gilt ein lokaler Bucket mit rate / WORKERS.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitExceeded(Exception):
+    """Innerhalb des Timeouts kein Token frei"""
+
+
+class RateLimiter:
+    """
+    Gemeinsamer Token-Bucket mit Prioritätsklassen
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        burst: int,
+        lease_size: int,
+        priority_reserve: float,
+        priorities: Dict[int, str],
+        lease_seconds: float = 1.0,
+    ):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.lease_size = lease_size
+        self.priority_reserve = priority_reserve
+        self.priorities = priorities
+        self.lease_seconds = lease_seconds
+
+        self._tokens = 0
+        self._lease_expires = 0.0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._bucket_ready = False
+
+        # Lokaler Ersatz-Bucket, falls die DB nicht erreichbar ist
+        self._fallback_tokens = 0.0
+        self._fallback_at = time.monotonic()
+
+        self.granted = {priority: 0 for priority in priorities}
+        self.timeouts = {priority: 0 for priority in priorities}
+        self.wait_seconds = {priority: 0.0 for priority in priorities}
+        self.leases = 0
+        self.lease_denied = 0
+        self.db_errors = 0
+        self.drained = 0
+
+    def reserve(self, priority: int) -> float:
+        """Tokens, die Priorität p im gemeinsamen Bucket stehen lassen muss"""
+        return self.burst * self.priority_reserve * priority
+
+    async def acquire(self, priority: int, timeout: float) -> None:
+        """
+        Ein Token holen, notfalls warten
+
+        Args:
+            priority: Prioritätsklasse (0 = wichtigste)
+            timeout: Maximale Wartezeit in Sekunden
+
+        Raises:
+            RateLimitExceeded: Kein Token innerhalb von timeout
+        """
+        started = time.monotonic()
+        if not self._waiters and self._take_local():
+            self.granted[priority] += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch(), name=f"rate_limiter:{self.name}")
+
+        try:
+            await asyncio.wait_for(future, timeout=max(timeout, 0.0))
+        except asyncio.TimeoutError:
+            self.timeouts[priority] += 1
+            raise RateLimitExceeded(f"{self.name}: kein Token innerhalb von {timeout:.1f}s")
+        self.granted[priority] += 1
+        self.wait_seconds[priority] += time.monotonic() - started
+
+    def _take_local(self) -> bool:
+        if self._tokens > 0 and time.monotonic() < self._lease_expires:
+            self._tokens -= 1
+            return True
+        return False
+
+    async def _dispatch(self) -> None:
+        """Wartende in Prioritätsreihenfolge bedienen, bei Bedarf Tokens leasen"""
+        while self._waiters:
+            priority, _, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if self._take_local():
+                heapq.heappop(self._waiters)
+                future.set_result(None)
+                continue
+
+            granted, wait = await self._lease(priority)
+            if granted:
+                self._tokens = granted
+                self._lease_expires = time.monotonic() + self.lease_seconds
+            else:
+                await asyncio.sleep(wait)
+
+    async def _lease(self, priority: int) -> Tuple[int, float]:
+        """
+        Bis zu lease_size Tokens aus dem gemeinsamen Bucket nehmen
+
+        Returns:
+            (Anzahl Tokens, Wartezeit bis zum nächsten Versuch)
+        """
+        reserve = self.reserve(priority)
+        try:
+            async with AsyncSessionLocal() as db:
+                if not self._bucket_ready:
+                    await db.execute(
+                        text(
+                            "INSERT INTO rate_limit_buckets (name, tokens, updated_at) "
+                            "VALUES (:name, :burst, clock_timestamp() AT TIME ZONE 'utc') "
+                            "ON CONFLICT (name) DO NOTHING"
+                        ),
+                        {"name": self.name, "burst": self.burst},
+                    )
+                result = await db.execute(
+                    text("""
+                        WITH current AS (
+                            SELECT name, LEAST(
+                                :burst,
+                                tokens + EXTRACT(EPOCH FROM (clock_timestamp() AT TIME ZONE 'utc') - updated_at) * :rate
+                            ) AS available
+                            FROM rate_limit_buckets
+                            WHERE name = :name
+                            FOR UPDATE
+                        ), granted AS (
+                            SELECT name, available,
+                                   GREATEST(LEAST(:lease, FLOOR(available - :reserve)), 0) AS take
+                            FROM current
+                        )
+                        UPDATE rate_limit_buckets b
+                        SET tokens = granted.available - granted.take,
+                            updated_at = clock_timestamp() AT TIME ZONE 'utc'
+                        FROM granted
+                        WHERE b.name = granted.name
+                        RETURNING granted.take, granted.available
+                    """),
+                    {"name": self.name, "burst": self.burst, "rate": self.rate,
+                     "lease": self.lease_size, "reserve": reserve},
+                )
+                take, available = result.one()
+                await db.commit()
+            self._bucket_ready = True
+        except Exception as e:
+            self.db_errors += 1
+            logger.warning(f"Rate-Limit {self.name}: DB nicht erreichbar, lokaler Bucket: {e}")
+            return self._lease_fallback(reserve)
+
+        if take:
+            self.leases += 1
+            return int(take), 0.0
+        self.lease_denied += 1
+        return 0, max((reserve + 1 - available) / self.rate, 0.01)
+
+    def _lease_fallback(self, reserve: float) -> Tuple[int, float]:
+        workers = max(settings.WORKERS, 1)
+        rate = self.rate / workers
+        burst = self.burst / workers
+        now = time.monotonic()
+        self._fallback_tokens = min(burst, self._fallback_tokens + (now - self._fallback_at) * rate)
+        self._fallback_at = now
+        take = int(max(min(self.lease_size, self._fallback_tokens - reserve / workers), 0))
+        if take:
+            self._fallback_tokens -= take
+            return take, 0.0
+        return 0, max((reserve / workers + 1 - self._fallback_tokens) / rate, 0.01)
+
+    async def drain(self, seconds: float) -> None:
+        """
+        Dienst hat gedrosselt (429) - alle Worker pausieren etwa seconds
+
+        Lokale Tokens verfallen, der gemeinsame Bucket geht ins Minus.
+        """
+        self.drained += 1
+        self._tokens = 0
+        self._fallback_tokens = -self.rate / max(settings.WORKERS, 1) * seconds
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    text(
+                        "UPDATE rate_limit_buckets "
+                        "SET tokens = LEAST(tokens, :debt), updated_at = clock_timestamp() AT TIME ZONE 'utc' "
+                        "WHERE name = :name"
+                    ),
+                    {"name": self.name, "debt": -self.rate * seconds},
+                )
+                await db.commit()
+        except Exception as e:
+            self.db_errors += 1
+            logger.warning(f"Rate-Limit {self.name}: Drain nicht gespeichert: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        waiting: Dict[str, int] = {label: 0 for label in self.priorities.values()}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                waiting[self.priorities[priority]] += 1
+        return {
+            "rate_per_second": self.rate,
+            "burst": self.burst,
+            "local_tokens": self._tokens if time.monotonic() < self._lease_expires else 0,
+            "waiting": waiting,
+            "granted": {self.priorities[p]: n for p, n in self.granted.items()},
+            "timeouts": {self.priorities[p]: n for p, n in self.timeouts.items()},
+            "avg_wait_ms": {
+                self.priorities[p]: round(self.wait_seconds[p] / self.granted[p] * 1000, 1) if self.granted[p] else None
+                for p in self.priorities
+            },
+            "leases": self.leases,
+            "lease_denied": self.lease_denied,
+            "db_errors": self.db_errors,
+            "drained": self.drained,
+        }
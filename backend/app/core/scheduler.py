@@ -0,0 +1,293 @@
+"""
+Vereinskasse - Geplante Jobs (In-App-Scheduler)
+Datei: backend/app/core/scheduler.py
+
+Wartungsjobs (Aufräumen, Abgleich, Aggregate, Backup) laufen im Backend
+statt per cron. Bei mehreren Workern führt nur der Leader Jobs aus:
+
+- Leader ist, wer die Session-Advisory-Lock SCHEDULER_LOCK_KEY auf einer
+  eigenen asyncpg-Verbindung hält. Stirbt der Worker oder die
+  Verbindung, gibt Postgres die Lock frei und ein anderer übernimmt.
+  Hinter PgBouncer (Transaction Pooling) gehört eine Session-Lock keiner
+  festen Server-Session - die Locks laufen daher über
+  settings.DIRECT_DATABASE_URL; ohne POSTGRES_DIRECT_HOST bleibt der
+  Scheduler im PgBouncer-Modus aus.
+- Fälligkeit und Laufzeiten stehen in scheduled_jobs, nicht im Speicher.
+- Ausgeführt wird über den task_manager (eigene Session, Drain beim
+  Shutdown). Jeder Lauf hält zusätzlich eine Advisory-Lock je Job - auch
+  ein manueller Start auf einem anderen Worker läuft nie parallel.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+import asyncpg
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.tasks import task_manager
+from app.db.session import AsyncSessionLocal
+from app.models.scheduled_job import ScheduledJob
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_LOCK_KEY = 0x7363686564  # "sched"
+# pg_try_advisory_lock(JOB_LOCK_CLASS, hashtext(job_name)) während eines Laufs
+JOB_LOCK_CLASS = 0x6A6F62  # "job"
+
+# job(db) -> Ergebnis (JSON-serialisierbar, z.B. Anzahl gelöschter Zeilen)
+JobFunc = Callable[[AsyncSession], Awaitable[Optional[Dict[str, Any]]]]
+
+
+class Job:
+    """
+    Geplanter Job: alle interval_seconds oder täglich um daily_at (HH:MM, settings.TIMEZONE)
+    """
+
+    def __init__(self, name: str, func: JobFunc, interval_seconds: Optional[int], daily_at: Optional[str], description: str):
+        if (interval_seconds is None) == (daily_at is None):
+            raise ValueError(f"Job {name}: genau eines von interval_seconds/daily_at angeben")
+        self.name = name
+        self.func = func
+        self.interval_seconds = interval_seconds
+        self.daily_at = daily_at
+        self.description = description
+
+    def schedule(self) -> str:
+        return f"alle {self.interval_seconds}s" if self.interval_seconds else f"täglich {self.daily_at}"
+
+    def last_due(self, now: datetime) -> Optional[datetime]:
+        """Letzter Soll-Zeitpunkt für tägliche Jobs (naive UTC)"""
+        if self.daily_at is None:
+            return None
+        hour, minute = (int(part) for part in self.daily_at.split(":"))
+        local_now = now.replace(tzinfo=timezone.utc).astimezone(ZoneInfo(settings.TIMEZONE))
+        due = local_now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if due > local_now:
+            due -= timedelta(days=1)
+        return due.astimezone(timezone.utc).replace(tzinfo=None)
+
+    def is_due(self, last_started_at: Optional[datetime], now: datetime) -> bool:
+        if last_started_at is None:
+            return True
+        if self.interval_seconds is not None:
+            return now - last_started_at >= timedelta(seconds=self.interval_seconds)
+        return last_started_at < self.last_due(now)
+
+    def next_run(self, last_started_at: Optional[datetime], now: datetime) -> datetime:
+        if self.interval_seconds is not None:
+            return last_started_at + timedelta(seconds=self.interval_seconds) if last_started_at else now
+        return now if self.is_due(last_started_at, now) else self.last_due(now) + timedelta(days=1)
+
+
+async def _record(name: str, **values) -> None:
+    """Job-Statistik upserten (eigene Session - unabhängig vom Rollback des Jobs)"""
+    async with AsyncSessionLocal() as db:
+        stmt = pg_insert(ScheduledJob).values(name=name, **values)
+        updates = {key: stmt.excluded[key] for key in values}
+        for counter in ("runs", "failures", "total_duration_ms"):
+            if counter in values:
+                updates[counter] = getattr(ScheduledJob, counter) + stmt.excluded[counter]
+        if "max_duration_ms" in values:
+            updates["max_duration_ms"] = func.greatest(ScheduledJob.max_duration_ms, stmt.excluded.max_duration_ms)
+        await db.execute(stmt.on_conflict_do_update(index_elements=["name"], set_=updates))
+        await db.commit()
+
+
+class Scheduler:
+    """
+    Leader-Election + Fälligkeitsprüfung alle SCHEDULER_TICK_SECONDS
+    """
+
+    def __init__(self, tick_seconds: float):
+        self.tick_seconds = tick_seconds
+        self.jobs: Dict[str, Job] = {}
+        self.is_leader = False
+        self._task: Optional[asyncio.Task] = None
+        self._lock_conn: Optional[asyncpg.Connection] = None
+
+    def register(
+        self,
+        name: str,
+        func: JobFunc,
+        interval_seconds: Optional[int] = None,
+        daily_at: Optional[str] = None,
+        description: str = "",
+    ) -> None:
+        self.jobs[name] = Job(name, func, interval_seconds, daily_at, description)
+
+    async def start(self) -> None:
+        if settings.DIRECT_DATABASE_URL is None:
+            logger.warning("Scheduler aus: PgBouncer-Modus ohne POSTGRES_DIRECT_HOST (Advisory-Locks unsicher)")
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._release()
+
+    def trigger(self, name: str) -> bool:
+        """Job sofort auf diesem Worker starten (Admin) - False wenn er bereits läuft"""
+        return task_manager.submit("scheduled_job", key=name, name=name)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if await self._ensure_leader():
+                    await self._run_due_jobs()
+            except Exception as e:
+                logger.warning(f"Scheduler-Tick fehlgeschlagen: {e}")
+            await asyncio.sleep(self.tick_seconds)
+
+    async def _ensure_leader(self) -> bool:
+        """
+        Leader bleiben bzw. werden
+
+        Nicht-Leader halten keine Verbindung offen, sondern versuchen es
+        bei jedem Tick neu.
+        """
+        if self.is_leader:
+            try:
+                await self._lock_conn.fetchval("SELECT 1", timeout=self.tick_seconds)
+                return True
+            except Exception as e:
+                logger.warning(f"Scheduler-Leader verloren: {e}")
+                await self._release()
+                return False
+
+        try:
+            self._lock_conn = await asyncpg.connect(settings.DIRECT_DATABASE_URL, timeout=self.tick_seconds)
+            self.is_leader = await self._lock_conn.fetchval("SELECT pg_try_advisory_lock($1)", SCHEDULER_LOCK_KEY)
+        except Exception as e:
+            logger.debug(f"Scheduler-Lock nicht möglich: {e}")
+            self.is_leader = False
+
+        if self.is_leader:
+            logger.info("Scheduler: dieser Worker ist Leader")
+        else:
+            await self._release()
+        return self.is_leader
+
+    async def _release(self) -> None:
+        self.is_leader = False
+        if self._lock_conn is not None:
+            try:
+                await self._lock_conn.close(timeout=1)
+            except Exception:
+                self._lock_conn.terminate()
+            self._lock_conn = None
+
+    async def _run_due_jobs(self) -> None:
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(ScheduledJob.name, ScheduledJob.last_started_at))
+            last_started = dict(result.all())
+
+        for job in self.jobs.values():
+            if job.is_due(last_started.get(job.name), now):
+                self.trigger(job.name)
+
+    async def execute(self, db: AsyncSession, name: str) -> None:
+        """
+        Task-Handler "scheduled_job": Job unter seiner Advisory-Lock ausführen
+
+        Hält ein anderer Worker die Lock (Leader-Lauf oder manueller Start),
+        wird der Lauf übersprungen.
+        """
+        if settings.DIRECT_DATABASE_URL is None:
+            raise RuntimeError("Job-Lock braucht POSTGRES_DIRECT_HOST im PgBouncer-Modus")
+        lock_conn = await asyncpg.connect(settings.DIRECT_DATABASE_URL, timeout=self.tick_seconds)
+        try:
+            if not await lock_conn.fetchval("SELECT pg_try_advisory_lock($1, hashtext($2))", JOB_LOCK_CLASS, name):
+                logger.info(f"Job {name} läuft bereits auf einem anderen Worker - übersprungen")
+                return
+            await self._run_job(db, self.jobs[name])
+        finally:
+            # Schließen gibt die Lock frei
+            await lock_conn.close(timeout=1)
+
+    async def _run_job(self, db: AsyncSession, job: Job) -> None:
+        """Job ausführen und Laufzeit festhalten"""
+        name = job.name
+        started_at = datetime.utcnow()
+        await _record(name, last_started_at=started_at, last_status="running")
+
+        started = time.perf_counter()
+        try:
+            result = await job.func(db)
+        except Exception as e:
+            await db.rollback()
+            duration_ms = round((time.perf_counter() - started) * 1000, 1)
+            await _record(
+                name,
+                last_finished_at=datetime.utcnow(),
+                last_status="failed",
+                last_error=f"{type(e).__name__}: {e}",
+                runs=1,
+                failures=1,
+                last_duration_ms=duration_ms,
+                total_duration_ms=duration_ms,
+                max_duration_ms=duration_ms,
+            )
+            raise
+
+        duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        await _record(
+            name,
+            last_finished_at=datetime.utcnow(),
+            last_status="ok",
+            last_error=None,
+            last_result=json.dumps(result, default=str) if result is not None else None,
+            runs=1,
+            failures=0,
+            last_duration_ms=duration_ms,
+            total_duration_ms=duration_ms,
+            max_duration_ms=duration_ms,
+        )
+        logger.info(f"Job {name} fertig in {duration_ms} ms: {result}")
+
+    async def status(self, db: AsyncSession) -> List[Dict[str, Any]]:
+        """Jobs mit Zeitplan und Statistik aus scheduled_jobs"""
+        result = await db.execute(select(ScheduledJob))
+        rows = {row.name: row for row in result.scalars().all()}
+        now = datetime.utcnow()
+
+        jobs = []
+        for job in self.jobs.values():
+            row = rows.get(job.name)
+            last_started_at = row.last_started_at if row else None
+            jobs.append({
+                "name": job.name,
+                "description": job.description,
+                "schedule": job.schedule(),
+                "next_run": job.next_run(last_started_at, now),
+                "last_started_at": last_started_at,
+                "last_finished_at": row.last_finished_at if row else None,
+                "last_status": row.last_status if row else None,
+                "last_error": row.last_error if row else None,
+                "last_result": json.loads(row.last_result) if row and row.last_result else None,
+                "runs": row.runs if row else 0,
+                "failures": row.failures if row else 0,
+                "last_duration_ms": row.last_duration_ms if row else None,
+                "avg_duration_ms": round(row.total_duration_ms / row.runs, 1) if row and row.runs else None,
+                "max_duration_ms": row.max_duration_ms if row else None,
+            })
+        return jobs
+
+
+scheduler = Scheduler(settings.SCHEDULER_TICK_SECONDS)
+
+task_manager.register("scheduled_job", scheduler.execute, concurrency=settings.SCHEDULER_CONCURRENCY)
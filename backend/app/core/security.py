@@ -328,18 +328,23 @@ async def get_current_user_optional(
     return user
 
 
-def create_token_pair(user_id: int) -> dict:
+def create_token_pair(user_id: int, is_admin: bool = False) -> dict:
     """
     Erstellt Access und Refresh Token Pair
     
     Args:
         user_id: User ID
+        is_admin: Setzt den "adm"-Claim im Access Token (nur für die
+            Wartungsmodus-Middleware, Endpoints prüfen weiterhin gegen die DB)
         
     Returns:
         dict: {"access_token": ..., "refresh_token": ..., "token_type": "bearer"}
     """
+    access_data = {"sub": str(user_id)}
+    if is_admin:
+        access_data["adm"] = True
     access_token = SecurityService.create_access_token(
-        data={"sub": str(user_id)}
+        data=access_data
     )
     refresh_token = SecurityService.create_refresh_token(
         data={"sub": str(user_id)}
@@ -0,0 +1,259 @@
+"""
+Vereinskasse - Hintergrund-Tasks
+Datei: backend/app/core/tasks.py
+
+Überwachte Hintergrund-Tasks statt nacktem asyncio.create_task:
+
+- jeder Task bekommt eine eigene DB-Session (die Request-Session ist nach
+  der Response geschlossen)
+- Parallelität je Task-Typ begrenzt (Semaphore), weitere warten
+- Fehler werden geloggt und gezählt, Referenzen gehalten (kein GC)
+- beim Shutdown: keine neuen Tasks, laufende bis TASK_DRAIN_TIMEOUT_SECONDS
+  abarbeiten, Rest abbrechen. Der Zustand liegt in der DB (z.B. pending
+  Transaktion) - recover() setzt solche Tasks beim nächsten Start fort.
+- recover() läuft nur auf einem Worker: wer beim Start die Session-
+  Advisory-Lock RECOVERY_LOCK_KEY bekommt, hält sie bis zum Shutdown.
+  Stirbt er, übernimmt der nächste startende Worker seine offene Arbeit.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+import asyncpg
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+RECOVERY_LOCK_KEY = 0x7265636F76  # "recov"
+
+# handler(db, **payload)
+TaskHandler = Callable[..., Awaitable[Any]]
+# recover(db) -> [(key, payload), ...]
+RecoverHandler = Callable[[AsyncSession], Awaitable[List[Tuple[Optional[str], Dict[str, Any]]]]]
+
+
+class TaskType:
+    """
+    Registrierter Task-Typ mit Parallelitäts-Limit und Zählern
+    """
+
+    def __init__(self, name: str, handler: TaskHandler, concurrency: int, recover: Optional[RecoverHandler]):
+        self.name = name
+        self.handler = handler
+        self.concurrency = concurrency
+        self.recover = recover
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+        self.submitted = 0
+        self.queued = 0
+        self.running = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.total_duration = 0.0
+        self.max_duration = 0.0
+        self.last_error: Optional[str] = None
+        self.last_error_at: Optional[float] = None
+
+    def stats(self) -> Dict[str, Any]:
+        finished = self.succeeded + self.failed
+        return {
+            "concurrency": self.concurrency,
+            "submitted": self.submitted,
+            "queued": self.queued,
+            "running": self.running,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "avg_duration_ms": round(self.total_duration / finished * 1000, 1) if finished else None,
+            "max_duration_ms": round(self.max_duration * 1000, 1),
+            "last_error": self.last_error,
+            "last_error_age_seconds": round(time.monotonic() - self.last_error_at) if self.last_error_at else None,
+        }
+
+
+class TaskManager:
+    """
+    Startet und überwacht Hintergrund-Tasks dieses Workers
+    """
+
+    def __init__(self):
+        self.types: Dict[str, TaskType] = {}
+        self.accepting = False
+        self._tasks: Set[asyncio.Task] = set()
+        self._active_keys: Set[Tuple[str, str]] = set()
+        self._recovery_conn: Optional[asyncpg.Connection] = None
+
+    def register(
+        self,
+        name: str,
+        handler: TaskHandler,
+        concurrency: int,
+        recover: Optional[RecoverHandler] = None,
+    ) -> None:
+        """
+        Task-Typ anmelden (beim Import des Service-Moduls)
+
+        Args:
+            name: Typ, z.B. "sumup_poll"
+            handler: async handler(db, **payload)
+            concurrency: Max. gleichzeitig laufende Tasks dieses Typs
+            recover: Liefert beim Start offene Arbeit aus der DB
+        """
+        self.types[name] = TaskType(name, handler, concurrency, recover)
+
+    def submit(self, name: str, /, key: Optional[str] = None, **payload) -> bool:
+        """
+        Task einreihen
+
+        Args:
+            name: Registrierter Task-Typ
+            key: Optional - läuft bereits ein Task mit diesem Key, wird
+                kein zweiter gestartet (z.B. Checkout-ID)
+            **payload: Argumente für den Handler (auch "name" möglich,
+                der Typ ist positional-only)
+
+        Returns:
+            bool: False wenn abgelehnt (Shutdown läuft oder Key aktiv)
+        """
+        task_type = self.types[name]
+        if not self.accepting:
+            logger.warning(f"Task {name} abgelehnt (Shutdown): {payload}")
+            return False
+        if key is not None:
+            if (name, key) in self._active_keys:
+                return False
+            self._active_keys.add((name, key))
+
+        task_type.submitted += 1
+        task = asyncio.create_task(self._run(task_type, key, payload), name=f"{name}:{key or ''}")
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def _run(self, task_type: TaskType, key: Optional[str], payload: Dict[str, Any]) -> None:
+        task_type.queued += 1
+        waiting = True
+        try:
+            async with task_type.semaphore:
+                task_type.queued -= 1
+                waiting = False
+                task_type.running += 1
+                started = time.perf_counter()
+                try:
+                    async with AsyncSessionLocal() as db:
+                        await task_type.handler(db, **payload)
+                    task_type.succeeded += 1
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    task_type.failed += 1
+                    task_type.last_error = f"{type(e).__name__}: {e}"
+                    task_type.last_error_at = time.monotonic()
+                    logger.exception(f"Task {task_type.name} fehlgeschlagen: {payload}")
+                finally:
+                    duration = time.perf_counter() - started
+                    task_type.running -= 1
+                    task_type.total_duration += duration
+                    task_type.max_duration = max(task_type.max_duration, duration)
+        except asyncio.CancelledError:
+            task_type.cancelled += 1
+            logger.warning(f"Task {task_type.name} abgebrochen: {payload}")
+            raise
+        finally:
+            if waiting:
+                task_type.queued -= 1
+            if key is not None:
+                self._active_keys.discard((task_type.name, key))
+
+    async def _acquire_recovery_lock(self) -> bool:
+        """
+        Session-Lock RECOVERY_LOCK_KEY auf eigener Verbindung (wie der
+        Scheduler über DIRECT_DATABASE_URL, nicht über PgBouncer)
+        """
+        if settings.DIRECT_DATABASE_URL is None:
+            # Ohne Lock lieber doppelt pollen (Buchung ist idempotent) als gar nicht
+            logger.warning("PgBouncer-Modus ohne POSTGRES_DIRECT_HOST: jeder Worker nimmt offene Tasks wieder auf")
+            return True
+        try:
+            self._recovery_conn = await asyncpg.connect(settings.DIRECT_DATABASE_URL, timeout=10)
+            if await self._recovery_conn.fetchval("SELECT pg_try_advisory_lock($1)", RECOVERY_LOCK_KEY):
+                return True
+        except Exception as e:
+            logger.warning(f"Recovery-Lock nicht verfügbar: {e}")
+        await self._release_recovery_lock()
+        return False
+
+    async def _release_recovery_lock(self) -> None:
+        if self._recovery_conn is not None:
+            try:
+                # Schließen gibt die Lock frei
+                await self._recovery_conn.close(timeout=1)
+            except Exception:
+                self._recovery_conn.terminate()
+            self._recovery_conn = None
+
+    async def start(self) -> None:
+        """Neue Tasks annehmen und offene Arbeit aus der DB wieder aufnehmen"""
+        self.accepting = True
+        if not any(task_type.recover for task_type in self.types.values()):
+            return
+        if not await self._acquire_recovery_lock():
+            logger.info("Offene Tasks nimmt ein anderer Worker wieder auf")
+            return
+        for task_type in self.types.values():
+            if task_type.recover is None:
+                continue
+            try:
+                async with AsyncSessionLocal() as db:
+                    pending = await task_type.recover(db)
+                for key, payload in pending:
+                    self.submit(task_type.name, key=key, **payload)
+                if pending:
+                    logger.info(f"{len(pending)} offene Tasks {task_type.name} wieder aufgenommen")
+            except Exception as e:
+                logger.warning(f"Offene Tasks {task_type.name} nicht wiederherstellbar: {e}")
+
+    async def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Shutdown: keine neuen Tasks, laufende abarbeiten lassen (drain)
+
+        Nach timeout Sekunden wird der Rest abgebrochen; recover() nimmt
+        ihn beim nächsten Start wieder auf.
+        """
+        if timeout is None:
+            timeout = settings.TASK_DRAIN_TIMEOUT_SECONDS
+        self.accepting = False
+        try:
+            await self._drain(timeout)
+        finally:
+            # Erst nach dem Drain: abgebrochene Tasks nimmt der nächste Start auf
+            await self._release_recovery_lock()
+
+    async def _drain(self, timeout: float) -> None:
+        if not self._tasks:
+            return
+
+        logger.info(f"Warte auf {len(self._tasks)} Hintergrund-Tasks (max. {timeout}s)")
+        done, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            logger.warning(f"{len(pending)} Hintergrund-Tasks beim Shutdown abgebrochen")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "accepting": self.accepting,
+            "recovery_lock": self._recovery_conn is not None,
+            "active": len(self._tasks),
+            "types": {name: task_type.stats() for name, task_type in self.types.items()},
+        }
+
+
+task_manager = TaskManager()
@@ -6,9 +6,17 @@ from app.db.session import Base
 # Import ALLE models hier damit SQLAlchemy sie kennt
 from app.models.user import User
 from app.models.guest import Guest
+from app.models.guest_tab import GuestTab
 from app.models.products import Product
 from app.models.transaction import Transaction
 from app.models.purchase import Purchase
 from app.models.settings import SystemSettings
+from app.models.password_reset import PasswordResetCode
+from app.models.daily_sales import DailySales
+from app.models.closing import DailyClosing
+from app.models.balance_checkpoint import BalanceCheckpoint
+from app.models.transaction_archive import TransactionArchive
+from app.models.scheduled_job import ScheduledJob
+from app.models.rate_limit_bucket import RateLimitBucket
 
 # Wichtig: Alle müssen importiert sein, damit Relationships funktionieren!
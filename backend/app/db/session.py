@@ -5,20 +5,92 @@ Datei: backend/app/db/session.py
 Async Database Session Management
 """
 
-from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+import asyncio
+import logging
+import time
+from typing import AsyncGenerator, Optional, Tuple
+from uuid import uuid4
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
+from app.core.metrics import DurationStats
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue Pool, der die Wartezeit beim Checkout misst"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = DurationStats()
+    
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.wait_stats.observe(time.perf_counter() - start)
+
+
+def pool_limits() -> Tuple[int, int]:
+    """
+    Teilt DB_CONNECTION_BUDGET auf die uvicorn-Worker auf
+    
+    Returns:
+        Tuple[int, int]: (pool_size, max_overflow) pro Worker
+    """
+    per_worker = max(1, settings.DB_CONNECTION_BUDGET // max(1, settings.WORKERS))
+    pool_size = max(1, per_worker // 2)
+    return pool_size, per_worker - pool_size
+
+
+def _connect_args() -> dict:
+    if not settings.DB_PGBOUNCER_MODE:
+        return {}
+    # PgBouncer (Transaction Pooling): keine benannten Prepared Statements
+    # über Transaktionsgrenzen hinweg wiederverwenden
+    return {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+    }
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    pool_size, max_overflow = pool_limits()
+    return create_async_engine(
+        url,
+        echo=settings.DEBUG,
+        future=True,
+        pool_pre_ping=True,
+        poolclass=InstrumentedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        connect_args=_connect_args(),
+    )
+
+
+def pool_status(db_engine: AsyncEngine) -> dict:
+    """Pool-Auslastung und Checkout-Wartezeiten für Monitoring"""
+    pool = db_engine.pool
+    return {
+        "pool_size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "max_overflow": pool._max_overflow,
+        "wait": pool.wait_stats.snapshot(),
+    }
+
 
 # Async Engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    future=True,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
-)
+engine = _create_engine(settings.DATABASE_URL)
 
 # Session Factory
 AsyncSessionLocal = async_sessionmaker(
@@ -29,17 +101,180 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
+# Read-only Session Factory: gleicher Pool, aber Transaktionen starten als
+# "BEGIN READ ONLY" (asyncpg setzt das im BEGIN selbst, kein extra Roundtrip)
+ReadOnlySessionLocal = async_sessionmaker(
+    engine.execution_options(postgresql_readonly=True),
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
+
+# Optionales Read-Replica (POSTGRES_REPLICA_HOST)
+replica_engine: Optional[AsyncEngine] = (
+    _create_engine(settings.REPLICA_DATABASE_URL) if settings.REPLICA_DATABASE_URL else None
+)
+
+ReplicaSessionLocal = async_sessionmaker(
+    replica_engine.execution_options(postgresql_readonly=True),
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+) if replica_engine is not None else None
+
+# HTTP-Methoden, die nur lesen
+READ_ONLY_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
 # Base Class für Models
 Base = declarative_base()
 
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+# Replikations-Lag in Sekunden; 0 wenn alles repliziert ist (auch bei
+# idle Primary) oder die Instanz gar kein Standby ist
+REPLICA_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class ReplicaHealth:
+    """
+    Gecachter Lag-/Erreichbarkeits-Check für das Read-Replica
+    
+    Wird höchstens alle REPLICA_HEALTH_CHECK_INTERVAL Sekunden geprüft.
+    Replica ist nutzbar, wenn es erreichbar ist und der Lag unter
+    REPLICA_MAX_LAG_SECONDS liegt.
+    """
+    
+    def __init__(self, max_lag_seconds: float, check_interval: float):
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self.usable = False
+        self.lag_seconds: Optional[float] = None
+        self.checked_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+    
+    async def is_usable(self) -> bool:
+        if replica_engine is None:
+            return False
+        
+        if self.checked_at is not None and time.monotonic() - self.checked_at < self.check_interval:
+            return self.usable
+        
+        async with self._lock:
+            # Ein anderer Request hat inzwischen geprüft
+            if self.checked_at is not None and time.monotonic() - self.checked_at < self.check_interval:
+                return self.usable
+            
+            try:
+                async with replica_engine.connect() as conn:
+                    lag = await asyncio.wait_for(
+                        conn.scalar(REPLICA_LAG_QUERY),
+                        timeout=self.check_interval
+                    )
+                self.lag_seconds = float(lag)
+                self.usable = self.lag_seconds <= self.max_lag_seconds
+                if not self.usable:
+                    logger.warning(f"Replica-Lag {self.lag_seconds:.1f}s - Fallback auf Primary")
+            except Exception as e:
+                self.lag_seconds = None
+                self.usable = False
+                logger.warning(f"Replica nicht erreichbar - Fallback auf Primary: {e}")
+            
+            self.checked_at = time.monotonic()
+            return self.usable
+    
+    def mark_down(self) -> None:
+        """Replica bis zum nächsten Check als nicht nutzbar markieren"""
+        self.usable = False
+        self.checked_at = time.monotonic()
+    
+    def status(self) -> dict:
+        return {
+            "configured": replica_engine is not None,
+            "usable": self.usable,
+            "lag_seconds": self.lag_seconds,
+            "max_lag_seconds": self.max_lag_seconds,
+        }
+
+
+replica_health = ReplicaHealth(
+    max_lag_seconds=settings.REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.REPLICA_HEALTH_CHECK_INTERVAL,
+)
+
+
+async def get_db_readonly() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency für reine Lese-Zugriffe
+    
+    Transaktion läuft READ ONLY, es gibt keinen Commit. Beim Schließen wird
+    die Transaktion beendet und die Verbindung sofort an den Pool zurückgegeben.
+    
+    Yields:
+        AsyncSession: Read-only Database Session
+    """
+    async with ReadOnlySessionLocal() as session:
+        yield session
+
+
+async def reporting_sessionmaker() -> async_sessionmaker:
+    """
+    Session-Factory für lange Lese-Streams (z.B. StreamingResponse)
+    
+    Request-Dependencies sind beim Streamen schon beendet, der Generator
+    öffnet seine Session daher selbst - Replica wenn nutzbar, sonst
+    Read-only Primary.
+    """
+    if await replica_health.is_usable():
+        return ReplicaSessionLocal
+    return ReadOnlySessionLocal
+
+
+async def get_db_replica() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency für Reporting- und Listen-Endpoints
+    
+    Nutzt das Read-Replica, wenn konfiguriert, erreichbar und innerhalb
+    des Staleness-Limits; sonst eine Read-only Session auf dem Primary.
+    
+    Yields:
+        AsyncSession: Read-only Database Session
+    """
+    if not await replica_health.is_usable():
+        async with ReadOnlySessionLocal() as session:
+            yield session
+        return
+    
+    async with ReplicaSessionLocal() as session:
+        try:
+            yield session
+        except DBAPIError:
+            replica_health.mark_down()
+            raise
+
+
+async def get_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
     """
     Dependency für FastAPI um DB Session zu bekommen
     
+    GET/HEAD Requests bekommen eine Read-only Session (siehe get_db_readonly).
+    Da Auth-Dependencies dieselbe gecachte Dependency nutzen, teilen sich
+    Route und get_current_user weiterhin eine Session pro Request.
+    
     Yields:
         AsyncSession: Database Session
     """
+    if request.method in READ_ONLY_METHODS:
+        async with ReadOnlySessionLocal() as session:
+            yield session
+        return
+    
     async with AsyncSessionLocal() as session:
         try:
             yield session
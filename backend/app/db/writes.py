@@ -0,0 +1,68 @@
+"""
+Vereinskasse - Write Helpers
+Datei: backend/app/db/writes.py
+
+INSERT/UPDATE ... RETURNING statt add() + commit() + refresh():
+IDs, Defaults und berechnete Werte kommen im selben Statement zurück,
+der zusätzliche SELECT-Roundtrip von refresh() entfällt.
+"""
+
+from typing import Optional, Type, TypeVar
+
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+ModelT = TypeVar("ModelT")
+
+
+async def insert_returning(db: AsyncSession, model: Type[ModelT], **values) -> ModelT:
+    """
+    INSERT ... RETURNING für eine Zeile
+
+    Python-seitige Column-Defaults (z.B. created_at) werden wie beim
+    ORM-Flush angewendet.
+
+    Args:
+        db: Database Session
+        model: ORM Model-Klasse
+        **values: Spaltenwerte
+
+    Returns:
+        Vollständig geladenes ORM-Objekt (in der Session registriert)
+    """
+    result = await db.execute(
+        insert(model).values(**values).returning(model)
+    )
+    return result.scalar_one()
+
+
+async def update_returning(
+    db: AsyncSession,
+    model: Type[ModelT],
+    *where,
+    **values
+) -> Optional[ModelT]:
+    """
+    UPDATE ... WHERE ... RETURNING für höchstens eine Zeile
+
+    Werte dürfen SQL-Ausdrücke sein (z.B. balance=User.balance - 2.5),
+    damit Read-Modify-Write atomar in der DB passiert. Bereits geladene
+    Objekte in der Session (z.B. current_user) werden aktualisiert.
+
+    Args:
+        db: Database Session
+        model: ORM Model-Klasse
+        *where: WHERE-Bedingungen
+        **values: Neue Spaltenwerte
+
+    Returns:
+        Aktualisiertes ORM-Objekt oder None wenn keine Zeile gepasst hat
+    """
+    result = await db.execute(
+        update(model)
+        .where(*where)
+        .values(**values)
+        .returning(model)
+        .execution_options(synchronize_session="fetch")
+    )
+    return result.scalar_one_or_none()
@@ -1,7 +1,19 @@
+import logging
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.api import api_router
 from app.core.config import settings
+from app.core.maintenance import MaintenanceMiddleware, maintenance_watcher
+from app.core.scheduler import scheduler
+from app.core.tasks import task_manager
+from app.db.session import AsyncSessionLocal
+from app.services.partition_service import PartitionService
+from app.services.rfid_index import rfid_index_watcher
+from app.services.scheduled_jobs import register_jobs
+from app.services.sumup_service import close_sumup_client
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="Vereinskasse API",
@@ -9,6 +21,9 @@ app = FastAPI(
     openapi_url="/api/v1/openapi.json"
 )
 
+# Wartungsmodus (vor CORS registriert -> läuft innerhalb, 503 bekommt CORS-Header)
+app.add_middleware(MaintenanceMiddleware)
+
 # CORS Configuration
 app.add_middleware(
     CORSMiddleware,
@@ -18,6 +33,44 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.on_event("startup")
+async def startup_event():
+    """RFID-Index wärmen, damit der erste Karten-Tap nicht an die DB geht; Partitionen anlegen"""
+    if settings.RFID_ENABLED:
+        # LISTEN rfid_index, dann wärmen
+        await rfid_index_watcher.start()
+
+    # Monatspartitionen für die nächsten Monate (idempotent, Advisory-Lock)
+    try:
+        async with AsyncSessionLocal() as db:
+            created = await PartitionService(db).ensure_partitions()
+            await db.commit()
+        if created:
+            logger.info(f"Transaktions-Partitionen angelegt: {', '.join(created)}")
+    except Exception as e:
+        logger.warning(f"Transaktions-Partitionen konnten nicht angelegt werden: {e}")
+
+    await maintenance_watcher.start()
+    # Hintergrund-Tasks annehmen, offene SumUp-Zahlungen weiter pollen bzw. fegen
+    await task_manager.start()
+    # Wartungsjobs - ausgeführt nur vom Leader (Advisory-Lock)
+    if settings.SCHEDULER_ENABLED:
+        register_jobs(scheduler)
+        await scheduler.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Keine neuen Jobs, Leader-Lock freigeben
+    await scheduler.stop()
+    # Dann laufende Tasks abarbeiten lassen (Zahlungsbestätigungen)
+    await task_manager.stop()
+    await close_sumup_client()
+    await maintenance_watcher.stop()
+    await rfid_index_watcher.stop()
+
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
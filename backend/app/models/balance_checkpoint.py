@@ -0,0 +1,41 @@
+"""
+Vereinskasse - Guthaben-Checkpoints
+Datei: backend/app/models/balance_checkpoint.py
+
+Je Abgleich-Lauf eine Zeile pro Mitglied: Saldo laut Transaktions-Historie
+bis last_transaction_id. Der nächste Lauf summiert nur Transaktionen
+oberhalb davon und vergleicht mit users.balance.
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer
+from app.core.money import Money
+from app.db.session import Base
+
+
+class BalanceCheckpoint(Base):
+    """
+    Checkpoint + Abgleich-Ergebnis eines Mitglieds (append-only)
+    """
+    __tablename__ = "balance_checkpoints"
+    __table_args__ = (
+        # Letzter Checkpoint je Mitglied (LATERAL ... ORDER BY id DESC LIMIT 1)
+        Index("ix_balance_checkpoints_user_latest", "user_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    # Saldo laut Historie bis einschließlich last_transaction_id (0 = keine)
+    last_transaction_id = Column(Integer, nullable=False)
+    balance = Column(Money, nullable=False)
+
+    # Abgleich zum Zeitpunkt des Laufs (inkl. Transaktionen nach dem Checkpoint)
+    expected_balance = Column(Money, nullable=False)
+    observed_balance = Column(Money, nullable=False)  # users.balance
+    drift = Column(Money, nullable=False)  # observed - expected
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<BalanceCheckpoint user={self.user_id} txn<={self.last_transaction_id} drift={self.drift}>"
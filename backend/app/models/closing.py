@@ -0,0 +1,56 @@
+"""
+Vereinskasse - Tagesabschluss (Z-Bon)
+Datei: backend/app/models/closing.py
+
+Unveränderlicher Snapshot eines Kassenabschlusses. Der Zeitraum reicht
+vom Ende des vorherigen Abschlusses bis zum Zeitpunkt des Abschlusses;
+alle Kennzahlen werden beim Anlegen einmal berechnet und nie geändert.
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer, Text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import relationship
+from app.core.money import Money
+from app.db.session import Base
+
+
+class DailyClosing(Base):
+    """
+    Tagesabschluss - UPDATE/DELETE per Trigger gesperrt (Migration 0004)
+    """
+    __tablename__ = "daily_closings"
+
+    id = Column(Integer, primary_key=True)
+    closing_number = Column(Integer, unique=True, nullable=False)
+    business_date = Column(Date, nullable=False, index=True)
+
+    # Zeitraum (naive UTC), period_start NULL = erster Abschluss
+    period_start = Column(DateTime, nullable=True)
+    period_end = Column(DateTime, nullable=False)
+
+    # Umsätze im Zeitraum
+    transaction_count = Column(Integer, nullable=False)
+    sales_total = Column(Money, nullable=False)
+    member_sales_total = Column(Money, nullable=False)
+    guest_sales_total = Column(Money, nullable=False)
+    top_up_total = Column(Money, nullable=False)
+
+    # Stand zum Abschluss-Zeitpunkt
+    open_tabs_count = Column(Integer, nullable=False)
+    open_tabs_total = Column(Money, nullable=False)
+    member_credit_total = Column(Money, nullable=False)  # Guthaben = Verbindlichkeit des Vereins
+    member_debt_total = Column(Money, nullable=False)  # negative Salden (Dispo)
+
+    # Aufschlüsselungen
+    payments = Column(JSONB, nullable=False)  # je Transaktionstyp + Zahlungsart
+    tax_rates = Column(JSONB, nullable=False)  # je MwSt-Satz: netto/steuer/brutto
+
+    note = Column(Text, nullable=True)
+    created_by_admin_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    created_by_admin = relationship("User")
+
+    def __repr__(self):
+        return f"<DailyClosing Z-{self.closing_number} {self.business_date}>"
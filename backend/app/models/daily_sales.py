@@ -0,0 +1,53 @@
+"""
+Vereinskasse - Daily Sales Aggregate
+Datei: backend/app/models/daily_sales.py
+
+Tagesumsätze je (Kalendertag in settings.TIMEZONE, Produkt, Kategorie,
+Zahlungsart, Mitglied/Gast). Wird in derselben Transaktion wie der
+Verkauf hochgezählt und kann aus der Historie neu aufgebaut werden.
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, Date, DateTime, Enum, ForeignKey, Index, Integer, String
+from app.core.money import Money
+from app.db.session import Base
+from app.models.products import ProductCategory
+
+
+class DailySales(Base):
+    """
+    Eine Zeile pro Aggregat-Schlüssel und Tag
+    """
+    __tablename__ = "daily_sales"
+    __table_args__ = (
+        # Ziel für ON CONFLICT; Mitglieder-Käufe ohne Produkt haben product_id/category NULL
+        Index(
+            "uq_daily_sales_key",
+            "sales_date",
+            "product_id",
+            "category",
+            "payment_method",
+            "customer_type",
+            unique=True,
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+
+    # Schlüssel
+    sales_date = Column(Date, nullable=False)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=True)
+    category = Column(Enum(ProductCategory), nullable=True)
+    payment_method = Column(String(50), nullable=False)
+    customer_type = Column(String(10), nullable=False)  # "member" / "guest"
+
+    # Kennzahlen
+    quantity = Column(Integer, nullable=False, default=0)  # 0 bei Beträgen ohne Produkt
+    revenue = Column(Money, nullable=False, default=0.0)
+    line_count = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<DailySales {self.sales_date} {self.customer_type}/{self.payment_method} {self.revenue}€>"
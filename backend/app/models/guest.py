@@ -1,10 +1,11 @@
 """
 Guest Model - für Gäste-Verwaltung
 """
-from sqlalchemy import Column, Integer, String, Float, DateTime
+from sqlalchemy import Column, Integer, String, DateTime
 from sqlalchemy.orm import relationship
 from datetime import datetime
-from app.db.base import Base
+from app.core.money import Money
+from app.db.session import Base
 
 
 class Guest(Base):
@@ -17,7 +18,7 @@ class Guest(Base):
     name = Column(String(100), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     closed_at = Column(DateTime, nullable=True)
-    total_amount = Column(Float, default=0.0, nullable=False)
+    total_amount = Column(Money, default=0.0, nullable=False)
     
     # Relationships
     tab_items = relationship("GuestTab", back_populates="guest", cascade="all, delete-orphan")
@@ -1,10 +1,11 @@
 """
 Guest Tab Model - Tab-Positionen für Gäste
 """
-from sqlalchemy import Column, Integer, Float, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, DateTime, Boolean, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
-from app.db.base import Base
+from app.core.money import Money
+from app.db.session import Base
 
 
 class GuestTab(Base):
@@ -12,13 +13,24 @@ class GuestTab(Base):
     GuestTab Model - Einzelne Positionen auf einem Gast-Tab
     """
     __tablename__ = "guest_tabs"
+    __table_args__ = (
+        # Eine offene Zeile pro Gast/Produkt/Preis - Ziel für ON CONFLICT (Mengen-Merge)
+        Index(
+            "uq_guest_tabs_open_line",
+            "guest_id",
+            "product_id",
+            "price_per_item",
+            unique=True,
+            postgresql_where=text("paid = false"),
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    guest_id = Column(Integer, ForeignKey("guests.id"), nullable=False)
+    guest_id = Column(Integer, ForeignKey("guests.id"), nullable=False, index=True)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
     quantity = Column(Integer, default=1, nullable=False)
-    price_per_item = Column(Float, nullable=False)
-    total_amount = Column(Float, nullable=False)
+    price_per_item = Column(Money, nullable=False)
+    total_amount = Column(Money, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     paid = Column(Boolean, default=False, nullable=False)
     
@@ -4,7 +4,7 @@ Password Reset Model
 from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean
 from sqlalchemy.orm import relationship
 from datetime import datetime, timedelta
-from app.db.base import Base
+from app.db.session import Base
 
 class PasswordResetCode(Base):
     __tablename__ = "password_reset_codes"
@@ -8,6 +8,7 @@ Produkte mit Kategorien und dualen Preislisten
 from datetime import datetime
 from sqlalchemy import Boolean, Column, DateTime, Enum, Float, Integer, String, Text
 from sqlalchemy.orm import relationship
+from app.core.money import Money
 import enum
 from app.db.session import Base
 
@@ -38,8 +39,8 @@ class Product(Base):
     variant = Column(String(50), nullable=True)
     
     # Preise
-    member_price = Column(Float, nullable=False)
-    guest_price = Column(Float, nullable=False)
+    member_price = Column(Money, nullable=False)
+    guest_price = Column(Money, nullable=False)
     
     # MwSt
     tax_rate = Column(Float, nullable=False, default=0.19)  # 19% Standard
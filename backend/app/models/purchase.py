@@ -4,6 +4,7 @@ Purchase Model - NUR für Mitglieder (Guest temporär deaktiviert)
 from datetime import datetime
 from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String
 from sqlalchemy.orm import relationship
+from app.core.money import Money
 from app.db.session import Base
 
 
@@ -22,14 +23,14 @@ class Purchase(Base):
     
     # Details
     quantity = Column(Integer, nullable=False, default=1)
-    unit_price = Column(Float, nullable=False)
-    total_price = Column(Float, nullable=False)
+    unit_price = Column(Money, nullable=False)
+    total_price = Column(Money, nullable=False)
     tax_rate = Column(Float, nullable=False)
-    tax_amount = Column(Float, nullable=False)
+    tax_amount = Column(Money, nullable=False)
     
     # Balance
-    balance_before = Column(Float, nullable=True)
-    balance_after = Column(Float, nullable=True)
+    balance_before = Column(Money, nullable=True)
+    balance_after = Column(Money, nullable=True)
     
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
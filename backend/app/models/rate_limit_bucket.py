@@ -0,0 +1,26 @@
+"""
+Vereinskasse - Rate-Limit Buckets
+Datei: backend/app/models/rate_limit_bucket.py
+
+Gemeinsamer Token-Bucket aller Worker für ausgehende API-Aufrufe
+(app/core/rate_limiter.py). Eine Zeile je Bucket; Nachfüllen und
+Entnehmen passieren atomar in einem UPDATE.
+"""
+
+from sqlalchemy import Column, DateTime, Float, String
+from app.db.session import Base
+
+
+class RateLimitBucket(Base):
+    """
+    Token-Bucket (Stand bei updated_at, Nachfüllen rechnet der Limiter)
+    """
+    __tablename__ = "rate_limit_buckets"
+
+    name = Column(String(50), primary_key=True)
+    # Darf negativ sein - Sperre nach 429 (Tokens werden erst "abbezahlt")
+    tokens = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<RateLimitBucket {self.name} {self.tokens:.1f}>"
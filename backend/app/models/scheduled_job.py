@@ -0,0 +1,38 @@
+"""
+Vereinskasse - Geplante Jobs
+Datei: backend/app/models/scheduled_job.py
+
+Eine Zeile je Job des In-App-Schedulers (app/core/scheduler.py): wann er
+zuletzt lief, mit welchem Ergebnis und wie lange. Die Zeile ist zugleich
+die Grundlage für die Fälligkeit - wechselt der Leader, weiß der neue,
+was schon gelaufen ist.
+"""
+
+from sqlalchemy import Column, DateTime, Float, Integer, String, Text
+from app.db.session import Base
+
+
+class ScheduledJob(Base):
+    """
+    Laufzeit-Statistik eines geplanten Jobs
+    """
+    __tablename__ = "scheduled_jobs"
+
+    name = Column(String(50), primary_key=True)
+
+    last_started_at = Column(DateTime, nullable=True)
+    last_finished_at = Column(DateTime, nullable=True)
+    # running, ok, failed
+    last_status = Column(String(20), nullable=True)
+    last_error = Column(Text, nullable=True)
+    # Ergebnis des Laufs als JSON (z.B. gelöschte Zeilen)
+    last_result = Column(Text, nullable=True)
+
+    runs = Column(Integer, nullable=False, default=0)
+    failures = Column(Integer, nullable=False, default=0)
+    last_duration_ms = Column(Float, nullable=True)
+    total_duration_ms = Column(Float, nullable=False, default=0.0)
+    max_duration_ms = Column(Float, nullable=False, default=0.0)
+
+    def __repr__(self):
+        return f"<ScheduledJob {self.name} {self.last_status}>"
@@ -2,9 +2,10 @@
 Transaction Models
 """
 import enum
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import DDL, Column, Integer, String, DateTime, ForeignKey, Index, event, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from datetime import datetime
+from app.core.money import Money
 from app.db.session import Base
 
 
@@ -33,25 +34,37 @@ class PaymentMethod(str, enum.Enum):
 
 
 class Transaction(Base):
-    """Transaction Model"""
+    """
+    Transaction Model
+
+    Monatlich nach created_at partitioniert (Migration 0008,
+    app/services/partition_service.py). Eindeutige Indizes müssen den
+    Partitionsschlüssel enthalten: PK ist (id, created_at), die Referenz
+    ist nur noch indiziert.
+    """
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Mitglieder-Historie (/transactions/my) je Partition per Index
+        Index("ix_transactions_user_id_created_at", "user_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    transaction_reference = Column(String(50), unique=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    transaction_reference = Column(String(50), index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     transaction_type = Column(String(50), nullable=False)
     status = Column(String(50), nullable=False, default="pending")
-    amount = Column(Float, nullable=False)
-    balance_before = Column(Float, nullable=True)
-    balance_after = Column(Float, nullable=True)
+    amount = Column(Money, nullable=False)
+    balance_before = Column(Money, nullable=True)
+    balance_after = Column(Money, nullable=True)
     payment_method = Column(String(50), nullable=True)
     sumup_checkout_id = Column(String(100), nullable=True)
     sumup_transaction_code = Column(String(100), nullable=True)
     transfer_to_user_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # BEHALTEN für DB-Kompatibilität
     description = Column(String, nullable=True)
     created_by_admin_id = Column(Integer, ForeignKey("users.id"), nullable=True)
-    guest_id = Column(Integer, ForeignKey("guests.id"), nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    guest_id = Column(Integer, ForeignKey("guests.id"), nullable=True, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, primary_key=True, index=True)
     completed_at = Column(DateTime, nullable=True)
 
     # Relationships
@@ -59,3 +72,19 @@ class Transaction(Base):
     transfer_to_user = relationship("User", foreign_keys=[transfer_to_user_id])  # BEHALTEN für DB-Kompatibilität
     created_by_admin = relationship("User", foreign_keys=[created_by_admin_id])
     guest = relationship("Guest", back_populates="transactions")
+
+    @classmethod
+    def generate_reference(cls, transaction_type: str) -> str:
+        import secrets
+        prefix = {"top_up": "TOP", "purchase": "TXN", "admin_adjustment": "ADJ"}.get(transaction_type, "TRX")
+        timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
+        return f"{prefix}-{timestamp}-{secrets.token_hex(4).upper()}"
+
+
+# create_all (Neuinstallation): Auffang-Partition, Monate legt
+# PartitionService.ensure_partitions beim Start an
+event.listen(
+    Transaction.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS transactions_default PARTITION OF transactions DEFAULT"),
+)
@@ -0,0 +1,40 @@
+"""
+Vereinskasse - Archivierte Transaktions-Partitionen
+Datei: backend/app/models/transaction_archive.py
+
+Eine Zeile je ausgelagertem Monat: Zeitraum, Segment-Verzeichnis und
+Prüfsummen. Partition und Käufe des Monats sind danach aus der Datenbank
+entfernt und werden aus dem Cold Archive gelesen
+(app/services/cold_archive.py).
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, String
+from app.core.money import Money
+from app.db.session import Base
+
+
+class TransactionArchive(Base):
+    """
+    Archivierter Monat der transactions-Tabelle
+    """
+    __tablename__ = "transaction_archives"
+
+    id = Column(Integer, primary_key=True)
+    partition_name = Column(String(63), unique=True, nullable=False)
+
+    # Partitionsgrenzen (naive UTC, range_end exklusiv)
+    range_start = Column(DateTime, nullable=False)
+    range_end = Column(DateTime, nullable=False, index=True)
+
+    # Verzeichnis mit den Segmenten transactions/ und purchases/
+    file_path = Column(String(500), nullable=False)
+    row_count = Column(Integer, nullable=False)
+    purchase_count = Column(Integer, nullable=False, default=0)
+    amount_total = Column(Money, nullable=False)
+    max_transaction_id = Column(Integer, nullable=True)
+
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<TransactionArchive {self.partition_name} rows={self.row_count}>"
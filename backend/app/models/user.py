@@ -2,14 +2,27 @@
 User Model mit korrigierten Relationships
 """
 from datetime import datetime
-from sqlalchemy import Boolean, Column, DateTime, Float, Integer, String, Text
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
+from app.core.money import Money
 from app.db.session import Base
 
 
 class User(Base):
     """User Model für Mitglieder und Admins"""
     __tablename__ = "users"
+    __table_args__ = (
+        # Trigram-Indizes für die Login-Suche (ILIKE '%q%'), braucht pg_trgm
+        *(
+            Index(
+                f"ix_users_{column}_trgm",
+                column,
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+            )
+            for column in ("first_name", "last_name", "username")
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     
@@ -26,7 +39,7 @@ class User(Base):
     last_name = Column(String(100), nullable=False)
     
     # Guthaben
-    balance = Column(Float, default=0.0, nullable=False)
+    balance = Column(Money, default=0.0, nullable=False)
     
     # Permissions
     is_active = Column(Boolean, default=True, nullable=False)
@@ -3,6 +3,7 @@ Guest Schemas
 """
 from typing import Optional, List
 from pydantic import BaseModel, Field
+from app.core.money import Euro
 from datetime import datetime
 
 
@@ -23,8 +24,8 @@ class GuestTabItemResponse(BaseModel):
     product_id: int
     product_name: str
     quantity: int
-    price_per_item: float
-    total_amount: float
+    price_per_item: Euro
+    total_amount: Euro
     created_at: datetime
     paid: bool
     
@@ -36,7 +37,7 @@ class GuestResponse(GuestBase):
     id: int
     created_at: datetime
     closed_at: Optional[datetime]
-    total_amount: float
+    total_amount: Euro
     is_active: bool
     tab_items: Optional[List[GuestTabItemResponse]] = []
     
@@ -1,7 +1,9 @@
 """
 Guest Tab Schemas
 """
+from typing import List
 from pydantic import BaseModel, Field
+from app.core.money import Euro
 from datetime import datetime
 
 
@@ -11,13 +13,23 @@ class GuestTabCreate(BaseModel):
     quantity: int = Field(..., gt=0)
 
 
+class GuestTabItemAdd(BaseModel):
+    product_id: int
+    quantity: int = Field(..., gt=0)
+
+
+class GuestTabItemsAdd(BaseModel):
+    """Mehrere Artikel in einem Request (z.B. eine Runde Getränke)"""
+    items: List[GuestTabItemAdd] = Field(..., min_length=1, max_length=100)
+
+
 class GuestTabResponse(BaseModel):
     id: int
     guest_id: int
     product_id: int
     quantity: int
-    price_per_item: float
-    total_amount: float
+    price_per_item: Euro
+    total_amount: Euro
     created_at: datetime
     paid: bool
     
@@ -3,6 +3,7 @@ Schemas für Products
 """
 from typing import Optional
 from pydantic import BaseModel, Field
+from app.core.money import Euro
 from app.models.products import ProductCategory
 
 
@@ -11,8 +12,8 @@ class ProductBase(BaseModel):
     description: Optional[str] = None
     category: ProductCategory
     variant: Optional[str] = Field(None, max_length=50)
-    member_price: float = Field(..., gt=0)
-    guest_price: float = Field(..., gt=0)
+    member_price: Euro = Field(..., ge=0.01)
+    guest_price: Euro = Field(..., ge=0.01)
     tax_rate: float = Field(default=0.19, ge=0, le=1)
     stock_quantity: Optional[int] = Field(None, ge=0)
     track_stock: bool = False
@@ -29,8 +30,8 @@ class ProductUpdate(BaseModel):
     description: Optional[str] = None
     category: Optional[ProductCategory] = None
     variant: Optional[str] = None
-    member_price: Optional[float] = Field(None, gt=0)
-    guest_price: Optional[float] = Field(None, gt=0)
+    member_price: Optional[Euro] = Field(None, ge=0.01)
+    guest_price: Optional[Euro] = Field(None, ge=0.01)
     tax_rate: Optional[float] = Field(None, ge=0, le=1)
     stock_quantity: Optional[int] = Field(None, ge=0)
     track_stock: Optional[bool] = None
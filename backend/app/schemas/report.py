@@ -0,0 +1,128 @@
+"""
+Schemas für Reports
+"""
+from datetime import date, datetime
+from typing import Dict, List, Optional, Union
+from pydantic import BaseModel
+from app.core.money import Euro
+from app.models.products import ProductCategory
+
+
+class DailySalesLine(BaseModel):
+    product_id: Optional[int]
+    product_name: Optional[str]
+    category: Optional[ProductCategory]
+    payment_method: str
+    customer_type: str
+    quantity: int
+    revenue: Euro
+    line_count: int
+
+
+class DailySalesDay(BaseModel):
+    sales_date: date
+    revenue: Euro
+    quantity: int
+    by_payment_method: Dict[str, Euro]
+    by_customer_type: Dict[str, Euro]
+    lines: List[DailySalesLine]
+
+
+class DailySalesReport(BaseModel):
+    date_from: date
+    date_to: date
+    revenue: Euro
+    quantity: int
+    days: List[DailySalesDay]
+
+
+class DailySalesRebuild(BaseModel):
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+
+
+class ClosingPaymentLine(BaseModel):
+    transaction_type: str
+    payment_method: str
+    count: int
+    amount: Euro
+
+
+class ClosingTaxLine(BaseModel):
+    tax_rate: Optional[float]
+    net: Optional[Euro]
+    tax: Optional[Euro]
+    gross: Euro
+
+
+class DailyClosingCreate(BaseModel):
+    business_date: Optional[date] = None
+    note: Optional[str] = None
+
+
+class DailyClosingResponse(BaseModel):
+    id: int
+    closing_number: int
+    business_date: date
+    period_start: Optional[datetime]
+    period_end: datetime
+    transaction_count: int
+    sales_total: Euro
+    member_sales_total: Euro
+    guest_sales_total: Euro
+    top_up_total: Euro
+    open_tabs_count: int
+    open_tabs_total: Euro
+    member_credit_total: Euro
+    member_debt_total: Euro
+    payments: List[ClosingPaymentLine]
+    tax_rates: List[ClosingTaxLine]
+    note: Optional[str]
+    created_by_admin_id: Optional[int]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class TaxReportLine(BaseModel):
+    period_start: date
+    tax_rate: Optional[float]
+    line_count: int
+    net: Optional[Euro]
+    tax: Optional[Euro]
+    gross: Euro
+
+
+class TaxReport(BaseModel):
+    date_from: date
+    date_to: date
+    period: str
+    lines: List[TaxReportLine]
+
+
+class PivotReport(BaseModel):
+    rows: List[Optional[Union[str, int]]]
+    columns: List[Optional[Union[str, int]]]
+    values: List[List[Optional[float]]]
+    measure: str
+    row_count: int
+    refreshed_at: Optional[datetime]
+    duration_ms: float
+
+
+class BalanceDrift(BaseModel):
+    user_id: int
+    username: str
+    expected_balance: Euro
+    observed_balance: Euro
+    drift: Euro
+    last_transaction_id: int
+
+
+class BalanceReconciliationReport(BaseModel):
+    checked_at: Optional[datetime]
+    checked_users: Optional[int] = None
+    horizon_transaction_id: Optional[int] = None
+    duration_ms: Optional[float] = None
+    drifts: List[BalanceDrift]
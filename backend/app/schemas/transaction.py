@@ -4,11 +4,12 @@ Schemas für Transactions
 from typing import Optional
 from datetime import datetime
 from pydantic import BaseModel, Field
+from app.core.money import Euro
 from app.models.transaction import TransactionType, TransactionStatus, PaymentMethod
 
 
 class TransactionCreate(BaseModel):
-    amount: float = Field(..., gt=0)
+    amount: Euro = Field(..., ge=0.01)
     transaction_type: str  # String statt ENUM
     payment_method: str = Field(default="balance")  # String statt ENUM
     description: Optional[str] = None
@@ -22,9 +23,9 @@ class TransactionResponse(BaseModel):
     guest_id: Optional[int]  # NEU
     transaction_type: TransactionType
     status: TransactionStatus
-    amount: float
-    balance_before: Optional[float]
-    balance_after: Optional[float]
+    amount: Euro
+    balance_before: Optional[Euro]
+    balance_after: Optional[Euro]
     payment_method: Optional[PaymentMethod]
     description: Optional[str]
     created_at: datetime
@@ -49,11 +50,11 @@ class PurchaseResponse(BaseModel):
     purchase_reference: str
     product_id: int
     quantity: int
-    unit_price: float
-    total_price: float
-    tax_amount: float
-    balance_before: Optional[float]
-    balance_after: Optional[float]
+    unit_price: Euro
+    total_price: Euro
+    tax_amount: Euro
+    balance_before: Optional[Euro]
+    balance_after: Optional[Euro]
     created_at: datetime
 
     class Config:
@@ -62,5 +63,5 @@ class PurchaseResponse(BaseModel):
 
 class TopUpRequest(BaseModel):
     """Schema for top-up requests"""
-    amount: float = Field(..., gt=0, description="Amount to top up")
+    amount: Euro = Field(..., ge=0.01, description="Amount to top up")
     payment_method: str = Field(default="cloud_api")  # String statt ENUM
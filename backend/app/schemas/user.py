@@ -4,6 +4,7 @@ Schemas für User/Member
 from typing import Optional
 from datetime import datetime
 from pydantic import BaseModel, EmailStr, Field, validator
+from app.core.money import Euro
 
 
 class UserBase(BaseModel):
@@ -30,7 +31,7 @@ class UserChangePassword(BaseModel):
     new_password: str = Field(..., min_length=6)
 
 class UserBalanceAdjustment(BaseModel):
-    amount: float = Field(..., description="Betrag (positiv = Aufladung, negativ = Abzug)")
+    amount: Euro = Field(..., description="Betrag (positiv = Aufladung, negativ = Abzug)")
     description: str = Field(..., min_length=3, max_length=200, description="Grund für die Anpassung")
 
 class UserPasswordReset(BaseModel):
@@ -43,7 +44,7 @@ class UserRFIDLink(BaseModel):
 
 class UserResponse(UserBase):
     id: int
-    balance: float
+    balance: Euro
     is_active: bool
     is_admin: bool
     rfid_token: Optional[str]
@@ -0,0 +1,347 @@
+"""
+Vereinskasse - Analytics Cube
+Datei: backend/app/services/analytics_cube.py
+
+Spaltenorientierter In-Memory-Würfel der Verkaufszeilen (NumPy) für
+/reports/pivot. Geladen wird inkrementell ab einem Transaktions-ID-
+Wasserstand; Pivots (group-by, sum, count, Perzentile) laufen vektorisiert
+ohne SQL-Roundtrip. Jeder Worker hält seinen eigenen Würfel.
+"""
+
+import asyncio
+import re
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import BigInteger, Integer, and_, cast, extract, func, literal, null, select, type_coerce, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.guest_tab import GuestTab
+from app.models.products import Product
+from app.models.transaction import Transaction
+
+# Zeilen pro Fetch beim Laden (Server-seitiger Cursor)
+LOAD_BATCH_SIZE = 20000
+
+DIMENSIONS = ["hour", "weekday", "day", "month", "product", "category", "customer_type", "payment_method"]
+MEASURES = ["sum", "count", "quantity", "avg"]  # zusätzlich pNN, z.B. p50, p95
+WEEKDAY_NAMES = ["Mo", "Di", "Mi", "Do", "Fr", "Sa", "So"]
+PERCENTILE_MEASURE = re.compile(r"^p(\d{1,2})$")
+
+# Spalten mit Wörterbuch-Kodierung (Code -> Wert in self._vocab)
+_ENCODED = ["category", "customer_type", "payment_method"]
+_EPOCH = date(1970, 1, 1)
+
+
+def sales_lines(after_transaction_id: int):
+    """
+    Verkaufszeilen für den Würfel - eine Zeile je Tab-Position bzw. Mitglieder-Kauf
+
+    Zeitfelder in settings.TIMEZONE (day = Tage seit 1970-01-01), amount in
+    Cent; product_id -1 = Mitglieder-Kauf ohne Produkt (wie in daily_sales).
+    """
+    purchase = and_(
+        Transaction.transaction_type == "purchase",
+        Transaction.status == "successful",
+        Transaction.id > after_transaction_id,
+    )
+    local = func.timezone(settings.TIMEZONE, func.timezone("UTC", Transaction.created_at))
+
+    def line(product_id, category, customer_type, quantity, amount):
+        return select(
+            Transaction.id.label("transaction_id"),
+            cast(extract("hour", local), Integer).label("hour"),
+            cast(extract("isodow", local), Integer).label("weekday"),
+            cast(extract("epoch", func.date(local)) / 86400, Integer).label("day"),
+            product_id.label("product_id"),
+            category.label("category"),
+            literal(customer_type).label("customer_type"),
+            func.coalesce(Transaction.payment_method, "unknown").label("payment_method"),
+            quantity.label("quantity"),
+            type_coerce(amount, BigInteger).label("amount"),
+        )
+
+    guest_lines = (
+        line(GuestTab.product_id, Product.category, "guest", GuestTab.quantity, GuestTab.total_amount)
+        .select_from(GuestTab)
+        .join(Transaction, and_(Transaction.guest_id == GuestTab.guest_id, purchase))
+        .join(Product, Product.id == GuestTab.product_id)
+        .where(GuestTab.paid == True)
+    )
+    member_lines = (
+        line(literal(-1), null().cast(Product.category.type), "member", literal(0), Transaction.amount)
+        .where(purchase, Transaction.user_id.is_not(None), Transaction.guest_id.is_(None))
+    )
+    return union_all(guest_lines, member_lines).subquery("sales_lines")
+
+
+class AnalyticsCube:
+    """
+    Verkaufszeilen als NumPy-Spalten
+
+    Wasserstand = höchste Transaktions-ID, bis zu der alles geladen ist.
+    Noch offene (pending) Käufe und junge Transaktionen (Commit-Lag) halten ihn
+    zurück, damit sie nach dem Abschluss bzw. Commit beim nächsten Refresh
+    nachgeladen werden; Zeilen oberhalb
+    des Wasserstands werden dabei ersetzt statt doppelt gezählt.
+    """
+
+    def __init__(self, refresh_seconds: int = 60):
+        self.refresh_seconds = refresh_seconds
+        self.watermark = 0
+        self.refreshed_at: Optional[datetime] = None
+        self.last_refresh_ms = 0.0
+        self._refreshed_monotonic: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._vocab: Dict[str, List] = {name: [] for name in _ENCODED}
+        self._codes: Dict[str, Dict] = {name: {} for name in _ENCODED}
+        self._product_names: Dict[int, str] = {}
+        self._columns = self._empty()
+
+    @staticmethod
+    def _empty() -> Dict[str, np.ndarray]:
+        return {
+            "transaction_id": np.empty(0, np.int64),
+            "hour": np.empty(0, np.int8),
+            "weekday": np.empty(0, np.int8),
+            "day": np.empty(0, np.int32),
+            "month": np.empty(0, np.int32),
+            "product": np.empty(0, np.int32),
+            "category": np.empty(0, np.int16),
+            "customer_type": np.empty(0, np.int16),
+            "payment_method": np.empty(0, np.int16),
+            "quantity": np.empty(0, np.int32),
+            "amount": np.empty(0, np.int64),  # Cent
+        }
+
+    @property
+    def row_count(self) -> int:
+        return len(self._columns["transaction_id"])
+
+    def _encode(self, name: str, values) -> np.ndarray:
+        codes = self._codes[name]
+        vocab = self._vocab[name]
+        out = np.empty(len(values), np.int16)
+        for i, value in enumerate(values):
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(vocab)
+                vocab.append(value)
+            out[i] = code
+        return out
+
+    def _batch(self, rows) -> Dict[str, np.ndarray]:
+        (transaction_id, hour, weekday, day, product_id,
+         category, customer_type, payment_method, quantity, amount) = zip(*rows)
+        days = np.array(day, np.int32)
+        return {
+            "transaction_id": np.array(transaction_id, np.int64),
+            "hour": np.array(hour, np.int8),
+            "weekday": np.array(weekday, np.int8),
+            "day": days,
+            "month": days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int32),
+            "product": np.array(product_id, np.int32),
+            "category": self._encode("category", category),
+            "customer_type": self._encode("customer_type", customer_type),
+            "payment_method": self._encode("payment_method", payment_method),
+            "quantity": np.array(quantity, np.int32),
+            "amount": np.array(amount, np.int64),
+        }
+
+    def _is_stale(self) -> bool:
+        return (
+            self._refreshed_monotonic is None
+            or time.monotonic() - self._refreshed_monotonic >= self.refresh_seconds
+        )
+
+    async def ensure_fresh(self, db: AsyncSession) -> None:
+        """Refresh, wenn der letzte älter als refresh_seconds ist"""
+        if not self._is_stale():
+            return
+        async with self._lock:
+            if self._is_stale():
+                await self.refresh(db)
+
+    async def refresh(self, db: AsyncSession) -> int:
+        """
+        Neue Verkaufszeilen oberhalb des Wasserstands nachladen
+
+        Args:
+            db: Database Session (Replica genügt)
+
+        Returns:
+            int: Anzahl geladener Zeilen
+        """
+        started = time.perf_counter()
+        after = self.watermark
+
+        # Wasserstand vor dem Laden bestimmen: höchste ID älter als
+        # ANALYTICS_COMMIT_LAG_SECONDS (IDs werden vor dem Commit vergeben -
+        # eine kleinere, noch unsichtbare ID darf nicht übersprungen werden)
+        # und unterhalb derer nichts mehr pending ist. Jüngere Zeilen werden
+        # trotzdem geladen und beim nächsten Refresh ersetzt.
+        settled_before = datetime.utcnow() - timedelta(seconds=settings.ANALYTICS_COMMIT_LAG_SECONDS)
+        result = await db.execute(
+            select(
+                func.max(Transaction.id),
+                func.max(Transaction.id).filter(Transaction.created_at < settled_before),
+                # Nur Käufe (was sales_lines lädt) - eine offene SumUp-Aufladung
+                # darf den Wasserstand nicht minutenlang festhalten
+                func.min(Transaction.id).filter(
+                    Transaction.status == "pending", Transaction.transaction_type == "purchase"
+                ),
+            )
+            .where(Transaction.id > after)
+        )
+        max_id, settled_id, min_pending_id = result.one()
+        if max_id is None:
+            self._mark_refreshed(started)
+            return 0
+        watermark = settled_id or after
+        if min_pending_id is not None:
+            watermark = min(watermark, min_pending_id - 1)
+
+        lines = sales_lines(after)
+        connection = await db.connection()
+        stream = await connection.stream(
+            select(*lines.c)
+            .where(lines.c.transaction_id <= max_id)
+            .execution_options(yield_per=LOAD_BATCH_SIZE)
+        )
+        batches = [self._batch(partition) async for partition in stream.partitions()]
+
+        products = await db.execute(select(Product.id, Product.name))
+        self._product_names = dict(products.all())
+
+        # Alte Zeilen oberhalb des Wasserstands werden neu geladen -> ersetzen
+        columns = self._columns
+        keep = columns["transaction_id"] <= after
+        if not keep.all():
+            columns = {name: values[keep] for name, values in columns.items()}
+        if batches:
+            columns = {
+                name: np.concatenate([values] + [batch[name] for batch in batches])
+                for name, values in columns.items()
+            }
+
+        # Tausch als Ganzes: laufende Pivots sehen alten oder neuen Stand
+        self._columns = columns
+        self.watermark = watermark
+        self._mark_refreshed(started)
+        return sum(len(batch["transaction_id"]) for batch in batches)
+
+    def _mark_refreshed(self, started: float) -> None:
+        self.refreshed_at = datetime.utcnow()
+        self._refreshed_monotonic = time.monotonic()
+        self.last_refresh_ms = (time.perf_counter() - started) * 1000
+
+    def _labels(self, dimension: str, codes: np.ndarray) -> list:
+        if dimension == "weekday":
+            return [WEEKDAY_NAMES[int(code) - 1] for code in codes]
+        if dimension == "day":
+            return [(_EPOCH + timedelta(days=int(code))).isoformat() for code in codes]
+        if dimension == "month":
+            return [f"{1970 + int(code) // 12}-{int(code) % 12 + 1:02d}" for code in codes]
+        if dimension == "product":
+            return [None if code < 0 else self._product_names.get(int(code), f"#{code}") for code in codes]
+        if dimension == "category":
+            return [getattr(self._vocab["category"][code], "value", None) for code in codes]
+        if dimension in _ENCODED:
+            return [self._vocab[dimension][code] for code in codes]
+        return [int(code) for code in codes]
+
+    def pivot(
+        self,
+        rows: str,
+        columns: Optional[str] = None,
+        measure: str = "sum",
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+    ) -> dict:
+        """
+        Kreuztabelle rows x columns über eine Kennzahl (CPU-gebunden, im Threadpool aufrufen)
+
+        Args:
+            rows: Zeilen-Dimension (siehe DIMENSIONS)
+            columns: Optionale Spalten-Dimension
+            measure: sum, count, quantity, avg oder pNN (Perzentil des Zeilenbetrags)
+            date_from: Erster lokaler Tag
+            date_to: Letzter lokaler Tag
+
+        Returns:
+            dict: rows, columns (Labels), values (Matrix, None = keine Daten), row_count
+        """
+        data = self._columns
+        percentile = PERCENTILE_MEASURE.match(measure)
+
+        mask = np.ones(len(data["transaction_id"]), bool)
+        if date_from is not None:
+            mask &= data["day"] >= (date_from - _EPOCH).days
+        if date_to is not None:
+            mask &= data["day"] <= (date_to - _EPOCH).days
+
+        row_values, row_index = np.unique(data[rows][mask], return_inverse=True)
+        if columns:
+            column_values, column_index = np.unique(data[columns][mask], return_inverse=True)
+        else:
+            column_values, column_index = np.zeros(1, np.int8), np.zeros(len(row_index), np.intp)
+
+        n_columns = len(column_values)
+        size = len(row_values) * n_columns
+        key = row_index * n_columns + column_index
+        counts = np.bincount(key, minlength=size)
+
+        if measure == "count":
+            values = counts.astype(np.float64)
+        elif measure in ("sum", "avg"):
+            values = np.bincount(key, weights=data["amount"][mask], minlength=size) / 100
+            if measure == "avg":
+                values = np.divide(values, counts, out=np.zeros(size), where=counts > 0)
+        elif measure == "quantity":
+            values = np.bincount(key, weights=data["quantity"][mask], minlength=size)
+        elif percentile:
+            values = self._percentile(key, data["amount"][mask], counts, int(percentile.group(1)) / 100) / 100
+        else:
+            raise ValueError(f"Unbekannte Kennzahl: {measure}")
+
+        matrix = np.round(values, 2).reshape(len(row_values), n_columns).tolist()
+        empty = (counts == 0).reshape(len(row_values), n_columns)
+        for i, j in zip(*np.nonzero(empty)):
+            matrix[i][j] = None
+
+        return {
+            "rows": self._labels(rows, row_values),
+            "columns": self._labels(columns, column_values) if columns else ["total"],
+            "values": matrix,
+            "row_count": int(mask.sum()),
+        }
+
+    @staticmethod
+    def _percentile(key: np.ndarray, amount: np.ndarray, counts: np.ndarray, q: float) -> np.ndarray:
+        """Perzentil je Gruppe (lineare Interpolation wie np.percentile), ohne Python-Schleife"""
+        ordered = amount[np.lexsort((amount, key))]
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        position = q * np.maximum(counts - 1, 0)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.ceil(position).astype(np.int64)
+        filled = counts > 0
+        values = np.zeros(len(counts))
+        low_values = ordered[(starts + lower)[filled]]
+        high_values = ordered[(starts + upper)[filled]]
+        values[filled] = low_values + (high_values - low_values) * (position - lower)[filled]
+        return values
+
+    def status(self) -> dict:
+        return {
+            "rows": self.row_count,
+            "watermark": self.watermark,
+            "refreshed_at": self.refreshed_at,
+            "last_refresh_ms": round(self.last_refresh_ms, 1),
+            "memory_bytes": sum(values.nbytes for values in self._columns.values()),
+        }
+
+
+analytics_cube = AnalyticsCube(refresh_seconds=settings.ANALYTICS_REFRESH_SECONDS)
@@ -6,6 +6,7 @@ from sqlalchemy import select
 from fastapi import HTTPException, status
 from app.models.user import User
 from app.core.security import SecurityService
+from app.services.rfid_index import rfid_token_index
 
 
 class AuthService:
@@ -39,11 +40,15 @@ class AuthService:
         return user
     
     async def authenticate_rfid(self, rfid_token: str) -> User:
+        generation = rfid_token_index.generation
         result = await self.db.execute(
             select(User).where(User.rfid_token == rfid_token)
         )
         user = result.scalar_one_or_none()
         
+        if user:
+            rfid_token_index.put(rfid_token, user.id, user.is_active, generation)
+        
         if not user or not user.is_active:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -52,6 +57,28 @@ class AuthService:
         
         return user
     
+    async def resolve_rfid(self, rfid_token: str) -> int:
+        """
+        RFID-Token -> User-ID über den In-Process Index, bei Miss Fallback
+        auf authenticate_rfid.
+        
+        Treffer gehen nicht an die DB: Änderungen auf anderen Workern kommen
+        per NOTIFY rfid_index (siehe RFIDIndexWatcher).
+        """
+        entry = rfid_token_index.lookup(rfid_token)
+        if entry is None:
+            user = await self.authenticate_rfid(rfid_token)
+            return user.id
+        
+        user_id, is_active = entry
+        if not is_active:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Ungültiger RFID-Token"
+            )
+        
+        return user_id
+    
     async def get_user_by_id(self, user_id: int) -> User:
         result = await self.db.execute(
             select(User).where(User.id == user_id)
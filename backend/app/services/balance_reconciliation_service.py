@@ -0,0 +1,193 @@
+"""
+Balance Reconciliation Service - Guthaben gegen Transaktions-Historie prüfen (O(Delta))
+"""
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import and_, case, func, insert, literal, select, text, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.balance_checkpoint import BalanceCheckpoint
+from app.models.transaction import Transaction
+from app.models.user import User
+
+def ledger_delta():
+    """
+    Wirkung einer erfolgreichen Transaktion auf users.balance
+
+    - top_up / admin_adjustment: +amount (Korrekturen mit Vorzeichen)
+    - purchase vom Guthaben: -amount
+    - alles andere (bar, SumUp, Gäste): 0
+    """
+    return case(
+        (Transaction.transaction_type.in_(["top_up", "admin_adjustment"]), Transaction.amount),
+        (
+            and_(Transaction.transaction_type == "purchase", Transaction.payment_method == "balance"),
+            -Transaction.amount,
+        ),
+        else_=0,
+    )
+
+
+class BalanceReconciliationService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _horizon(self) -> int:
+        """
+        Höchste Transaktions-ID, die in einen Checkpoint darf
+
+        Nur Transaktionen älter als BALANCE_CHECKPOINT_LAG_SECONDS (IDs
+        werden vor dem Commit vergeben) und unterhalb der ältesten offenen
+        Zahlung (pending -> successful ändert später das Guthaben).
+        """
+        settled_before = datetime.utcnow() - timedelta(seconds=settings.BALANCE_CHECKPOINT_LAG_SECONDS)
+        result = await self.db.execute(
+            select(
+                select(func.max(Transaction.id))
+                .where(Transaction.created_at < settled_before)
+                .scalar_subquery(),
+                select(func.min(Transaction.id))
+                .where(Transaction.status == "pending")
+                .scalar_subquery(),
+            )
+        )
+        settled_id, min_pending_id = result.one()
+        horizon = settled_id or 0
+        if min_pending_id is not None:
+            horizon = min(horizon, min_pending_id - 1)
+        return horizon
+
+    async def reconcile(self, accept_drift: bool = False) -> dict:
+        """
+        Alle Mitglieder abgleichen und neue Checkpoints schreiben
+
+        Pro Mitglied: letzter Checkpoint + Summe der Transaktionen seitdem
+        = erwarteter Saldo, Abweichung zu users.balance = Drift. Ein einziges
+        INSERT ... SELECT (ein Snapshot); gelesen werden nur Transaktionen
+        oberhalb des ältesten letzten Checkpoints.
+
+        Args:
+            accept_drift: Abweichung als neue Basis übernehmen (z.B. Salden
+                aus der Zeit vor den Transaktionen); Drift wird trotzdem protokolliert
+
+        Returns:
+            dict: checked_at, checked_users, horizon_transaction_id, duration_ms
+        """
+        started = time.perf_counter()
+        await self.db.execute(text("LOCK TABLE balance_checkpoints IN EXCLUSIVE MODE"))
+
+        horizon = await self._horizon()
+        checked_at = datetime.utcnow()
+
+        latest = (
+            select(BalanceCheckpoint.last_transaction_id, BalanceCheckpoint.balance)
+            .where(BalanceCheckpoint.user_id == User.id)
+            .order_by(BalanceCheckpoint.id.desc())
+            .limit(1)
+            .lateral("latest")
+        )
+        last_checkpoint = (
+            select(
+                User.id.label("user_id"),
+                User.balance.label("observed_balance"),
+                func.coalesce(latest.c.last_transaction_id, 0).label("last_transaction_id"),
+                func.coalesce(latest.c.balance, 0).label("balance"),
+            )
+            .outerjoin(latest, true())
+            .cte("last_checkpoint")
+        )
+
+        # Mitglieder ohne Checkpoint sind neuer als der letzte Lauf, ihre
+        # Transaktionen liegen also ebenfalls oberhalb der Untergrenze
+        lower_bound = (
+            select(func.coalesce(func.min(last_checkpoint.c.last_transaction_id).filter(
+                last_checkpoint.c.last_transaction_id > 0
+            ), 0))
+            .scalar_subquery()
+        )
+        delta = ledger_delta()
+        deltas = (
+            select(
+                Transaction.user_id,
+                func.sum(case((Transaction.id <= horizon, delta), else_=0)).label("settled"),
+                func.sum(delta).label("total"),
+            )
+            .join(last_checkpoint, last_checkpoint.c.user_id == Transaction.user_id)
+            .where(
+                Transaction.status == "successful",
+                Transaction.id > lower_bound,
+                Transaction.id > last_checkpoint.c.last_transaction_id,
+            )
+            .group_by(Transaction.user_id)
+            .cte("deltas")
+        )
+
+        # Ganzzahlig in Cent - Drift ist exakt, keine Toleranz nötig
+        expected = last_checkpoint.c.balance + func.coalesce(deltas.c.total, 0)
+        if accept_drift:
+            # Basis so wählen, dass Basis + Transaktionen nach dem Horizont = users.balance
+            checkpoint_balance = (
+                last_checkpoint.c.observed_balance
+                - func.coalesce(deltas.c.total, 0)
+                + func.coalesce(deltas.c.settled, 0)
+            )
+        else:
+            checkpoint_balance = last_checkpoint.c.balance + func.coalesce(deltas.c.settled, 0)
+        rows = (
+            select(
+                last_checkpoint.c.user_id,
+                func.greatest(last_checkpoint.c.last_transaction_id, horizon),
+                checkpoint_balance,
+                expected,
+                last_checkpoint.c.observed_balance,
+                last_checkpoint.c.observed_balance - expected,
+                literal(checked_at),
+            )
+            .outerjoin(deltas, deltas.c.user_id == last_checkpoint.c.user_id)
+        )
+        result = await self.db.execute(
+            insert(BalanceCheckpoint).from_select(
+                ["user_id", "last_transaction_id", "balance", "expected_balance",
+                 "observed_balance", "drift", "created_at"],
+                rows,
+            )
+        )
+
+        return {
+            "checked_at": checked_at,
+            "checked_users": result.rowcount,
+            "horizon_transaction_id": horizon,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    async def latest_run(self) -> Optional[datetime]:
+        result = await self.db.execute(select(func.max(BalanceCheckpoint.created_at)))
+        return result.scalar_one_or_none()
+
+    async def drifts(self, checked_at: datetime) -> List[dict]:
+        """
+        Mitglieder mit Abweichung in einem Lauf
+
+        Args:
+            checked_at: Zeitpunkt des Laufs (created_at der Checkpoints)
+        """
+        result = await self.db.execute(
+            select(
+                BalanceCheckpoint.user_id,
+                User.username,
+                BalanceCheckpoint.expected_balance,
+                BalanceCheckpoint.observed_balance,
+                BalanceCheckpoint.drift,
+                BalanceCheckpoint.last_transaction_id,
+            )
+            .join(User, User.id == BalanceCheckpoint.user_id)
+            .where(
+                BalanceCheckpoint.created_at == checked_at,
+                BalanceCheckpoint.drift != 0,
+            )
+            .order_by(func.abs(BalanceCheckpoint.drift).desc())
+        )
+        return [dict(row._mapping) for row in result.all()]
@@ -0,0 +1,229 @@
+"""
+Closing Service - Tagesabschluss (Z-Bon) anlegen und als PDF rendern
+"""
+from datetime import date, datetime, timedelta
+from io import BytesIO
+from typing import Optional
+
+from fastapi import HTTPException, status
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import cm
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+from sqlalchemy import and_, case, func, literal, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.money import euros_sql
+from app.db.writes import insert_returning
+from app.models.closing import DailyClosing
+from app.models.guest import Guest
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.services.daily_sales_service import local_sales_date
+from app.services.tax_report_service import taxable_lines
+
+
+def _money(expr):
+    # Summe in Cent (exakt), NULL = 0
+    return func.coalesce(expr, 0)
+
+
+def _jsonb_list(subquery, **fields):
+    """Zeilen einer Subquery als JSONB-Array (leer = [])"""
+    pairs = []
+    for key, column in fields.items():
+        pairs.extend([literal(key), column])
+    return select(
+        func.coalesce(func.jsonb_agg(func.jsonb_build_object(*pairs)), text("'[]'::jsonb"))
+    ).select_from(subquery).scalar_subquery()
+
+
+class ClosingService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_closing(
+        self,
+        admin_id: Optional[int],
+        business_date: Optional[date] = None,
+        note: Optional[str] = None,
+    ) -> DailyClosing:
+        """
+        Abschluss seit dem letzten Z-Bon berechnen und speichern
+
+        Alle Kennzahlen kommen aus EINEM INSERT ... SELECT (ein Snapshot);
+        die Tabellensperre serialisiert parallele Abschlüsse. Das Periodenende
+        liegt CLOSING_COMMIT_LAG_SECONDS zurück: eine Buchung mit Zeitstempel
+        kurz vor "jetzt", die erst nach dem Snapshot committet, fiele sonst
+        aus diesem und (Abschlüsse sind unveränderlich) jedem späteren Z-Bon.
+
+        Args:
+            admin_id: Ausführender Admin
+            business_date: Geschäftstag (Standard: heute in settings.TIMEZONE)
+            note: Optionale Notiz (z.B. Kassendifferenz)
+
+        Returns:
+            DailyClosing: Gespeicherter Abschluss
+        """
+        await self.db.execute(text("LOCK TABLE daily_closings IN EXCLUSIVE MODE"))
+
+        result = await self.db.execute(
+            select(DailyClosing.closing_number, DailyClosing.period_end)
+            .order_by(DailyClosing.closing_number.desc())
+            .limit(1)
+        )
+        last = result.first()
+        period_start = last.period_end if last else None
+        now = datetime.utcnow()
+        period_end = now - timedelta(seconds=settings.CLOSING_COMMIT_LAG_SECONDS)
+
+        if period_start is not None and period_end <= period_start:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Letzter Tagesabschluss ist zu jung - bitte in ein paar Minuten erneut versuchen"
+            )
+
+        # Zeitpunkt = Abschluss der Buchung: eine vor dem Z-Bon angelegte,
+        # danach bezahlte SumUp-Aufladung zählt im nächsten Abschluss.
+        # created_at <= period_end gilt immer mit und grenzt die Partitionen ein.
+        booked_at = func.coalesce(Transaction.completed_at, Transaction.created_at)
+        in_period = [Transaction.created_at <= period_end, booked_at <= period_end]
+        if period_start is not None:
+            in_period.append(booked_at > period_start)
+        successful = and_(Transaction.status == "successful", *in_period)
+
+        def total(*where):
+            return select(_money(func.sum(Transaction.amount))).where(successful, *where).scalar_subquery()
+
+        purchase = Transaction.transaction_type == "purchase"
+
+        payment_method = func.coalesce(Transaction.payment_method, "unknown").label("payment_method")
+        payments = (
+            select(
+                Transaction.transaction_type.label("transaction_type"),
+                payment_method,
+                func.count().label("count"),
+                euros_sql(_money(func.sum(Transaction.amount))).label("amount"),
+            )
+            .where(successful)
+            .group_by(Transaction.transaction_type, payment_method)
+            .subquery()
+        )
+
+        lines = taxable_lines(*in_period)
+        tax_rates = (
+            select(
+                lines.c.tax_rate,
+                euros_sql(_money(func.sum(lines.c.gross))).label("gross"),
+                euros_sql(func.sum(lines.c.gross / (1 + lines.c.tax_rate))).label("net"),
+            )
+            .group_by(lines.c.tax_rate)
+            .subquery()
+        )
+
+        snapshot = await insert_returning(
+            self.db,
+            DailyClosing,
+            closing_number=(last.closing_number if last else 0) + 1,
+            business_date=business_date or local_sales_date(period_end),
+            period_start=period_start,
+            period_end=period_end,
+            transaction_count=select(func.count()).where(successful).scalar_subquery(),
+            sales_total=total(purchase),
+            member_sales_total=total(purchase, Transaction.guest_id.is_(None)),
+            guest_sales_total=total(purchase, Transaction.guest_id.is_not(None)),
+            top_up_total=total(Transaction.transaction_type == "top_up"),
+            open_tabs_count=select(func.count()).where(Guest.closed_at.is_(None)).scalar_subquery(),
+            open_tabs_total=select(_money(func.sum(Guest.total_amount))).where(Guest.closed_at.is_(None)).scalar_subquery(),
+            member_credit_total=select(_money(func.sum(case((User.balance > 0, User.balance))))).scalar_subquery(),
+            member_debt_total=select(_money(func.sum(case((User.balance < 0, User.balance))))).scalar_subquery(),
+            payments=_jsonb_list(
+                payments,
+                transaction_type=payments.c.transaction_type,
+                payment_method=payments.c.payment_method,
+                count=payments.c.count,
+                amount=payments.c.amount,
+            ),
+            tax_rates=_jsonb_list(
+                tax_rates,
+                tax_rate=tax_rates.c.tax_rate,
+                net=tax_rates.c.net,
+                tax=tax_rates.c.gross - tax_rates.c.net,
+                gross=tax_rates.c.gross,
+            ),
+            note=note,
+            created_by_admin_id=admin_id,
+            created_at=now,
+        )
+        return snapshot
+
+
+def render_closing_pdf(closing: DailyClosing) -> bytes:
+    """
+    Z-Bon als PDF - nur aus dem gespeicherten Snapshot, ohne DB-Zugriff
+    """
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
+    styles = getSampleStyleSheet()
+    elements = []
+
+    elements.append(Paragraph(
+        f"Tagesabschluss Z-{closing.closing_number} - {closing.business_date.strftime('%d.%m.%Y')}",
+        styles['Title']
+    ))
+    period_start = closing.period_start.strftime('%d.%m.%Y %H:%M') if closing.period_start else "Beginn"
+    elements.append(Paragraph(
+        f"Zeitraum (UTC): {period_start} - {closing.period_end.strftime('%d.%m.%Y %H:%M')}",
+        styles['Normal']
+    ))
+    if closing.note:
+        elements.append(Paragraph(f"Notiz: {closing.note}", styles['Normal']))
+    elements.append(Spacer(1, 0.8*cm))
+
+    table_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ])
+
+    def section(title, rows, col_widths):
+        elements.append(Paragraph(title, styles['Heading2']))
+        table = Table(rows, colWidths=col_widths)
+        table.setStyle(table_style)
+        elements.append(table)
+        elements.append(Spacer(1, 0.5*cm))
+
+    section("Übersicht", [
+        ['Kennzahl', 'Wert'],
+        ['Transaktionen', str(closing.transaction_count)],
+        ['Verkäufe gesamt', f"{closing.sales_total:.2f} €"],
+        ['davon Mitglieder', f"{closing.member_sales_total:.2f} €"],
+        ['davon Gäste', f"{closing.guest_sales_total:.2f} €"],
+        ['Aufladungen', f"{closing.top_up_total:.2f} €"],
+        ['Offene Gast-Tabs', f"{closing.open_tabs_count} / {closing.open_tabs_total:.2f} €"],
+        ['Mitglieder-Guthaben', f"{closing.member_credit_total:.2f} €"],
+        ['Mitglieder-Dispo', f"{closing.member_debt_total:.2f} €"],
+    ], [8*cm, 6*cm])
+
+    section("Zahlungsarten", [['Typ', 'Zahlungsart', 'Anzahl', 'Betrag']] + [
+        [p["transaction_type"], p["payment_method"], str(p["count"]), f"{p['amount']:.2f} €"]
+        for p in closing.payments
+    ], [4*cm, 4*cm, 2.5*cm, 3.5*cm])
+
+    section("MwSt", [['Satz', 'Netto', 'MwSt', 'Brutto']] + [
+        [
+            f"{t['tax_rate'] * 100:g} %" if t["tax_rate"] is not None else "unbekannt",
+            f"{t['net']:.2f} €" if t["net"] is not None else "-",
+            f"{t['tax']:.2f} €" if t["tax"] is not None else "-",
+            f"{t['gross']:.2f} €",
+        ]
+        for t in closing.tax_rates
+    ], [3.5*cm, 3.5*cm, 3.5*cm, 3.5*cm])
+
+    doc.build(elements)
+    return buffer.getvalue()
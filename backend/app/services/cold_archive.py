@@ -0,0 +1,279 @@
+"""
+Vereinskasse - Cold Archive
+Datei: backend/app/services/cold_archive.py
+
+Archivierte Monate (transactions + purchases) als spaltenorientierte
+Segmente auf der Platte. Je Tabelle und Monat ein Verzeichnis:
+
+    meta.json    Tabelle, Spalten mit Kodierung, Zeilenzahl
+    index.npy    Schlüssel (id, created_at, user_id, guest_id) sortiert nach
+                 created_at - unkomprimiert, wird per mmap gelesen
+    columns.npz  alle Spalten komprimiert (Strings wörterbuch-kodiert)
+
+Abfragen suchen im Index (searchsorted auf created_at, Masken auf
+user_id/guest_id) und dekodieren nur die gefundenen Zeilen. Beträge liegen
+wie in der DB als Cent vor.
+"""
+
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import Boolean, DateTime, Integer, Numeric, Table
+
+from app.core.config import settings
+from app.core.money import Money, to_euros
+
+META_FILE = "meta.json"
+INDEX_FILE = "index.npy"
+COLUMNS_FILE = "columns.npz"
+
+# Schlüsselspalten im mmap-Index, NULL = -1 (fehlende Spalte ebenso)
+INDEX_COLUMNS = ["id", "created_at", "user_id", "guest_id"]
+INDEX_DTYPE = np.dtype([(name, np.int64) for name in INDEX_COLUMNS])
+
+
+def column_kind(column) -> str:
+    """Kodierung einer Tabellenspalte im Segment"""
+    column_type = column.type
+    if isinstance(column_type, Money):
+        return "money"
+    if isinstance(column_type, DateTime):
+        return "datetime"
+    if isinstance(column_type, Boolean):
+        return "bool"
+    if isinstance(column_type, Integer):
+        return "int"
+    if isinstance(column_type, Numeric):
+        return "float"
+    return "string"
+
+
+def _to_us(ts: datetime) -> int:
+    """Naiver UTC-Zeitstempel -> Mikrosekunden seit 1970"""
+    return int(np.datetime64(ts, "us").astype(np.int64))
+
+
+def _encode(kind: str, values: Sequence) -> Dict[str, np.ndarray]:
+    arrays = {}
+    if kind == "string":
+        vocab: Dict[str, int] = {}
+        codes = np.full(len(values), -1, dtype=np.int32)
+        for position, value in enumerate(values):
+            if value is not None:
+                codes[position] = vocab.setdefault(str(value), len(vocab))
+        arrays["codes"] = codes
+        arrays["vocab"] = np.array(list(vocab), dtype=str)
+        return arrays
+
+    nulls = np.fromiter((value is None for value in values), dtype=bool, count=len(values))
+    if kind == "datetime":
+        data = np.array([_to_us(value) if value is not None else 0 for value in values], dtype=np.int64)
+    elif kind == "float":
+        data = np.array([value if value is not None else 0.0 for value in values], dtype=np.float64)
+    else:  # int, money (Cent), bool
+        data = np.array([int(value) if value is not None else 0 for value in values], dtype=np.int64)
+
+    arrays["data"] = data
+    if nulls.any():
+        arrays["nulls"] = nulls
+    return arrays
+
+
+def _decode(kind: str, arrays: Dict[str, np.ndarray], positions: np.ndarray, raw: bool) -> list:
+    if kind == "string":
+        vocab = arrays["vocab"]
+        return [str(vocab[code]) if code >= 0 else None for code in arrays["codes"][positions]]
+
+    data = arrays["data"][positions]
+    if kind == "datetime":
+        values = data.astype("datetime64[us]").tolist()
+    elif kind == "bool":
+        values = data.astype(bool).tolist()
+    elif kind == "money" and not raw:
+        values = [to_euros(value) for value in data.tolist()]
+    else:
+        values = data.tolist()
+
+    nulls = arrays.get("nulls")
+    if nulls is not None:
+        for offset, is_null in enumerate(nulls[positions]):
+            if is_null:
+                values[offset] = None
+    return values
+
+
+def write_segment(directory: str, table: Table, columns: List[str], rows: Sequence[Sequence]) -> None:
+    """
+    Zeilen (sortiert nach created_at, id) als Segment schreiben
+
+    Erst in <directory>.partial, dann per rename - ein Segment ist
+    entweder vollständig da oder gar nicht.
+    """
+    kinds = {column.name: column_kind(column) for column in table.columns}
+    partial = f"{directory}.partial"
+    shutil.rmtree(partial, ignore_errors=True)
+    os.makedirs(partial)
+
+    stored = {}
+    by_name = {}
+    for position, name in enumerate(columns):
+        values = [row[position] for row in rows]
+        for suffix, array in _encode(kinds.get(name, "string"), values).items():
+            stored[f"{name}.{suffix}"] = array
+        by_name[name] = values
+
+    index = np.zeros(len(rows), dtype=INDEX_DTYPE)
+    for name in INDEX_COLUMNS:
+        values = by_name.get(name)
+        if values is None:
+            index[name] = -1
+        elif name == "created_at":
+            index[name] = stored["created_at.data"]
+        else:
+            index[name] = [value if value is not None else -1 for value in values]
+
+    np.save(os.path.join(partial, INDEX_FILE), index)
+    np.savez_compressed(os.path.join(partial, COLUMNS_FILE), **stored)
+    with open(os.path.join(partial, META_FILE), "w", encoding="utf-8") as meta_file:
+        json.dump({
+            "table": table.name,
+            "columns": [{"name": name, "kind": kinds.get(name, "string")} for name in columns],
+            "rows": len(rows),
+        }, meta_file)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(partial, directory)
+
+
+class ColdSegment:
+    """Ein archivierter Monat einer Tabelle (Index per mmap, Spalten bei Bedarf)"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, META_FILE), encoding="utf-8") as meta_file:
+            meta = json.load(meta_file)
+        self.table = meta["table"]
+        self.columns = meta["columns"]
+        self.rows = meta["rows"]
+        self.index = np.load(os.path.join(directory, INDEX_FILE), mmap_mode="r")
+
+        self._lock = threading.Lock()
+        self._arrays: Dict[str, Dict[str, np.ndarray]] = {}
+
+    def _column(self, name: str) -> Dict[str, np.ndarray]:
+        # npz entpackt je Zugriff - dekodierte Spalten pro Segment behalten
+        with self._lock:
+            arrays = self._arrays.get(name)
+            if arrays is None:
+                with np.load(os.path.join(self.directory, COLUMNS_FILE)) as npz:
+                    prefix = f"{name}."
+                    arrays = {key[len(prefix):]: npz[key] for key in npz.files if key.startswith(prefix)}
+                self._arrays[name] = arrays
+            return arrays
+
+    def select(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        user_id: Optional[int] = None,
+        has_user: Optional[bool] = None,
+        has_guest: Optional[bool] = None,
+    ) -> np.ndarray:
+        """Positionen passender Zeilen, neueste zuerst"""
+        created_at = self.index["created_at"]
+        low = 0 if start is None else int(np.searchsorted(created_at, _to_us(start), "left"))
+        high = len(created_at) if end is None else int(np.searchsorted(created_at, _to_us(end), "left"))
+
+        keys = self.index[low:high]
+        mask = np.ones(high - low, dtype=bool)
+        if user_id is not None:
+            mask &= keys["user_id"] == user_id
+        if has_user is not None:
+            mask &= (keys["user_id"] >= 0) == has_user
+        if has_guest is not None:
+            mask &= (keys["guest_id"] >= 0) == has_guest
+        return (np.flatnonzero(mask) + low)[::-1]
+
+    def fetch(self, positions: np.ndarray, raw: bool = False) -> List[dict]:
+        """
+        Zeilen an den Positionen dekodieren
+
+        Args:
+            raw: Beträge als Cent (für COPY zurück in die DB) statt Euro
+        """
+        values = {
+            column["name"]: _decode(column["kind"], self._column(column["name"]), positions, raw)
+            for column in self.columns
+        }
+        return [
+            {name: column_values[row] for name, column_values in values.items()}
+            for row in range(len(positions))
+        ]
+
+
+class ColdArchive:
+    """
+    Offene Segmente dieses Workers (LRU, COLD_ARCHIVE_OPEN_SEGMENTS)
+
+    Welche Monate archiviert sind, steht in transaction_archives - der
+    Aufrufer übergibt die Verzeichnisse, neueste zuerst.
+    """
+
+    def __init__(self, max_segments: int):
+        self.max_segments = max_segments
+        self._segments: "OrderedDict[str, ColdSegment]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def segment(self, directory: str) -> ColdSegment:
+        with self._lock:
+            segment = self._segments.pop(directory, None)
+            if segment is None:
+                segment = ColdSegment(directory)
+            self._segments[directory] = segment
+            while len(self._segments) > self.max_segments:
+                self._segments.popitem(last=False)
+            return segment
+
+    def evict(self, directory: str) -> None:
+        with self._lock:
+            for path in [path for path in self._segments if path.startswith(directory)]:
+                del self._segments[path]
+
+    def find(
+        self,
+        directories: Sequence[str],
+        limit: Optional[int] = None,
+        offset: int = 0,
+        **filters,
+    ) -> List[dict]:
+        """
+        Zeilen aus mehreren Segmenten (neueste zuerst) mit offset/limit
+
+        Args:
+            directories: Segment-Verzeichnisse, neuester Monat zuerst
+            **filters: start, end, user_id, has_user, has_guest (siehe ColdSegment.select)
+        """
+        rows = []
+        for directory in directories:
+            if limit is not None and len(rows) >= limit:
+                break
+            segment = self.segment(directory)
+            positions = segment.select(**filters)
+            if offset >= len(positions):
+                offset -= len(positions)
+                continue
+            positions = positions[offset:]
+            offset = 0
+            if limit is not None:
+                positions = positions[:limit - len(rows)]
+            rows.extend(segment.fetch(positions))
+        return rows
+
+
+cold_archive = ColdArchive(settings.COLD_ARCHIVE_OPEN_SEGMENTS)
@@ -0,0 +1,185 @@
+"""
+Daily Sales Service - Tagesumsatz-Aggregat pflegen und neu aufbauen
+"""
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import Date, and_, cast, delete, func, literal, select, text, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.daily_sales import DailySales
+from app.models.guest_tab import GuestTab
+from app.models.products import Product
+from app.models.transaction import Transaction
+from app.services.partition_service import PartitionService
+
+KEY_COLUMNS = ["sales_date", "product_id", "category", "payment_method", "customer_type"]
+VALUE_COLUMNS = ["quantity", "revenue", "line_count", "updated_at"]
+
+LOCAL_TZ = ZoneInfo(settings.TIMEZONE)
+
+
+def local_sales_date(ts: datetime) -> date:
+    """Kalendertag (settings.TIMEZONE) eines naiven UTC-Zeitstempels"""
+    return ts.replace(tzinfo=timezone.utc).astimezone(LOCAL_TZ).date()
+
+
+def local_day_start_utc(day: date) -> datetime:
+    """Beginn eines lokalen Kalendertags als naiver UTC-Zeitstempel"""
+    start = datetime.combine(day, time.min, tzinfo=LOCAL_TZ)
+    return start.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _sales_date_sql(column):
+    # created_at ist naive UTC -> lokale Zeit -> Datum
+    return cast(func.timezone(settings.TIMEZONE, func.timezone("UTC", column)), Date)
+
+
+def _upsert(stmt):
+    """Bei vorhandenem Schlüssel Kennzahlen aufaddieren"""
+    return stmt.on_conflict_do_update(
+        index_elements=KEY_COLUMNS,
+        set_={
+            "quantity": DailySales.quantity + stmt.excluded.quantity,
+            "revenue": DailySales.revenue + stmt.excluded.revenue,
+            "line_count": DailySales.line_count + stmt.excluded.line_count,
+            "updated_at": func.now(),
+        },
+    )
+
+
+class DailySalesService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def record_member_purchase(self, transaction: Transaction) -> None:
+        """
+        Mitglieder-Kauf (Betrag ohne Produkt) ins Aggregat buchen
+
+        Muss in derselben Transaktion wie der Verkauf laufen (kein Commit hier).
+        """
+        await self.db.execute(_upsert(
+            pg_insert(DailySales).values(
+                sales_date=local_sales_date(transaction.created_at),
+                product_id=None,
+                category=None,
+                payment_method=transaction.payment_method or "unknown",
+                customer_type="member",
+                quantity=0,
+                revenue=transaction.amount,
+                line_count=1,
+                updated_at=func.now(),
+            )
+        ))
+
+    async def record_guest_tab(self, guest_id: int, payment_method: str, paid_at: datetime) -> None:
+        """
+        Offene Tab-Positionen eines Gastes (je Produkt) ins Aggregat buchen
+
+        Vor dem Markieren der Positionen als bezahlt aufrufen (kein Commit hier).
+        """
+        lines = (
+            select(
+                literal(local_sales_date(paid_at), Date),
+                GuestTab.product_id,
+                Product.category,
+                literal(payment_method or "unknown"),
+                literal("guest"),
+                func.sum(GuestTab.quantity),
+                func.sum(GuestTab.total_amount),
+                func.count(),
+                func.now(),
+            )
+            .join(Product, Product.id == GuestTab.product_id)
+            .where(GuestTab.guest_id == guest_id, GuestTab.paid == False)
+            .group_by(GuestTab.product_id, Product.category)
+        )
+        await self.db.execute(_upsert(
+            pg_insert(DailySales).from_select(KEY_COLUMNS + VALUE_COLUMNS, lines)
+        ))
+
+    async def rebuild(self, date_from: Optional[date] = None, date_to: Optional[date] = None) -> int:
+        """
+        Aggregat für einen Zeitraum aus transactions/guest_tabs neu aufbauen
+
+        Sperrt daily_sales gegen parallele Buchungen bis zum Commit.
+        Bereits archivierte Zeiträume werden übersprungen.
+
+        Args:
+            date_from: Erster Tag (None = gesamte Historie)
+            date_to: Letzter Tag (None = ohne Ende)
+
+        Returns:
+            int: Anzahl geschriebener Aggregat-Zeilen
+        """
+        await self.db.execute(text("LOCK TABLE daily_sales IN SHARE ROW EXCLUSIVE MODE"))
+
+        # Archivierte Monate sind nicht mehr in transactions - deren Tage bleiben stehen
+        archived_until = await PartitionService(self.db).archived_until()
+        if archived_until is not None:
+            first_complete_day = local_sales_date(archived_until) + timedelta(days=1)
+            if date_from is None or date_from < first_complete_day:
+                date_from = first_complete_day
+
+        purchase = and_(
+            Transaction.transaction_type == "purchase",
+            Transaction.status == "successful",
+        )
+        range_filter = []
+        delete_stmt = delete(DailySales)
+        if date_from is not None:
+            range_filter.append(Transaction.created_at >= local_day_start_utc(date_from))
+            delete_stmt = delete_stmt.where(DailySales.sales_date >= date_from)
+        if date_to is not None:
+            range_filter.append(Transaction.created_at < local_day_start_utc(date_to + timedelta(days=1)))
+            delete_stmt = delete_stmt.where(DailySales.sales_date <= date_to)
+
+        await self.db.execute(delete_stmt)
+
+        sales_date = _sales_date_sql(Transaction.created_at).label("sales_date")
+        payment_method = func.coalesce(Transaction.payment_method, "unknown").label("payment_method")
+
+        member_sales = (
+            select(
+                sales_date,
+                literal(None, DailySales.product_id.type),
+                literal(None, DailySales.category.type),
+                payment_method,
+                literal("member"),
+                literal(0),
+                func.sum(Transaction.amount),
+                func.count(),
+                func.now(),
+            )
+            .where(purchase, Transaction.user_id.is_not(None), Transaction.guest_id.is_(None), *range_filter)
+            .group_by(sales_date, payment_method)
+        )
+        guest_sales = (
+            select(
+                sales_date,
+                GuestTab.product_id,
+                Product.category,
+                payment_method,
+                literal("guest"),
+                func.sum(GuestTab.quantity),
+                func.sum(GuestTab.total_amount),
+                func.count(),
+                func.now(),
+            )
+            .select_from(GuestTab)
+            .join(Transaction, and_(Transaction.guest_id == GuestTab.guest_id, purchase))
+            .join(Product, Product.id == GuestTab.product_id)
+            .where(GuestTab.paid == True, *range_filter)
+            .group_by(sales_date, GuestTab.product_id, Product.category, payment_method)
+        )
+
+        result = await self.db.execute(_upsert(
+            pg_insert(DailySales).from_select(
+                KEY_COLUMNS + VALUE_COLUMNS,
+                union_all(member_sales, guest_sales),
+            )
+        ))
+        return result.rowcount
@@ -0,0 +1,139 @@
+"""
+Guest Tab Service
+"""
+from datetime import datetime
+from typing import Dict, Iterable, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import Integer, column, false, func, literal, select, true, update, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.guest import Guest
+from app.models.guest_tab import GuestTab
+from app.models.products import Product
+
+
+class GuestTabService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def add_items(self, guest_id: int, items: Iterable[Tuple[int, int]]) -> Tuple[float, int]:
+        """
+        Fügt Artikel atomar in EINEM Statement zum Gast-Tab hinzu
+
+        - gleiche offene Positionen (Produkt + Preis) werden zusammengeführt
+          (ON CONFLICT auf uq_guest_tabs_open_line erhöht die Menge)
+        - guests.total_amount wird in SQL erhöht; das UPDATE sperrt die
+          Gast-Zeile, parallele Kellner verlieren keine Updates; ein
+          laufendes close-tab (FOR UPDATE) wird abgewartet, danach ist
+          der Tab geschlossen und nichts wird gebucht
+
+        Args:
+            guest_id: Gast ID
+            items: (product_id, quantity) Paare
+
+        Returns:
+            Tuple[float, int]: (neuer Tab-Gesamtbetrag, Anzahl Positionen)
+
+        Raises:
+            HTTPException: Gast/Produkt nicht gefunden, Tab geschlossen, Menge ungültig
+        """
+        # Mengen pro Produkt zusammenfassen - ON CONFLICT darf jede Zeile nur einmal treffen
+        quantities: Dict[int, int] = {}
+        for product_id, quantity in items:
+            if quantity <= 0:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Menge muss größer als 0 sein"
+                )
+            quantities[product_id] = quantities.get(product_id, 0) + quantity
+
+        requested = values(
+            column("product_id", Integer),
+            column("quantity", Integer),
+            name="requested",
+        ).data(list(quantities.items()))
+
+        priced = (
+            select(
+                Product.id.label("product_id"),
+                requested.c.quantity,
+                Product.guest_price.label("price"),
+            )
+            .join_from(requested, Product, Product.id == requested.c.product_id)
+            .cte("priced")
+        )
+
+        guest_update = (
+            update(Guest)
+            .where(Guest.id == guest_id, Guest.closed_at.is_(None))
+            .values(
+                total_amount=Guest.total_amount + select(
+                    func.coalesce(func.sum(priced.c.quantity * priced.c.price), 0)
+                ).scalar_subquery()
+            )
+            .returning(Guest.id, Guest.total_amount)
+            .cte("guest_update")
+        )
+
+        insert_stmt = pg_insert(GuestTab).from_select(
+            ["guest_id", "product_id", "quantity", "price_per_item", "total_amount", "created_at", "paid"],
+            select(
+                guest_update.c.id,
+                priced.c.product_id,
+                priced.c.quantity,
+                priced.c.price,
+                priced.c.quantity * priced.c.price,
+                literal(datetime.utcnow()),
+                false(),
+            ).join_from(guest_update, priced, true())
+        )
+        tab_upsert = (
+            insert_stmt.on_conflict_do_update(
+                index_elements=["guest_id", "product_id", "price_per_item"],
+                index_where=GuestTab.paid == false(),
+                set_={
+                    "quantity": GuestTab.quantity + insert_stmt.excluded.quantity,
+                    "total_amount": GuestTab.total_amount + insert_stmt.excluded.total_amount,
+                },
+            )
+            .returning(GuestTab.id)
+            .cte("tab_upsert")
+        )
+
+        result = await self.db.execute(
+            select(
+                guest_update.c.total_amount,
+                select(func.count()).select_from(priced).scalar_subquery(),
+                select(func.count()).select_from(tab_upsert).scalar_subquery(),
+            )
+        )
+        row = result.first()
+
+        if row is None:
+            await self._raise_guest_not_open(guest_id)
+
+        total_amount, matched_products, lines = row
+        if matched_products < len(quantities):
+            # Teilweise gebucht -> Request schlägt fehl, get_db rollt zurück
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Produkt nicht gefunden"
+            )
+
+        return total_amount, lines
+
+    async def _raise_guest_not_open(self, guest_id: int) -> None:
+        result = await self.db.execute(
+            select(Guest.closed_at).where(Guest.id == guest_id)
+        )
+        if result.first() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Gast nicht gefunden"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Gast-Tab ist bereits geschlossen"
+        )
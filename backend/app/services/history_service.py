@@ -0,0 +1,148 @@
+"""
+History Service - Transaktions-/Kaufhistorie über Datenbank und Cold Archive
+"""
+from datetime import date, timedelta
+from typing import List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models.guest import Guest
+from app.models.purchase import Purchase
+from app.models.transaction import Transaction
+from app.models.transaction_archive import TransactionArchive
+from app.models.user import User
+from app.services.cold_archive import cold_archive
+from app.services.daily_sales_service import local_day_start_utc
+from app.services.tax_report_service import period_filter
+
+
+class HistoryService:
+    """
+    Listen neueste zuerst: erst die Datenbank, danach archivierte Monate
+
+    Archivierte Monate sind immer älter als alles in der Datenbank - eine
+    Seite wird daher aus der DB gefüllt und nur bei Bedarf aus dem Archiv
+    ergänzt. Archiv-Zeilen kommen als transiente ORM-Objekte zurück.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _archive_dirs(self, table: str, date_from: Optional[date], date_to: Optional[date]) -> List[str]:
+        query = select(TransactionArchive.file_path).order_by(TransactionArchive.range_start.desc())
+        if date_from is not None:
+            query = query.where(TransactionArchive.range_end > local_day_start_utc(date_from))
+        if date_to is not None:
+            query = query.where(TransactionArchive.range_start < local_day_start_utc(date_to + timedelta(days=1)))
+        result = await self.db.execute(query)
+        return [f"{path}/{table}" for path in result.scalars().all()]
+
+    async def _from_archive(self, model, where: list, rows: list, skip: int, limit: Optional[int], filters: dict,
+                            date_from: Optional[date], date_to: Optional[date]) -> list:
+        if limit is not None and len(rows) >= limit:
+            return []
+        directories = await self._archive_dirs(model.__tablename__, date_from, date_to)
+        if not directories:
+            return []
+
+        # Offset über die DB-Zeilen hinaus nur zählen, wenn die Seite dort leer blieb
+        archive_skip = 0
+        if skip and not rows:
+            db_count = (await self.db.execute(select(func.count()).select_from(model).where(*where))).scalar()
+            archive_skip = max(skip - db_count, 0)
+
+        if date_from is not None:
+            filters["start"] = local_day_start_utc(date_from)
+        if date_to is not None:
+            filters["end"] = local_day_start_utc(date_to + timedelta(days=1))
+
+        archived = await run_in_threadpool(
+            cold_archive.find,
+            directories,
+            None if limit is None else limit - len(rows),
+            archive_skip,
+            **filters,
+        )
+        return [model(**values) for values in archived]
+
+    async def _attach_names(self, transactions: List[Transaction]) -> None:
+        """Mitglied/Gast an archivierte Transaktionen hängen (wie selectinload)"""
+        user_ids = {txn.user_id for txn in transactions if txn.user_id is not None}
+        guest_ids = {txn.guest_id for txn in transactions if txn.guest_id is not None}
+        users = {}
+        guests = {}
+        if user_ids:
+            users = {user.id: user for user in (await self.db.execute(select(User).where(User.id.in_(user_ids)))).scalars()}
+        if guest_ids:
+            guests = {guest.id: guest for guest in (await self.db.execute(select(Guest).where(Guest.id.in_(guest_ids)))).scalars()}
+        for txn in transactions:
+            set_committed_value(txn, "user", users.get(txn.user_id))
+            set_committed_value(txn, "guest", guests.get(txn.guest_id))
+
+    async def transactions(
+        self,
+        user_id: Optional[int] = None,
+        user_type: str = "all",
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        skip: int = 0,
+        limit: Optional[int] = 100,
+        with_names: bool = False,
+    ) -> List[Transaction]:
+        """
+        Transaktionen neueste zuerst
+
+        Args:
+            user_id: Nur dieses Mitglied
+            user_type: all, members oder guests
+            date_from: Erster Tag (lokal)
+            date_to: Letzter Tag (lokal)
+            limit: None = alle (Export)
+            with_names: user/guest mitladen
+        """
+        where = period_filter(date_from, date_to)
+        filters = {}
+        if user_id is not None:
+            where.append(Transaction.user_id == user_id)
+            filters["user_id"] = user_id
+        if user_type == "members":
+            where.append(Transaction.user_id.is_not(None))
+            filters["has_user"] = True
+        elif user_type == "guests":
+            where.append(Transaction.guest_id.is_not(None))
+            filters["has_guest"] = True
+
+        query = (
+            select(Transaction)
+            .where(*where)
+            .order_by(Transaction.created_at.desc(), Transaction.id.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        if with_names:
+            query = query.options(selectinload(Transaction.user), selectinload(Transaction.guest))
+        rows = list((await self.db.execute(query)).scalars().all())
+
+        archived = await self._from_archive(Transaction, where, rows, skip, limit, filters, date_from, date_to)
+        if with_names and archived:
+            await self._attach_names(archived)
+        return rows + archived
+
+    async def purchases(self, user_id: int, skip: int = 0, limit: Optional[int] = 50) -> List[Purchase]:
+        """Mitglieder-Käufe neueste zuerst"""
+        where = [Purchase.user_id == user_id]
+        result = await self.db.execute(
+            select(Purchase)
+            .where(*where)
+            .order_by(Purchase.created_at.desc(), Purchase.id.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        rows = list(result.scalars().all())
+
+        archived = await self._from_archive(Purchase, where, rows, skip, limit, {"user_id": user_id}, None, None)
+        return rows + archived
@@ -2,12 +2,14 @@
 Member Service  
 """
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import select
 from fastapi import HTTPException
 from app.models.user import User
 from app.models.transaction import Transaction
 from app.models.purchase import Purchase
 from app.core.config import settings
+from app.core.money import to_cents
+from app.services.history_service import HistoryService
 
 
 class MemberService:
@@ -23,30 +25,19 @@ class MemberService:
     
     async def can_purchase(self, user_id: int, amount: float) -> bool:
         balance = await self.get_balance(user_id)
-        return balance - amount >= settings.MEMBER_CREDIT_LIMIT
+        return to_cents(balance) - to_cents(amount) >= to_cents(settings.MEMBER_CREDIT_LIMIT)
     
     async def get_transaction_history(
         self,
         user_id: int,
         limit: int = 50
     ) -> list[Transaction]:
-        result = await self.db.execute(
-            select(Transaction)
-            .where(Transaction.user_id == user_id)
-            .order_by(desc(Transaction.created_at))
-            .limit(limit)
-        )
-        return result.scalars().all()
+        # inkl. archivierter Monate
+        return await HistoryService(self.db).transactions(user_id=user_id, limit=limit)
     
     async def get_purchase_history(
         self,
         user_id: int,
         limit: int = 50
     ) -> list[Purchase]:
-        result = await self.db.execute(
-            select(Purchase)
-            .where(Purchase.user_id == user_id)
-            .order_by(desc(Purchase.created_at))
-            .limit(limit)
-        )
-        return result.scalars().all()
+        return await HistoryService(self.db).purchases(user_id, limit=limit)
@@ -0,0 +1,342 @@
+"""
+Partition Service - Monatspartitionen der transactions-Tabelle anlegen und archivieren
+"""
+import os
+import re
+from datetime import date, datetime
+from typing import List, Optional
+
+import numpy as np
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.writes import insert_returning
+from app.models.balance_checkpoint import BalanceCheckpoint
+from app.models.purchase import Purchase
+from app.models.transaction import Transaction
+from app.models.transaction_archive import TransactionArchive
+from app.services.cold_archive import ColdSegment, cold_archive, write_segment
+
+PARENT_TABLE = "transactions"
+DEFAULT_PARTITION = "transactions_default"
+PARTITION_NAME = re.compile(r"^transactions_(\d{4})_(\d{2})$")
+
+# Serialisiert Partitions-DDL zwischen Workern (pg_advisory_xact_lock)
+PARTITION_LOCK_KEY = 0x7472616E  # "tran"
+
+
+def month_start(ts: datetime) -> date:
+    return date(ts.year, ts.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_{month.year:04d}_{month.month:02d}"
+
+
+def partition_month(name: str) -> Optional[date]:
+    """Monat aus dem Partitionsnamen (None = keine Monatspartition)"""
+    match = PARTITION_NAME.match(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def _bound(month: date) -> str:
+    # Grenzen als Literal für DDL (ATTACH ... FOR VALUES erlaubt keine Parameter)
+    return f"'{month.isoformat()} 00:00:00'"
+
+
+class PartitionService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _lock(self) -> None:
+        await self.db.execute(select(func.pg_advisory_xact_lock(PARTITION_LOCK_KEY)))
+
+    async def partition_names(self) -> List[str]:
+        result = await self.db.execute(text("""
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = CAST(:parent AS regclass)
+            ORDER BY c.relname
+        """), {"parent": PARENT_TABLE})
+        return list(result.scalars().all())
+
+    async def list_partitions(self) -> List[dict]:
+        """
+        Angehängte Partitionen mit Zeitraum, geschätzter Zeilenzahl und Größe
+        """
+        result = await self.db.execute(text("""
+            SELECT c.relname AS name,
+                   GREATEST(c.reltuples, 0)::bigint AS estimated_rows,
+                   pg_total_relation_size(c.oid) AS size_bytes
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = CAST(:parent AS regclass)
+            ORDER BY c.relname
+        """), {"parent": PARENT_TABLE})
+
+        partitions = []
+        for row in result.all():
+            month = partition_month(row.name)
+            partitions.append({
+                "name": row.name,
+                "range_start": month,
+                "range_end": add_months(month, 1) if month else None,
+                "estimated_rows": row.estimated_rows,
+                "size_bytes": row.size_bytes,
+            })
+        return partitions
+
+    async def ensure_partitions(self, months_ahead: Optional[int] = None) -> List[str]:
+        """
+        Fehlende Monatspartitionen anlegen (laufender Monat + months_ahead)
+
+        Zeilen, die mangels Partition in transactions_default gelandet sind,
+        werden in ihre neue Monatspartition verschoben.
+
+        Returns:
+            List[str]: Neu angelegte Partitionen
+        """
+        if months_ahead is None:
+            months_ahead = settings.TRANSACTION_PARTITION_MONTHS_AHEAD
+
+        await self._lock()
+        existing = set(await self.partition_names())
+
+        current = month_start(datetime.utcnow())
+        months = {add_months(current, offset) for offset in range(months_ahead + 1)}
+        if DEFAULT_PARTITION in existing:
+            result = await self.db.execute(text(
+                f"SELECT DISTINCT date_trunc('month', created_at)::date FROM {DEFAULT_PARTITION}"
+            ))
+            months.update(result.scalars().all())
+
+        created = []
+        for month in sorted(months):
+            name = partition_name(month)
+            if name not in existing:
+                await self._create_partition(month, move_from_default=DEFAULT_PARTITION in existing)
+                created.append(name)
+        return created
+
+    async def _create_partition(self, month: date, move_from_default: bool) -> None:
+        """
+        Partition als eigene Tabelle anlegen, befüllen und per ATTACH einhängen
+
+        ATTACH sperrt die Elterntabelle nur mit SHARE UPDATE EXCLUSIVE
+        (Verkäufe laufen weiter); der CHECK-Constraint erspart den
+        Validierungs-Scan der neuen Partition.
+        """
+        name = partition_name(month)
+        start, end = _bound(month), _bound(add_months(month, 1))
+
+        await self.db.execute(text(
+            f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        ))
+        await self.db.execute(text(
+            f"ALTER TABLE {name} ADD CONSTRAINT {name}_bounds "
+            f"CHECK (created_at >= {start} AND created_at < {end})"
+        ))
+        if move_from_default:
+            await self.db.execute(text(f"""
+                WITH moved AS (
+                    DELETE FROM {DEFAULT_PARTITION}
+                    WHERE created_at >= {start} AND created_at < {end}
+                    RETURNING *
+                )
+                INSERT INTO {name} SELECT * FROM moved
+            """))
+        await self.db.execute(text(
+            f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} FOR VALUES FROM ({start}) TO ({end})"
+        ))
+        await self.db.execute(text(f"ALTER TABLE {name} DROP CONSTRAINT {name}_bounds"))
+
+    def archive_cutoff(self) -> date:
+        """Partitionen, die vor diesem Monat enden, dürfen archiviert werden"""
+        return add_months(month_start(datetime.utcnow()), -settings.TRANSACTION_ARCHIVE_AFTER_MONTHS)
+
+    async def _get_partition_month(self, name: str) -> date:
+        month = partition_month(name)
+        if month is None or name not in await self.partition_names():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Partition nicht gefunden"
+            )
+        return month
+
+    async def archive_partition(self, name: str) -> TransactionArchive:
+        """
+        Monatspartition samt Käufen ins Cold Archive auslagern und aus der DB entfernen
+
+        Ablauf in einer Transaktion: Partition gegen Schreiben sperren,
+        Segmente nach ARCHIVE_DIR/<name>/{transactions,purchases} schreiben
+        (app/services/cold_archive.py), DETACH, Archiv-Eintrag, DROP.
+        Schlägt etwas fehl, bleibt die Partition unverändert angehängt.
+
+        Raises:
+            HTTPException: Partition unbekannt, zu jung, offene Zahlungen
+                oder noch nicht vom Guthaben-Abgleich erfasst
+        """
+        await self._lock()
+        month = await self._get_partition_month(name)
+
+        if add_months(month, 1) > self.archive_cutoff():
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Nur Monate vor {self.archive_cutoff().isoformat()} können archiviert werden"
+            )
+
+        # Nur lesende Zugriffe bis zum Commit, Verkäufe in anderen Monaten laufen weiter
+        await self.db.execute(text(f"LOCK TABLE {name} IN SHARE MODE"))
+        stats = (await self.db.execute(text(f"""
+            SELECT count(*) AS row_count,
+                   coalesce(sum(amount), 0) AS amount_cents,
+                   max(id) AS max_id,
+                   count(*) FILTER (WHERE status = 'pending') AS pending
+            FROM {name}
+        """))).one()
+
+        if stats.pending:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Partition enthält offene (pending) Zahlungen"
+            )
+
+        # Ohne Checkpoint über diesen Monat würde der Guthaben-Abgleich die
+        # archivierten Buchungen vermissen
+        checkpoint = await self.db.execute(select(func.max(BalanceCheckpoint.last_transaction_id)))
+        if stats.max_id is not None and (checkpoint.scalar() or 0) < stats.max_id:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Erst Guthaben-Abgleich ausführen (POST /reports/reconciliation)"
+            )
+
+        start, end = _bound(month), _bound(add_months(month, 1))
+        transactions = await self.db.execute(text(f"SELECT * FROM {name} ORDER BY created_at, id"))
+        # Mitglieder-Käufe desselben Monats wandern mit ins Archiv
+        purchases = await self.db.execute(text(f"""
+            WITH moved AS (
+                DELETE FROM purchases
+                WHERE created_at >= {start} AND created_at < {end}
+                RETURNING *
+            )
+            SELECT * FROM moved ORDER BY created_at, id
+        """))
+        purchase_columns, purchase_rows = list(purchases.keys()), purchases.all()
+
+        directory = os.path.join(settings.ARCHIVE_DIR, name)
+        await run_in_threadpool(
+            write_segment, os.path.join(directory, "transactions"),
+            Transaction.__table__, list(transactions.keys()), transactions.all(),
+        )
+        await run_in_threadpool(
+            write_segment, os.path.join(directory, "purchases"),
+            Purchase.__table__, purchase_columns, purchase_rows,
+        )
+        cold_archive.evict(directory)
+
+        await self.db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+        archive = await insert_returning(
+            self.db,
+            TransactionArchive,
+            partition_name=name,
+            range_start=datetime.combine(month, datetime.min.time()),
+            range_end=datetime.combine(add_months(month, 1), datetime.min.time()),
+            file_path=directory,
+            row_count=stats.row_count,
+            purchase_count=len(purchase_rows),
+            amount_total=stats.amount_cents / 100,
+            max_transaction_id=stats.max_id,
+            archived_at=datetime.utcnow(),
+        )
+        await self.db.execute(text(f"DROP TABLE {name}"))
+        return archive
+
+    async def archive_expired(self) -> List[TransactionArchive]:
+        """
+        Alle Monatspartitionen vor archive_cutoff() archivieren
+
+        Ein Commit je Monat; Monate mit offenen Zahlungen oder ohne
+        Guthaben-Checkpoint bleiben stehen und werden übersprungen.
+        """
+        archived = []
+        cutoff = self.archive_cutoff()
+        for name in await self.partition_names():
+            month = partition_month(name)
+            if month is None or add_months(month, 1) > cutoff:
+                continue
+            try:
+                archived.append(await self.archive_partition(name))
+                await self.db.commit()
+            except HTTPException:
+                await self.db.rollback()
+        return archived
+
+    async def restore_partition(self, name: str) -> int:
+        """
+        Archivierten Monat wieder als Partition einhängen (z.B. für eine Prüfung)
+
+        Die Segment-Dateien bleiben liegen, bis der Monat erneut archiviert wird.
+
+        Returns:
+            int: Wiederhergestellte Transaktionen
+        """
+        await self._lock()
+        result = await self.db.execute(
+            select(TransactionArchive).where(TransactionArchive.partition_name == name)
+        )
+        archive = result.scalar_one_or_none()
+        if archive is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Archiv nicht gefunden"
+            )
+
+        month = partition_month(name)
+        start, end = _bound(month), _bound(add_months(month, 1))
+        await self.db.execute(text(
+            f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        ))
+
+        raw = await (await self.db.connection()).get_raw_connection()
+        for table, target in (("transactions", name), ("purchases", "purchases")):
+            segment = ColdSegment(os.path.join(archive.file_path, table))
+            rows = await run_in_threadpool(segment.fetch, np.arange(segment.rows), True)
+            if rows:
+                # Spalten aus dem Segment - die Tabelle kann inzwischen neue Spalten haben
+                columns = list(rows[0])
+                await raw.driver_connection.copy_records_to_table(
+                    target, records=[tuple(row.values()) for row in rows], columns=columns
+                )
+
+        restored = (await self.db.execute(text(f"SELECT count(*) FROM {name}"))).scalar()
+        if restored != archive.row_count:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Archiv unvollständig: {restored} von {archive.row_count} Zeilen"
+            )
+
+        await self.db.execute(text(
+            f"ALTER TABLE {name} ADD CONSTRAINT {name}_bounds "
+            f"CHECK (created_at >= {start} AND created_at < {end})"
+        ))
+        await self.db.execute(text(
+            f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} FOR VALUES FROM ({start}) TO ({end})"
+        ))
+        await self.db.execute(text(f"ALTER TABLE {name} DROP CONSTRAINT {name}_bounds"))
+        await self.db.execute(delete(TransactionArchive).where(TransactionArchive.id == archive.id))
+        cold_archive.evict(archive.file_path)
+        return restored
+
+    async def archived_until(self) -> Optional[datetime]:
+        """Ende (UTC, exklusiv) des jüngsten archivierten Monats"""
+        result = await self.db.execute(select(func.max(TransactionArchive.range_end)))
+        return result.scalar_one_or_none()
@@ -0,0 +1,110 @@
+"""
+Vereinskasse - QR-Codes
+Datei: backend/app/services/qr_code.py
+
+QR-Codes für Payment Links als SVG (ein Pfad, ohne PIL) oder PNG. Gerendert
+wird im Thread-Pool, nicht auf dem Event-Loop; fertige Bilder liegen in
+einem LRU-Cache je (Inhalt, Format). Ausgeliefert über
+GET /sumup/checkouts/{checkout_id}/qr statt als Data-URI in der Response.
+"""
+
+import asyncio
+import hashlib
+import io
+from collections import OrderedDict
+from typing import Tuple
+
+import qrcode
+
+from app.core.config import settings
+
+MEDIA_TYPES = {"svg": "image/svg+xml", "png": "image/png"}
+
+
+def _svg(matrix) -> bytes:
+    """Ein Pfad aus waagerechten Läufen, ganzzahlige Koordinaten (1 Modul = 1)"""
+    size = len(matrix)
+    runs = []
+    for y, row in enumerate(matrix):
+        x = 0
+        while x < size:
+            if not row[x]:
+                x += 1
+                continue
+            start = x
+            while x < size and row[x]:
+                x += 1
+            runs.append(f"M{start} {y}h{x - start}v1h-{x - start}z")
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {size} {size}" shape-rendering="crispEdges">'
+        f'<rect width="100%" height="100%" fill="#fff"/><path d="{"".join(runs)}"/></svg>'
+    ).encode()
+
+
+def _render(data: str, image_format: str) -> bytes:
+    """Blockierend - nur im Thread-Pool aufrufen"""
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=10,
+        border=4,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+
+    if image_format == "svg":
+        return _svg(qr.get_matrix())
+    buffer = io.BytesIO()
+    qr.make_image(fill_color="black", back_color="white").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class QRCodeCache:
+    """
+    LRU-Cache (Inhalt, Format) -> Bild
+
+    Nur vom Event-Loop aus benutzt, daher ohne Lock; gleichzeitige
+    Fehlschläge für denselben Inhalt rendern im schlimmsten Fall doppelt.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._images: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return key in self._images
+
+    async def render(self, data: str, image_format: str = "svg") -> bytes:
+        """
+        QR-Code für data als SVG oder PNG
+
+        Args:
+            data: Zu encodierender String (URL)
+            image_format: "svg" oder "png"
+        """
+        key = (data, image_format)
+        image = self._images.get(key)
+        if image is not None:
+            self._images.move_to_end(key)
+            self.hits += 1
+            return image
+
+        self.misses += 1
+        image = await asyncio.to_thread(_render, data, image_format)
+        self._images[key] = image
+        while len(self._images) > self.max_entries:
+            self._images.popitem(last=False)
+        return image
+
+    @staticmethod
+    def etag(data: str, image_format: str) -> str:
+        """Bild hängt nur vom Inhalt ab - ETag ohne Rendern"""
+        return '"' + hashlib.sha256(f"{image_format}:{data}".encode()).hexdigest()[:32] + '"'
+
+    def stats(self) -> dict:
+        return {"entries": len(self._images), "max_entries": self.max_entries, "hits": self.hits, "misses": self.misses}
+
+
+qr_code_cache = QRCodeCache(max_entries=settings.QR_CODE_CACHE_SIZE)
@@ -0,0 +1,263 @@
+"""
+Vereinskasse - RFID Token Index
+Datei: backend/app/services/rfid_index.py
+
+In-Process Hash-Index RFID-Token -> (User-ID, aktiv) für den Karten-Login.
+Treffer gehen nicht an die DB. Der Index ist pro Worker; Änderungen an
+rfid_token/is_active werden per NOTIFY (zugestellt mit dem Commit) an alle
+Worker verteilt. Ohne LISTEN-Verbindung ist der Index aus und jeder Tap
+geht an die DB.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Optional, Set, Tuple
+
+import asyncpg
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "rfid_index"
+
+
+class RFIDTokenIndex:
+    """
+    Hash-Index RFID-Token -> (user_id, is_active)
+
+    Einträge laufen nach ttl_seconds ab. Unbekannte Tokens werden nicht
+    negativ gecached (neu verknüpfte Karten gehen sofort an die DB).
+
+    Nur aktiv (live), solange die LISTEN-Verbindung steht. Jede
+    Invalidierung erhöht generation; ein DB-Lookup, der vor einer
+    Invalidierung begonnen hat, trägt seinen (evtl. alten) Stand nicht ein.
+    """
+
+    def __init__(self, ttl_seconds: int = 300):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, Tuple[int, bool, float]] = {}
+        self.live = False
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def warm(self, db: AsyncSession) -> int:
+        """
+        Lädt alle RFID-Tokens in den Index
+
+        Args:
+            db: Database Session
+
+        Returns:
+            int: Anzahl geladener Tokens
+        """
+        generation = self.generation
+        result = await db.execute(
+            select(User.rfid_token, User.id, User.is_active)
+            .where(User.rfid_token.is_not(None))
+        )
+        if generation != self.generation:
+            # Während des Ladens invalidiert - Index füllt sich über Misses
+            return 0
+        now = time.monotonic()
+        self._entries = {
+            token: (user_id, is_active, now)
+            for token, user_id, is_active in result.all()
+        }
+        return len(self._entries)
+
+    def lookup(self, rfid_token: str) -> Optional[Tuple[int, bool]]:
+        """
+        Sucht Token im Index
+
+        Returns:
+            Optional[Tuple[int, bool]]: (user_id, is_active) oder None bei Miss/Ablauf
+        """
+        entry = self._entries.get(rfid_token) if self.live else None
+        if entry is None or time.monotonic() - entry[2] > self.ttl_seconds:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0], entry[1]
+
+    def put(self, rfid_token: str, user_id: int, is_active: bool, generation: int) -> None:
+        """
+        Trägt Token nach erfolgreichem DB-Lookup ein
+
+        Args:
+            generation: self.generation vor dem DB-Lookup
+        """
+        if self.live and generation == self.generation:
+            self._entries[rfid_token] = (user_id, is_active, time.monotonic())
+
+    def discard(self, rfid_token: Optional[str]) -> None:
+        """Entfernt Token aus dem Index"""
+        if rfid_token:
+            self.generation += 1
+            self.invalidations += 1
+            self._entries.pop(rfid_token, None)
+
+    def clear(self) -> None:
+        """Leert den kompletten Index"""
+        self.generation += 1
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "live": self.live,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+# Globale Index-Instanz (pro Worker)
+rfid_token_index = RFIDTokenIndex(ttl_seconds=settings.RFID_INDEX_TTL_SECONDS)
+
+
+_PENDING_KEY = "rfid_index_invalidate"
+
+
+def _invalidate_user(mapper, connection, target: User) -> None:
+    """
+    Merkt alte und neue Tokens eines geänderten Users vor; entfernt werden
+    sie erst nach dem Commit. Beim Flush wäre zu früh - ein paralleler
+    Tap könnte bis zum Commit den alten Stand wieder eintragen.
+
+    Für die anderen Worker: NOTIFY in derselben Transaktion, Postgres stellt
+    es erst mit dem Commit zu (bei Rollback gar nicht).
+    """
+    attrs = inspect(target).attrs
+    token_history = attrs.rfid_token.history
+    tokens = {token for token in (*token_history.deleted, *token_history.unchanged, *token_history.added) if token}
+    for token in tokens:
+        connection.execute(select(func.pg_notify(NOTIFY_CHANNEL, token)))
+    session = object_session(target)
+    if session is None:
+        for token in tokens:
+            rfid_token_index.discard(token)
+        return
+    pending: Set[str] = session.info.setdefault(_PENDING_KEY, set())
+    pending.update(tokens)
+
+
+def _invalidate_user_on_update(mapper, connection, target: User) -> None:
+    # Balance-/last_login-Updates (jeder Kauf) lassen den Index unberührt
+    attrs = inspect(target).attrs
+    if attrs.rfid_token.history.has_changes() or attrs.is_active.history.has_changes():
+        _invalidate_user(mapper, connection, target)
+
+
+def _discard_after_commit(session: Session) -> None:
+    for token in session.info.pop(_PENDING_KEY, ()):
+        rfid_token_index.discard(token)
+
+
+def _forget_after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+event.listen(User, "after_insert", _invalidate_user)
+event.listen(User, "after_update", _invalidate_user_on_update)
+event.listen(User, "after_delete", _invalidate_user)
+event.listen(Session, "after_commit", _discard_after_commit)
+event.listen(Session, "after_rollback", _forget_after_rollback)
+
+
+class RFIDIndexWatcher:
+    """
+    Hält rfid_token_index über LISTEN rfid_index aktuell
+
+    Eigene asyncpg-Verbindung auf DIRECT_DATABASE_URL (LISTEN geht nicht
+    über PgBouncer im Transaction-Pooling). Die Verbindung wird alle
+    interval Sekunden geprüft; fällt sie aus, ist der Index bis zum
+    Reconnect aus (Notifications dazwischen wären verloren) und wird danach
+    neu gewärmt.
+    """
+
+    def __init__(self, index: RFIDTokenIndex, interval: float):
+        self.index = index
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self._listen_conn: Optional[asyncpg.Connection] = None
+
+    async def start(self) -> None:
+        if settings.DIRECT_DATABASE_URL is None:
+            logger.warning("RFID-Index aus: LISTEN braucht POSTGRES_DIRECT_HOST im PgBouncer-Modus")
+            return
+        await self._check()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._close_listener()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self._check()
+
+    async def _check(self) -> None:
+        if self._listen_conn is not None and not self._listen_conn.is_closed():
+            try:
+                await self._listen_conn.execute("SELECT 1", timeout=self.interval)
+                return
+            except Exception as e:
+                logger.warning(f"LISTEN {NOTIFY_CHANNEL} unterbrochen, RFID-Index aus: {e}")
+        self._go_offline()
+        await self._close_listener()
+
+        try:
+            self._listen_conn = await asyncpg.connect(settings.DIRECT_DATABASE_URL, timeout=self.interval)
+            self._listen_conn.add_termination_listener(self._on_terminate)
+            await self._listen_conn.add_listener(NOTIFY_CHANNEL, self._on_notify)
+        except Exception as e:
+            logger.debug(f"LISTEN {NOTIFY_CHANNEL} nicht möglich: {e}")
+            await self._close_listener()
+            return
+
+        # Erst lauschen, dann laden - nichts fällt zwischen Laden und LISTEN durch
+        self.index.live = True
+        try:
+            async with AsyncSessionLocal() as db:
+                count = await self.index.warm(db)
+            logger.info(f"RFID-Index gewärmt: {count} Tokens")
+        except Exception as e:
+            logger.warning(f"RFID-Index konnte nicht gewärmt werden: {e}")
+
+    def _go_offline(self) -> None:
+        self.index.live = False
+        self.index.clear()
+
+    async def _close_listener(self) -> None:
+        if self._listen_conn is not None:
+            try:
+                await self._listen_conn.close(timeout=1)
+            except Exception:
+                self._listen_conn.terminate()
+            self._listen_conn = None
+
+    def _on_terminate(self, connection) -> None:
+        if connection is self._listen_conn:
+            self._go_offline()
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        self.index.discard(payload)
+
+
+rfid_index_watcher = RFIDIndexWatcher(rfid_token_index, settings.RFID_INDEX_CHECK_INTERVAL)
@@ -0,0 +1,175 @@
+"""
+Scheduled Jobs - Wartungsjobs für den In-App-Scheduler (app/core/scheduler.py)
+"""
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict
+
+from sqlalchemy import delete, exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.core.config import settings
+from app.core.scheduler import Scheduler
+from app.models.balance_checkpoint import BalanceCheckpoint
+from app.models.guest import Guest
+from app.models.guest_tab import GuestTab
+from app.models.password_reset import PasswordResetCode
+from app.services.balance_reconciliation_service import BalanceReconciliationService
+from app.services.daily_sales_service import DailySalesService, local_sales_date
+from app.services.partition_service import PartitionService
+from app.services.sumup_service import SumUpService
+
+async def _delete_in_batches(db: AsyncSession, model, *where) -> int:
+    """
+    Zeilen in Batches von RETENTION_BATCH_SIZE löschen, Commit je Batch
+
+    Kurze Transaktionen statt eines großen DELETE - keine langen Sperren,
+    ein Abbruch verliert höchstens einen Batch.
+    """
+    deleted = 0
+    while True:
+        batch = select(model.id).where(*where).limit(settings.RETENTION_BATCH_SIZE).scalar_subquery()
+        result = await db.execute(delete(model).where(model.id.in_(batch)))
+        await db.commit()
+        deleted += result.rowcount
+        if result.rowcount < settings.RETENTION_BATCH_SIZE:
+            return deleted
+
+
+async def retention(db: AsyncSession) -> Dict[str, Any]:
+    """
+    Aufräumen:
+
+    - Passwort-Reset-Codes: abgelaufen oder benutzt, älter als PASSWORD_RESET_RETENTION_DAYS
+    - Balance-Checkpoints ohne Drift, älter als BALANCE_CHECKPOINT_RETENTION_DAYS
+      (der jeweils letzte je Mitglied bleibt - Basis für den nächsten Abgleich)
+    - Tab-Positionen abgerechneter Gäste, deren Abrechnung archiviert ist;
+      der Gast selbst bleibt (Name in der Historie, Restore des Archivs)
+    """
+    now = datetime.utcnow()
+
+    reset_cutoff = now - timedelta(days=settings.PASSWORD_RESET_RETENTION_DAYS)
+    reset_codes = await _delete_in_batches(
+        db,
+        PasswordResetCode,
+        (PasswordResetCode.expires_at < reset_cutoff)
+        | (PasswordResetCode.used.is_(True) & (PasswordResetCode.created_at < reset_cutoff)),
+    )
+
+    newer = aliased(BalanceCheckpoint)
+    checkpoints = await _delete_in_batches(
+        db,
+        BalanceCheckpoint,
+        BalanceCheckpoint.created_at < now - timedelta(days=settings.BALANCE_CHECKPOINT_RETENTION_DAYS),
+        BalanceCheckpoint.drift == 0,
+        exists().where(newer.user_id == BalanceCheckpoint.user_id, newer.id > BalanceCheckpoint.id),
+    )
+
+    guest_tabs = 0
+    archived_until = await PartitionService(db).archived_until()
+    if archived_until is not None:
+        guest_tabs = await _delete_in_batches(
+            db,
+            GuestTab,
+            GuestTab.paid.is_(True),
+            GuestTab.guest_id.in_(
+                select(Guest.id).where(Guest.closed_at.is_not(None), Guest.closed_at < archived_until)
+            ),
+        )
+
+    return {"password_reset_codes": reset_codes, "balance_checkpoints": checkpoints, "guest_tabs": guest_tabs}
+
+
+async def stale_checkouts(db: AsyncSession) -> Dict[str, Any]:
+    """Hängende SumUp-Zahlungen gesammelt bei SumUp abfragen und abschließen"""
+    return await SumUpService(db).sweep_stale_pending()
+
+
+async def reconciliation(db: AsyncSession) -> Dict[str, Any]:
+    """Nächtlicher Saldenabgleich (Checkpoints)"""
+    result = await BalanceReconciliationService(db).reconcile()
+    await db.commit()
+    return {"checked_users": result["checked_users"], "horizon_transaction_id": result["horizon_transaction_id"]}
+
+
+async def daily_sales(db: AsyncSession) -> Dict[str, Any]:
+    """Tagesumsätze von gestern und heute neu aufbauen (korrigiert nachträgliche Änderungen)"""
+    today = local_sales_date(datetime.utcnow())
+    rows = await DailySalesService(db).rebuild(today - timedelta(days=1), today)
+    await db.commit()
+    return {"rows": rows}
+
+
+async def partitions(db: AsyncSession) -> Dict[str, Any]:
+    """Künftige Monatspartitionen anlegen, abgelaufene archivieren"""
+    service = PartitionService(db)
+    created = await service.ensure_partitions()
+    await db.commit()
+    archived = await service.archive_expired()
+    return {"created": created, "archived": [archive.partition_name for archive in archived]}
+
+
+async def backup(db: AsyncSession) -> Dict[str, Any]:
+    """
+    pg_dump (custom format) nach BACKUP_DIR, danach alte Dumps löschen
+
+    Ersetzt den cron-Aufruf von deployment/scripts/backup.sh (Uploads
+    sichert weiterhin das Skript). pg_dump braucht eine echte Session -
+    im PgBouncer-Modus daher über POSTGRES_DIRECT_HOST/PORT, ohne diese
+    schlägt der Job mit klarer Meldung fehl.
+    """
+    host, port = settings.POSTGRES_HOST, settings.POSTGRES_PORT
+    if settings.DB_PGBOUNCER_MODE:
+        if not settings.POSTGRES_DIRECT_HOST:
+            raise RuntimeError("Backup im PgBouncer-Modus braucht POSTGRES_DIRECT_HOST (pg_dump nicht über Transaction Pooling)")
+        host, port = settings.POSTGRES_DIRECT_HOST, settings.POSTGRES_DIRECT_PORT
+
+    os.makedirs(settings.BACKUP_DIR, exist_ok=True)
+    path = os.path.join(settings.BACKUP_DIR, f"db_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.dump")
+
+    process = await asyncio.create_subprocess_exec(
+        "pg_dump",
+        "-h", host,
+        "-p", str(port),
+        "-U", settings.POSTGRES_USER,
+        "-d", settings.POSTGRES_DB,
+        "-F", "c",
+        "-f", path,
+        env={**os.environ, "PGPASSWORD": settings.POSTGRES_PASSWORD},
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _, stderr = await process.communicate()
+    if process.returncode != 0:
+        if os.path.exists(path):
+            os.remove(path)
+        raise RuntimeError(f"pg_dump fehlgeschlagen ({process.returncode}): {stderr.decode().strip()}")
+
+    cutoff = time.time() - settings.BACKUP_RETENTION_DAYS * 86400
+    removed = 0
+    for name in os.listdir(settings.BACKUP_DIR):
+        old = os.path.join(settings.BACKUP_DIR, name)
+        if name.endswith(".dump") and os.path.getmtime(old) < cutoff:
+            os.remove(old)
+            removed += 1
+
+    return {"file": path, "size_bytes": os.path.getsize(path), "removed": removed}
+
+
+def register_jobs(scheduler: Scheduler) -> None:
+    """Alle Wartungsjobs anmelden (beim Start)"""
+    scheduler.register("retention", retention, interval_seconds=3600,
+                       description="Alte Reset-Codes, Checkpoints und Gast-Positionen löschen")
+    scheduler.register("stale_checkouts", stale_checkouts, interval_seconds=settings.SUMUP_SWEEP_INTERVAL_SECONDS,
+                       description="Hängende SumUp-Zahlungen abschließen (Sweeper)")
+    scheduler.register("reconciliation", reconciliation, daily_at=settings.RECONCILIATION_SCHEDULE,
+                       description="Saldenabgleich")
+    scheduler.register("daily_sales", daily_sales, daily_at=settings.DAILY_SALES_SCHEDULE,
+                       description="Tagesumsätze neu aufbauen")
+    scheduler.register("partitions", partitions, daily_at=settings.PARTITION_SCHEDULE,
+                       description="Partitionen anlegen und archivieren")
+    if settings.BACKUP_SCHEDULE:
+        scheduler.register("backup", backup, daily_at=settings.BACKUP_SCHEDULE,
+                           description="Datenbank-Backup (pg_dump)")
@@ -7,18 +7,317 @@ KRITISCH: SumUp Cloud API Integration mit Polling
 
 import asyncio
 import httpx
-import qrcode
-import io
-import base64
-from typing import Optional, Dict, Any
+import logging
+import random
+import time
+from typing import Optional, Dict, Any, Iterator, List, Tuple
 from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from fastapi import HTTPException, status as http_status
+from sqlalchemy import BigInteger, Integer, String, column, func, select, update, values
 
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError
 from app.core.config import settings
+from app.core.rate_limiter import RateLimiter, RateLimitExceeded
+from app.core.money import to_cents, to_euros
+from app.core.tasks import task_manager
+from app.db.writes import insert_returning, update_returning
 from app.models.transaction import Transaction, TransactionType, TransactionStatus, PaymentMethod
 from app.models.user import User
 from app.models.settings import SystemSettings
+from app.services.qr_code import qr_code_cache
+
+logger = logging.getLogger(__name__)
+
+# Checkout-Status "PAID" (Checkouts API) bzw. "SUCCESSFUL" (Transaktion)
+SUCCESS_STATUSES = {"PAID", "SUCCESSFUL"}
+
+# Ein HTTP-Client je Worker (Connection-Pool, Keep-Alive) statt je Aufruf
+_client: Optional[httpx.AsyncClient] = None
+
+
+def sumup_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=settings.SUMUP_MAX_CONNECTIONS),
+        )
+    return _client
+
+
+async def close_sumup_client() -> None:
+    """Beim Shutdown (nach dem Drain der Poll-Tasks)"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+sumup_breaker = CircuitBreaker(
+    "sumup",
+    failure_threshold=settings.SUMUP_CIRCUIT_FAILURE_THRESHOLD,
+    reset_seconds=settings.SUMUP_CIRCUIT_RESET_SECONDS,
+)
+
+
+# Prioritätsklassen für das Rate-Limit (0 = zuerst)
+PRIORITY_CHECKOUT = 0
+PRIORITY_STATUS = 1
+PRIORITY_READER = 2
+
+sumup_rate_limiter = RateLimiter(
+    "sumup",
+    rate=settings.SUMUP_RATE_LIMIT_PER_SECOND,
+    burst=settings.SUMUP_RATE_BURST,
+    lease_size=settings.SUMUP_RATE_LEASE_SIZE,
+    priority_reserve=settings.SUMUP_RATE_PRIORITY_RESERVE,
+    priorities={PRIORITY_CHECKOUT: "checkout", PRIORITY_STATUS: "status", PRIORITY_READER: "reader"},
+)
+
+
+class PollProfile:
+    """
+    Polling-Zeitplan einer Zahlungsart
+    
+    Erste Abfrage nach initial Sekunden, danach wächst der Abstand um
+    factor bis max_interval; nach timeout Sekunden ist Schluss.
+    
+    Jedes Profil ist ein eigener Task-Typ mit eigener Concurrency: lange
+    wartende Payment-Link-Poller belegen keine Plätze der Terminal-Poller.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        task: str,
+        concurrency: int,
+        initial: float,
+        max_interval: float,
+        factor: float,
+        timeout: float,
+    ):
+        self.name = name
+        self.task = task
+        self.concurrency = concurrency
+        self.initial = initial
+        self.max_interval = max_interval
+        self.factor = factor
+        self.timeout = timeout
+    
+    def intervals(self) -> Iterator[float]:
+        """Wartezeit vor jeder Abfrage"""
+        elapsed = 0.0
+        interval = self.initial
+        while elapsed + interval <= self.timeout:
+            yield interval
+            elapsed += interval
+            interval = min(interval * self.factor, self.max_interval)
+    
+    @property
+    def sweep_after(self) -> float:
+        """Ab hier läuft sicher kein Poller mehr (letzte Abfrage + Deadline)"""
+        return max(
+            settings.SUMUP_SWEEP_AFTER_SECONDS,
+            self.timeout + self.max_interval + settings.SUMUP_DEADLINE_STATUS_SECONDS,
+        )
+
+
+POLL_PROFILES = {
+    # Terminal: Kunde steht davor, meist in Sekunden bezahlt
+    "cloud_api": PollProfile(
+        "cloud_api",
+        task="sumup_poll",
+        concurrency=settings.SUMUP_POLL_CONCURRENCY,
+        initial=settings.SUMUP_POLL_CLOUD_API_INITIAL,
+        max_interval=settings.SUMUP_POLL_CLOUD_API_MAX_INTERVAL,
+        factor=settings.SUMUP_POLL_BACKOFF_FACTOR,
+        timeout=settings.SUMUP_POLLING_TIMEOUT,
+    ),
+    # Payment Link: Gast öffnet den Link oft erst Minuten später
+    "payment_link": PollProfile(
+        "payment_link",
+        task="sumup_poll_link",
+        concurrency=settings.SUMUP_POLL_LINK_CONCURRENCY,
+        initial=settings.SUMUP_POLL_PAYMENT_LINK_INITIAL,
+        max_interval=settings.SUMUP_POLL_PAYMENT_LINK_MAX_INTERVAL,
+        factor=settings.SUMUP_POLL_BACKOFF_FACTOR,
+        timeout=settings.SUMUP_POLL_PAYMENT_LINK_TIMEOUT,
+    ),
+}
+
+
+class PollMetrics:
+    """
+    Status-Abfragen je abgeschlossener Zahlung, pro Worker
+    
+    Vergleichswert: Abfragen, die der frühere feste Takt
+    (SUMUP_POLLING_INTERVAL, erste Abfrage sofort) bis zum selben
+    Ergebnis gebraucht hätte.
+    """
+    
+    OUTCOMES = ("successful", "failed", "timeout", "aborted")
+    
+    def __init__(self):
+        self.profiles: Dict[str, Dict[str, Any]] = {
+            name: {"outcomes": dict.fromkeys(self.OUTCOMES, 0), "calls": 0, "fixed_interval_calls": 0, "seconds": 0.0}
+            for name in POLL_PROFILES
+        }
+    
+    def record(self, profile: PollProfile, outcome: str, calls: int, elapsed: float) -> None:
+        entry = self.profiles[profile.name]
+        entry["outcomes"][outcome] += 1
+        entry["calls"] += calls
+        entry["seconds"] += elapsed
+        interval = settings.SUMUP_POLLING_INTERVAL
+        if outcome == "timeout":
+            entry["fixed_interval_calls"] += int(settings.SUMUP_POLLING_TIMEOUT // interval)
+        elif outcome != "aborted":
+            entry["fixed_interval_calls"] += int(elapsed // interval) + 1
+    
+    def stats(self) -> Dict[str, Any]:
+        result = {}
+        for name, entry in self.profiles.items():
+            completed = sum(n for outcome, n in entry["outcomes"].items() if outcome != "aborted")
+            profile = POLL_PROFILES[name]
+            result[name] = {
+                "schedule": {
+                    "initial_seconds": profile.initial,
+                    "max_interval_seconds": profile.max_interval,
+                    "factor": profile.factor,
+                    "timeout_seconds": profile.timeout,
+                    "max_calls": sum(1 for _ in profile.intervals()),
+                },
+                "outcomes": entry["outcomes"],
+                "status_calls": entry["calls"],
+                "calls_per_payment": round(entry["calls"] / completed, 2) if completed else None,
+                "fixed_interval_calls_per_payment": (
+                    round(entry["fixed_interval_calls"] / completed, 2) if completed else None
+                ),
+                "reduction_percent": (
+                    round(100 * (1 - entry["calls"] / entry["fixed_interval_calls"]), 1)
+                    if entry["fixed_interval_calls"] else None
+                ),
+                "avg_seconds_to_result": round(entry["seconds"] / completed, 1) if completed else None,
+            }
+        return result
+
+
+poll_metrics = PollMetrics()
+
+
+def _older_than_poll_profile():
+    """Bedingung: Polling-Timeout der Zahlungsart (mit Reserve) abgelaufen"""
+    now = datetime.utcnow()
+    link = POLL_PROFILES["payment_link"]
+    cloud = POLL_PROFILES["cloud_api"]
+    return (
+        (
+            (Transaction.payment_method == PaymentMethod.SUMUP_PAYMENT_LINK)
+            & (Transaction.created_at < now - timedelta(seconds=link.sweep_after))
+        )
+        | (
+            (Transaction.payment_method != PaymentMethod.SUMUP_PAYMENT_LINK)
+            & (Transaction.created_at < now - timedelta(seconds=cloud.sweep_after))
+        )
+    )
+
+
+class SumUpUnavailable(Exception):
+    """SumUp nicht erreichbar (Circuit offen, Deadline, 5xx) - Barzahlung anbieten"""
+
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _retry_after(response: httpx.Response) -> float:
+    try:
+        return float(response.headers.get("Retry-After", 1))
+    except ValueError:
+        return 1.0
+
+
+async def sumup_request(
+    method: str,
+    url: str,
+    headers: Dict[str, str],
+    deadline: float,
+    idempotent: bool,
+    priority: int,
+    json: Optional[Dict[str, Any]] = None,
+) -> httpx.Response:
+    """
+    SumUp-Aufruf mit Deadline, Rate-Limit, Circuit Breaker und Retries
+    
+    Die Deadline gilt für den ganzen Aufruf inkl. Retries. Wiederholt wird
+    nur bei idempotenten Aufrufen (GET) nach Netzwerkfehler, Timeout, 5xx
+    oder 429 - mit Backoff und Full Jitter, damit Poller mehrerer Worker
+    nicht im Gleichtakt nachlegen. Ein POST /checkouts könnte nach einem
+    Timeout bei SumUp schon angelegt sein und wird nie wiederholt.
+    
+    Jeder Versuch braucht ein Token aus sumup_rate_limiter (priority:
+    PRIORITY_CHECKOUT vor PRIORITY_STATUS vor PRIORITY_READER); die
+    Wartezeit zählt zur Deadline. 429 leert den gemeinsamen Bucket und
+    gilt nicht als Ausfall für den Circuit Breaker.
+    
+    Returns:
+        httpx.Response: 2xx oder 4xx (4xx wertet der Aufrufer aus)
+        
+    Raises:
+        SumUpUnavailable: Circuit offen, Deadline abgelaufen (auch beim
+            Warten auf ein Token), Netzwerkfehler, 5xx
+    """
+    loop = asyncio.get_running_loop()
+    deadline_at = loop.time() + deadline
+    attempts = settings.SUMUP_RETRY_ATTEMPTS if idempotent else 1
+    error = "Deadline abgelaufen"
+    
+    for attempt in range(attempts):
+        if sumup_breaker.is_open():
+            raise SumUpUnavailable(f"{method} {url}: Circuit offen", retry_after=sumup_breaker.retry_after())
+        try:
+            await sumup_rate_limiter.acquire(priority, timeout=deadline_at - loop.time())
+        except RateLimitExceeded as e:
+            raise SumUpUnavailable(f"{method} {url}: {e}", retry_after=1.0)
+        
+        remaining = deadline_at - loop.time()
+        if remaining <= 0:
+            break
+        try:
+            sumup_breaker.before_call()
+        except CircuitOpenError as e:
+            raise SumUpUnavailable(str(e), retry_after=e.retry_after)
+        
+        try:
+            async with asyncio.timeout(remaining):
+                response = await sumup_client().request(method, url, headers=headers, json=json)
+        except asyncio.CancelledError:
+            sumup_breaker.release()
+            raise
+        except (httpx.HTTPError, TimeoutError) as e:
+            error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+        else:
+            if response.status_code == 429:
+                # Gedrosselt, nicht ausgefallen - alle Worker bremsen
+                sumup_breaker.release()
+                await sumup_rate_limiter.drain(_retry_after(response))
+                error = "HTTP 429"
+            elif response.status_code < 500:
+                sumup_breaker.record_success()
+                return response
+            else:
+                error = f"HTTP {response.status_code}"
+        if error != "HTTP 429":
+            sumup_breaker.record_failure(error)
+        
+        if attempt + 1 < attempts:
+            backoff = random.uniform(0, settings.SUMUP_RETRY_BASE_DELAY * 2 ** attempt)
+            if loop.time() + backoff >= deadline_at:
+                break
+            await asyncio.sleep(backoff)
+    
+    raise SumUpUnavailable(f"{method} {url}: {error}", retry_after=sumup_breaker.retry_after())
 
 
 class SumUpService:
@@ -91,7 +390,8 @@ class SumUpService:
             Dict mit Checkout-Daten
             
         Raises:
-            Exception: Bei API-Fehler
+            SumUpUnavailable: SumUp nicht erreichbar
+            Exception: Bei API-Fehler (4xx)
         """
         reader_id = await self.get_reader_id()
         
@@ -109,21 +409,19 @@ class SumUpService:
             }
         }
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.post(
-                    f"{self.api_base_url}/checkouts",
-                    json=payload,
-                    headers=self.headers
-                )
-                response.raise_for_status()
-                return response.json()
-                
-            except httpx.HTTPStatusError as e:
-                error_detail = e.response.json() if e.response.text else str(e)
-                raise Exception(f"SumUp API Error: {error_detail}")
-            except Exception as e:
-                raise Exception(f"SumUp Request Failed: {str(e)}")
+        response = await sumup_request(
+            "POST",
+            f"{self.api_base_url}/checkouts",
+            headers=self.headers,
+            deadline=settings.SUMUP_DEADLINE_CHECKOUT_SECONDS,
+            idempotent=False,
+            priority=PRIORITY_CHECKOUT,
+            json=payload,
+        )
+        if response.is_error:
+            error_detail = response.json() if response.text else response.status_code
+            raise Exception(f"SumUp API Error: {error_detail}")
+        return response.json()
     
     async def get_checkout_status(self, checkout_id: str) -> Dict[str, Any]:
         """
@@ -134,126 +432,312 @@ class SumUpService:
             
         Returns:
             Dict mit Status-Informationen
+            
+        Raises:
+            SumUpUnavailable: SumUp nicht erreichbar (nach Retries)
         """
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            try:
-                response = await client.get(
-                    f"{self.api_base_url}/checkouts/{checkout_id}",
-                    headers=self.headers
-                )
-                response.raise_for_status()
-                return response.json()
-                
-            except Exception as e:
-                raise Exception(f"Status Check Failed: {str(e)}")
+        response = await sumup_request(
+            "GET",
+            f"{self.api_base_url}/checkouts/{checkout_id}",
+            headers=self.headers,
+            deadline=settings.SUMUP_DEADLINE_STATUS_SECONDS,
+            idempotent=True,
+            priority=PRIORITY_STATUS,
+        )
+        if response.is_error:
+            raise Exception(f"Status Check Failed: HTTP {response.status_code}")
+        return response.json()
     
     async def poll_checkout_status(
         self,
         checkout_id: str,
         transaction_id: int,
-        max_attempts: int = None,
-        interval: int = None
+        payment_method: str = "cloud_api",
     ) -> None:
         """
         Pollt Checkout Status bis Completion oder Timeout
         
+        Läuft als Task des Profils ("sumup_poll" bzw. "sumup_poll_link") im
+        task_manager (eigene Session). Die
+        DB wird erst beim Endstatus angefasst; die Buchung ist idempotent,
+        ein zweiter Poller (Neustart, anderer Worker) bucht nicht doppelt.
+        Ist der Circuit offen, hört der Poller auf und lässt die Zahlung
+        pending - der Sweeper fragt sie nach, wenn SumUp wieder antwortet.
+        
+        Zeitplan aus POLL_PROFILES: Terminal-Zahlungen anfangs schnell,
+        Payment Links langsamer und länger; der Abstand wächst jeweils
+        exponentiell. Abfragen je Zahlung zählt poll_metrics.
+        
         Args:
             checkout_id: SumUp Checkout ID
             transaction_id: Interne Transaction ID
-            max_attempts: Max Polling-Versuche (default: aus config)
-            interval: Polling-Interval in Sekunden (default: aus config)
+            payment_method: "cloud_api" oder "payment_link" (Polling-Profil)
         """
-        if max_attempts is None:
-            max_attempts = settings.SUMUP_POLLING_TIMEOUT // settings.SUMUP_POLLING_INTERVAL
-        
-        if interval is None:
-            interval = settings.SUMUP_POLLING_INTERVAL
+        profile = POLL_PROFILES.get(payment_method, POLL_PROFILES["cloud_api"])
+        started = time.monotonic()
+        calls = 0
+        outcome = "aborted"
         
-        attempt = 0
-        
-        while attempt < max_attempts:
-            try:
-                # Status abrufen
-                status_data = await self.get_checkout_status(checkout_id)
-                status = status_data.get("status")
-                
-                # Transaction aus DB laden
-                result = await self.db.execute(
-                    select(Transaction).where(Transaction.id == transaction_id)
-                )
-                transaction = result.scalar_one_or_none()
+        try:
+            for attempt, interval in enumerate(profile.intervals()):
+                await asyncio.sleep(interval)
+                calls += 1
+                try:
+                    status_data = await self.get_checkout_status(checkout_id)
+                except SumUpUnavailable as e:
+                    if sumup_breaker.is_open():
+                        logger.warning(f"Polling {checkout_id} beendet, SumUp nicht erreichbar: {e}")
+                        return
+                    logger.warning(f"Polling Error {checkout_id} (Attempt {attempt}): {e}")
+                    continue
+                except Exception as e:
+                    logger.warning(f"Polling Error {checkout_id} (Attempt {attempt}): {e}")
+                    continue
                 
-                if not transaction:
-                    print(f"⚠️  Transaction {transaction_id} nicht gefunden")
-                    break
+                status = status_data.get("status")
+                if status in SUCCESS_STATUSES:
+                    outcome = "successful"
+                    if await self._process_successful_payment(transaction_id, status_data):
+                        logger.info(f"Zahlung erfolgreich: {checkout_id}")
+                    return
                 
-                if status == "SUCCESSFUL":
-                    # Erfolgreiche Zahlung
-                    await self._process_successful_payment(
-                        transaction,
-                        status_data
-                    )
-                    print(f"✅ Zahlung erfolgreich: {checkout_id}")
-                    break
-                    
-                elif status == "FAILED":
-                    # Fehlgeschlagene Zahlung
-                    transaction.status = TransactionStatus.FAILED
-                    await self.db.commit()
-                    print(f"❌ Zahlung fehlgeschlagen: {checkout_id}")
-                    break
+                if status == "FAILED":
+                    outcome = "failed"
+                    await self._mark_failed(transaction_id)
+                    logger.info(f"Zahlung fehlgeschlagen: {checkout_id}")
+                    return
                 
                 # Status noch PENDING → weiter warten
-                await asyncio.sleep(interval)
-                attempt += 1
-                
-            except Exception as e:
-                print(f"⚠️  Polling Error (Attempt {attempt}): {e}")
-                await asyncio.sleep(interval)
-                attempt += 1
-        
-        # Timeout erreicht
-        if attempt >= max_attempts:
-            result = await self.db.execute(
-                select(Transaction).where(Transaction.id == transaction_id)
-            )
-            transaction = result.scalar_one_or_none()
             
-            if transaction and transaction.status == TransactionStatus.PENDING:
-                transaction.status = TransactionStatus.FAILED
-                await self.db.commit()
-                print(f"⏱️  Timeout: {checkout_id}")
+            # Timeout erreicht
+            outcome = "timeout"
+            if await self._mark_failed(transaction_id):
+                logger.warning(f"Timeout: {checkout_id}")
+        finally:
+            poll_metrics.record(profile, outcome, calls, time.monotonic() - started)
+    
+    async def _mark_failed(self, transaction_id: int) -> bool:
+        """pending -> failed; False wenn schon abgeschlossen"""
+        transaction = await update_returning(
+            self.db,
+            Transaction,
+            Transaction.id == transaction_id,
+            Transaction.status == TransactionStatus.pending,
+            status=TransactionStatus.failed,
+            completed_at=datetime.utcnow(),
+        )
+        await self.db.commit()
+        return transaction is not None
     
     async def _process_successful_payment(
         self,
-        transaction: Transaction,
+        transaction_id: int,
         sumup_data: Dict[str, Any]
-    ) -> None:
+    ) -> bool:
         """
-        Verarbeitet erfolgreiche Zahlung
+        Verarbeitet erfolgreiche Zahlung (pending -> successful, Guthaben gutschreiben)
         
         Args:
-            transaction: Transaction Objekt
+            transaction_id: Transaction ID
             sumup_data: SumUp Response Data
+            
+        Returns:
+            bool: False wenn die Transaktion nicht (mehr) pending war
         """
-        # Update Transaction
-        transaction.status = TransactionStatus.SUCCESSFUL
-        transaction.sumup_transaction_code = sumup_data.get("transaction_code")
-        transaction.completed_at = datetime.utcnow()
+        transaction = await update_returning(
+            self.db,
+            Transaction,
+            Transaction.id == transaction_id,
+            Transaction.status == TransactionStatus.pending,
+            status=TransactionStatus.successful,
+            sumup_transaction_code=sumup_data.get("transaction_code"),
+            completed_at=datetime.utcnow(),
+        )
+        if transaction is None:
+            await self.db.rollback()
+            return False
         
-        # Update User Balance
+        # Update User Balance (atomar in der DB)
         if transaction.user_id:
-            result = await self.db.execute(
-                select(User).where(User.id == transaction.user_id)
+            user = await update_returning(
+                self.db,
+                User,
+                User.id == transaction.user_id,
+                balance=User.balance + transaction.amount,
             )
-            user = result.scalar_one_or_none()
-            
             if user:
-                transaction.balance_before = user.balance
-                user.balance += transaction.amount
-                transaction.balance_after = user.balance
+                await update_returning(
+                    self.db,
+                    Transaction,
+                    Transaction.id == transaction.id,
+                    Transaction.created_at == transaction.created_at,
+                    balance_before=to_euros(to_cents(user.balance) - to_cents(transaction.amount)),
+                    balance_after=user.balance,
+                )
         
         await self.db.commit()
+        return True
+    
+    # ==========================================
+    # SWEEPER (hängende pending-Zahlungen)
+    # ==========================================
+    
+    async def sweep_stale_pending(self) -> Dict[str, int]:
+        """
+        Offene SumUp-Zahlungen abschließen, deren Polling-Profil abgelaufen ist
+        (mindestens SUMUP_SWEEP_AFTER_SECONDS, Payment Links später)
+        
+        Ihr Poller ist weg (Worker abgestürzt, Neustart). Je Batch von
+        SUMUP_SWEEP_BATCH_SIZE: Status aller Checkouts parallel abfragen
+        (max. SUMUP_SWEEP_CONCURRENCY über den gemeinsamen Client), dann
+        bezahlte und fehlgeschlagene mengenbasiert buchen, ein Commit je
+        Batch. Wie beim Poller gilt: wer nach dem Timeout noch PENDING
+        ist, ist failed. Nicht abfragbare Checkouts bleiben pending und
+        kommen beim nächsten Lauf wieder; bei offenem Circuit wird nicht
+        gefegt.
+        
+        Returns:
+            Dict: checked, successful, failed, unresolved
+        """
+        semaphore = asyncio.Semaphore(settings.SUMUP_SWEEP_CONCURRENCY)
+        report = {"checked": 0, "successful": 0, "failed": 0, "unresolved": 0}
+        
+        async def fetch(checkout_id: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    return await self.get_checkout_status(checkout_id)
+                except Exception as e:
+                    logger.warning(f"Sweeper: Status {checkout_id} nicht abfragbar: {e}")
+                    return None
+        
+        after_id = 0
+        while not sumup_breaker.is_open():
+            result = await self.db.execute(
+                select(Transaction.id, Transaction.sumup_checkout_id)
+                .where(
+                    Transaction.status == TransactionStatus.pending,
+                    _older_than_poll_profile(),
+                    Transaction.id > after_id,
+                )
+                .order_by(Transaction.id)
+                .limit(settings.SUMUP_SWEEP_BATCH_SIZE)
+            )
+            batch = result.all()
+            if not batch:
+                break
+            after_id = batch[-1].id
+            
+            with_checkout = [row for row in batch if row.sumup_checkout_id]
+            statuses = await asyncio.gather(*(fetch(row.sumup_checkout_id) for row in with_checkout))
+            
+            paid = []
+            # Ohne Checkout-ID ist die Anlage abgebrochen - nie bezahlbar
+            failed = [row.id for row in batch if not row.sumup_checkout_id]
+            for row, data in zip(with_checkout, statuses):
+                if data is None:
+                    report["unresolved"] += 1
+                elif data.get("status") in SUCCESS_STATUSES:
+                    paid.append((row.id, data.get("transaction_code")))
+                else:
+                    failed.append(row.id)
+            
+            report["checked"] += len(batch)
+            report["successful"] += await self._apply_successful(paid)
+            report["failed"] += await self._apply_failed(failed)
+            await self.db.commit()
+            
+            if len(batch) < settings.SUMUP_SWEEP_BATCH_SIZE:
+                break
+        
+        if report["checked"]:
+            logger.info(f"Sweeper: {report}")
+        return report
+    
+    async def _apply_successful(self, paid: List[Tuple[int, Optional[str]]]) -> int:
+        """
+        pending -> successful und Gutschrift für viele Zahlungen auf einmal
+        
+        Ein Statement bucht Transaktionen und Guthaben (Summe je Mitglied);
+        balance_before/after werden danach aus dem neuen Saldo
+        zurückgerechnet. Schon abgeschlossene Zahlungen fallen über
+        status = pending heraus (idempotent wie beim Poller).
+        """
+        if not paid:
+            return 0
+        
+        paid_values = values(
+            column("id", Integer), column("code", String), name="paid"
+        ).data(paid)
+        done = (
+            update(Transaction)
+            .where(Transaction.id == paid_values.c.id, Transaction.status == TransactionStatus.pending)
+            .values(
+                status=TransactionStatus.successful,
+                sumup_transaction_code=paid_values.c.code,
+                completed_at=datetime.utcnow(),
+            )
+            .returning(Transaction.id, Transaction.created_at, Transaction.user_id, Transaction.amount)
+            .cte("done")
+        )
+        totals = (
+            select(done.c.user_id, func.sum(done.c.amount).label("total"))
+            .where(done.c.user_id.is_not(None))
+            .group_by(done.c.user_id)
+            .subquery("totals")
+        )
+        credit = (
+            update(User)
+            .where(User.id == totals.c.user_id)
+            .values(balance=User.balance + totals.c.total)
+            .returning(User.id, User.balance)
+            .cte("credit")
+        )
+        result = await self.db.execute(
+            select(done.c.id, done.c.created_at, done.c.user_id, done.c.amount, credit.c.balance)
+            .outerjoin(credit, credit.c.id == done.c.user_id)
+            .order_by(done.c.id.desc())
+        )
+        rows = result.all()
+        
+        # Vom neuen Saldo rückwärts: neueste Zahlung endet beim aktuellen Saldo
+        running: Dict[int, int] = {}
+        balances = []
+        for row in rows:
+            if row.user_id is None or row.balance is None:
+                continue
+            after = running.get(row.user_id, to_cents(row.balance))
+            before = after - to_cents(row.amount)
+            running[row.user_id] = before
+            balances.append((row.id, row.created_at, before, after))
+        
+        if balances:
+            balance_values = values(
+                column("id", Integer),
+                column("created_at", Transaction.created_at.type),
+                column("before", BigInteger),
+                column("after", BigInteger),
+                name="balances",
+            ).data(balances)
+            await self.db.execute(
+                update(Transaction)
+                .where(
+                    Transaction.id == balance_values.c.id,
+                    Transaction.created_at == balance_values.c.created_at,
+                )
+                .values(balance_before=balance_values.c.before, balance_after=balance_values.c.after)
+            )
+        
+        return len(rows)
+    
+    async def _apply_failed(self, transaction_ids: List[int]) -> int:
+        if not transaction_ids:
+            return 0
+        result = await self.db.execute(
+            update(Transaction)
+            .where(Transaction.id.in_(transaction_ids), Transaction.status == TransactionStatus.pending)
+            .values(status=TransactionStatus.failed, completed_at=datetime.utcnow())
+        )
+        return result.rowcount
     
     # ==========================================
     # PAYMENT LINK METHODS
@@ -274,7 +758,7 @@ class SumUpService:
             transaction_reference: Eindeutige Referenz
             
         Returns:
-            Dict mit Payment Link URL und QR-Code
+            Dict mit Payment Link URL und URL des QR-Codes
         """
         # Payment Link über SumUp API erstellen
         payload = {
@@ -286,61 +770,61 @@ class SumUpService:
             "pay_to_email": settings.SMTP_FROM if settings.SMTP_ENABLED else None
         }
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.post(
-                    f"{self.api_base_url}/checkouts",
-                    json=payload,
-                    headers=self.headers
-                )
-                response.raise_for_status()
-                checkout_data = response.json()
-                
-                # Payment URL konstruieren
-                checkout_id = checkout_data.get("id")
-                payment_url = f"https://pay.sumup.com/b2c/{self.merchant_code}/{checkout_id}"
-                
-                # QR-Code generieren
-                qr_code_base64 = self._generate_qr_code(payment_url)
-                
-                return {
-                    "checkout_id": checkout_id,
-                    "payment_url": payment_url,
-                    "qr_code": qr_code_base64,
-                    "amount": amount,
-                    "description": description
-                }
-                
-            except Exception as e:
-                raise Exception(f"Payment Link Creation Failed: {str(e)}")
-    
-    def _generate_qr_code(self, data: str) -> str:
-        """
-        Generiert QR-Code als Base64 String
-        
-        Args:
-            data: Zu encodierender String (URL)
-            
-        Returns:
-            str: Base64-encodiertes PNG
-        """
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
+        response = await sumup_request(
+            "POST",
+            f"{self.api_base_url}/checkouts",
+            headers=self.headers,
+            deadline=settings.SUMUP_DEADLINE_CHECKOUT_SECONDS,
+            idempotent=False,
+            priority=PRIORITY_CHECKOUT,
+            json=payload,
         )
-        qr.add_data(data)
-        qr.make(fit=True)
+        if response.is_error:
+            raise Exception(f"Payment Link Creation Failed: HTTP {response.status_code}")
+        checkout_data = response.json()
         
-        img = qr.make_image(fill_color="black", back_color="white")
+        checkout_id = checkout_data.get("id")
         
-        # Convert to Base64
-        buffer = io.BytesIO()
-        img.save(buffer, format="PNG")
-        img_base64 = base64.b64encode(buffer.getvalue()).decode()
+        return {
+            "checkout_id": checkout_id,
+            "payment_url": self.payment_url(checkout_id),
+            # Bild separat (cachebar) statt als Data-URI in jeder Response
+            "qr_code_url": f"/api/v1/sumup/checkouts/{checkout_id}/qr",
+            "amount": amount,
+            "description": description
+        }
+    
+    def payment_url(self, checkout_id: str) -> str:
+        return f"https://pay.sumup.com/b2c/{self.merchant_code}/{checkout_id}"
+    
+    async def get_payment_link_qr(self, checkout_id: str, image_format: str = "svg") -> bytes:
+        """
+        QR-Code eines Payment Links (SVG oder PNG)
+        
+        Gerendert wird nur für Payment Links, die es gibt und deren Polling
+        noch läuft; was schon im Cache liegt, wurde bereits geprüft.
         
-        return f"data:image/png;base64,{img_base64}"
+        Raises:
+            HTTPException: 404 wenn kein solcher Payment Link existiert
+        """
+        payment_url = self.payment_url(checkout_id)
+        if (payment_url, image_format) not in qr_code_cache:
+            since = datetime.utcnow() - timedelta(seconds=POLL_PROFILES["payment_link"].sweep_after)
+            result = await self.db.execute(
+                select(Transaction.id)
+                .where(
+                    Transaction.sumup_checkout_id == checkout_id,
+                    Transaction.payment_method == PaymentMethod.SUMUP_PAYMENT_LINK,
+                    Transaction.created_at >= since,
+                )
+                .limit(1)
+            )
+            if result.scalar_one_or_none() is None:
+                raise HTTPException(
+                    status_code=http_status.HTTP_404_NOT_FOUND,
+                    detail="Payment Link nicht gefunden"
+                )
+        return await qr_code_cache.render(payment_url, image_format)
     
     # ==========================================
     # HIGH-LEVEL METHODS
@@ -363,43 +847,50 @@ class SumUpService:
         Returns:
             Dict mit Checkout-Informationen
         """
+        # SumUp ausgefallen: sofort ablehnen (Barzahlung), keine pending-Transaktion
+        if sumup_breaker.is_open():
+            self._raise_unavailable(sumup_breaker.retry_after())
+        
         # Mode bestimmen
         if payment_method is None:
             payment_method = await self.get_sumup_mode()
         
         # Transaction erstellen
-        transaction = Transaction(
-            transaction_reference=Transaction.generate_reference(TransactionType.TOP_UP),
+        description = f"Guthaben-Aufladung: {amount}€"
+        transaction = await insert_returning(
+            self.db,
+            Transaction,
+            transaction_reference=Transaction.generate_reference(TransactionType.top_up),
             user_id=user_id,
-            transaction_type=TransactionType.TOP_UP,
-            status=TransactionStatus.PENDING,
+            transaction_type=TransactionType.top_up,
+            status=TransactionStatus.pending,
             amount=amount,
             payment_method=PaymentMethod.SUMUP_CLOUD_API if payment_method == "cloud_api" else PaymentMethod.SUMUP_PAYMENT_LINK,
-            description=f"Guthaben-Aufladung: {amount}€"
+            description=description,
         )
-        
-        self.db.add(transaction)
         await self.db.commit()
-        await self.db.refresh(transaction)
         
         # Checkout erstellen
         if payment_method == "cloud_api":
             # Cloud API Checkout
-            checkout_data = await self.create_cloud_api_checkout(
-                amount=amount,
-                description=transaction.description,
-                transaction_reference=transaction.transaction_reference
+            checkout_data = await self._create_or_fail(
+                transaction,
+                self.create_cloud_api_checkout(
+                    amount=amount,
+                    description=description,
+                    transaction_reference=transaction.transaction_reference
+                )
             )
             
-            transaction.sumup_checkout_id = checkout_data.get("id")
-            await self.db.commit()
+            await self._set_checkout_id(transaction, checkout_data.get("id"))
             
-            # Polling im Hintergrund starten
-            asyncio.create_task(
-                self.poll_checkout_status(
-                    checkout_id=checkout_data.get("id"),
-                    transaction_id=transaction.id
-                )
+            # Polling im Hintergrund starten (eigene Session, überlebt den Request)
+            task_manager.submit(
+                POLL_PROFILES["cloud_api"].task,
+                key=checkout_data.get("id"),
+                checkout_id=checkout_data.get("id"),
+                transaction_id=transaction.id,
+                payment_method="cloud_api",
             )
             
             return {
@@ -412,21 +903,24 @@ class SumUpService:
             
         else:
             # Payment Link
-            link_data = await self.create_payment_link(
-                amount=amount,
-                description=transaction.description,
-                transaction_reference=transaction.transaction_reference
+            link_data = await self._create_or_fail(
+                transaction,
+                self.create_payment_link(
+                    amount=amount,
+                    description=description,
+                    transaction_reference=transaction.transaction_reference
+                )
             )
             
-            transaction.sumup_checkout_id = link_data.get("checkout_id")
-            await self.db.commit()
+            await self._set_checkout_id(transaction, link_data.get("checkout_id"))
             
-            # Polling im Hintergrund starten
-            asyncio.create_task(
-                self.poll_checkout_status(
-                    checkout_id=link_data.get("checkout_id"),
-                    transaction_id=transaction.id
-                )
+            # Polling im Hintergrund starten (eigene Session, überlebt den Request)
+            task_manager.submit(
+                POLL_PROFILES["payment_link"].task,
+                key=link_data.get("checkout_id"),
+                checkout_id=link_data.get("checkout_id"),
+                transaction_id=transaction.id,
+                payment_method="payment_link",
             )
             
             return {
@@ -434,11 +928,45 @@ class SumUpService:
                 "checkout_id": link_data.get("checkout_id"),
                 "method": "payment_link",
                 "payment_url": link_data.get("payment_url"),
-                "qr_code": link_data.get("qr_code"),
+                "qr_code_url": link_data.get("qr_code_url"),
                 "status": "pending",
                 "message": "Bitte QR-Code scannen oder Link öffnen"
             }
     
+    async def _create_or_fail(self, transaction: Transaction, create) -> Dict[str, Any]:
+        """
+        Checkout anlegen; schlägt das fehl, ist die Transaktion sofort failed
+        
+        SumUp nicht erreichbar wird zu 503 (Frontend bietet Barzahlung an).
+        """
+        try:
+            return await create
+        except SumUpUnavailable as e:
+            await self._mark_failed(transaction.id)
+            logger.warning(f"Checkout {transaction.transaction_reference} nicht angelegt: {e}")
+            self._raise_unavailable(e.retry_after)
+        except Exception:
+            await self._mark_failed(transaction.id)
+            raise
+    
+    @staticmethod
+    def _raise_unavailable(retry_after: float) -> None:
+        raise HTTPException(
+            status_code=http_status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="SumUp derzeit nicht erreichbar - bitte bar bezahlen",
+            headers={"Retry-After": str(max(int(retry_after), 1))},
+        )
+    
+    async def _set_checkout_id(self, transaction: Transaction, checkout_id: Optional[str]) -> None:
+        await update_returning(
+            self.db,
+            Transaction,
+            Transaction.id == transaction.id,
+            Transaction.created_at == transaction.created_at,
+            sumup_checkout_id=checkout_id,
+        )
+        await self.db.commit()
+    
     async def get_transaction_status(self, transaction_id: int) -> Dict[str, Any]:
         """
         Holt Transaction Status
@@ -459,9 +987,9 @@ class SumUpService:
         
         return {
             "transaction_id": transaction.id,
-            "status": transaction.status.value,
+            "status": transaction.status,
             "amount": transaction.amount,
-            "payment_method": transaction.payment_method.value if transaction.payment_method else None,
+            "payment_method": transaction.payment_method,
             "completed_at": transaction.completed_at.isoformat() if transaction.completed_at else None,
             "balance_after": transaction.balance_after
         }
@@ -486,38 +1014,41 @@ class SumUpService:
             "name": reader_name
         }
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.post(
-                    f"{self.api_base_url}/merchants/{self.merchant_code}/readers",
-                    json=payload,
-                    headers=self.headers
-                )
-                response.raise_for_status()
-                reader_data = response.json()
-                
-                # Reader ID in Settings speichern
-                result = await self.db.execute(
-                    select(SystemSettings).where(SystemSettings.id == 1)
-                )
-                sys_settings = result.scalar_one_or_none()
-                
-                if not sys_settings:
-                    sys_settings = SystemSettings(id=1)
-                    self.db.add(sys_settings)
-                
-                sys_settings.sumup_reader_id = reader_data.get("id")
-                sys_settings.sumup_reader_name = reader_name
-                await self.db.commit()
-                
-                return {
-                    "reader_id": reader_data.get("id"),
-                    "name": reader_name,
-                    "status": "paired"
-                }
-                
-            except Exception as e:
-                raise Exception(f"Reader Pairing Failed: {str(e)}")
+        try:
+            response = await sumup_request(
+                "POST",
+                f"{self.api_base_url}/merchants/{self.merchant_code}/readers",
+                headers=self.headers,
+                deadline=settings.SUMUP_DEADLINE_READER_SECONDS,
+                idempotent=False,
+                priority=PRIORITY_READER,
+                json=payload,
+            )
+            response.raise_for_status()
+            reader_data = response.json()
+            
+            # Reader ID in Settings speichern
+            result = await self.db.execute(
+                select(SystemSettings).where(SystemSettings.id == 1)
+            )
+            sys_settings = result.scalar_one_or_none()
+            
+            if not sys_settings:
+                sys_settings = SystemSettings(id=1)
+                self.db.add(sys_settings)
+            
+            sys_settings.sumup_reader_id = reader_data.get("id")
+            sys_settings.sumup_reader_name = reader_name
+            await self.db.commit()
+            
+            return {
+                "reader_id": reader_data.get("id"),
+                "name": reader_name,
+                "status": "paired"
+            }
+            
+        except Exception as e:
+            raise Exception(f"Reader Pairing Failed: {str(e)}")
     
     async def get_reader_status(self, reader_id: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -535,28 +1066,31 @@ class SumUpService:
         if not reader_id:
             return {"status": "not_configured"}
         
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            try:
-                response = await client.get(
-                    f"{self.api_base_url}/merchants/{self.merchant_code}/readers/{reader_id}",
-                    headers=self.headers
-                )
-                response.raise_for_status()
-                reader_data = response.json()
-                
-                return {
-                    "reader_id": reader_id,
-                    "name": reader_data.get("name"),
-                    "online": reader_data.get("status") == "ONLINE",
-                    "status": reader_data.get("status")
-                }
-                
-            except Exception as e:
-                return {
-                    "reader_id": reader_id,
-                    "online": False,
-                    "error": str(e)
-                }
+        try:
+            response = await sumup_request(
+                "GET",
+                f"{self.api_base_url}/merchants/{self.merchant_code}/readers/{reader_id}",
+                headers=self.headers,
+                deadline=settings.SUMUP_DEADLINE_READER_SECONDS,
+                idempotent=True,
+                priority=PRIORITY_READER,
+            )
+            response.raise_for_status()
+            reader_data = response.json()
+            
+            return {
+                "reader_id": reader_id,
+                "name": reader_data.get("name"),
+                "online": reader_data.get("status") == "ONLINE",
+                "status": reader_data.get("status")
+            }
+            
+        except Exception as e:
+            return {
+                "reader_id": reader_id,
+                "online": False,
+                "error": str(e)
+            }
     
     async def list_readers(self) -> list:
         """
@@ -565,14 +1099,93 @@ class SumUpService:
         Returns:
             List von Reader-Dicts
         """
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            try:
-                response = await client.get(
-                    f"{self.api_base_url}/merchants/{self.merchant_code}/readers",
-                    headers=self.headers
-                )
-                response.raise_for_status()
-                return response.json()
-                
-            except Exception as e:
-                raise Exception(f"List Readers Failed: {str(e)}")
+        try:
+            response = await sumup_request(
+                "GET",
+                f"{self.api_base_url}/merchants/{self.merchant_code}/readers",
+                headers=self.headers,
+                deadline=settings.SUMUP_DEADLINE_READER_SECONDS,
+                idempotent=True,
+                priority=PRIORITY_READER,
+            )
+            response.raise_for_status()
+            return response.json()
+            
+        except Exception as e:
+            raise Exception(f"List Readers Failed: {str(e)}")
+
+
+# ==========================================
+# HINTERGRUND-TASKS
+# ==========================================
+
+async def _poll_checkout_task(
+    db: AsyncSession, checkout_id: str, transaction_id: int, payment_method: str = "cloud_api"
+) -> None:
+    await SumUpService(db).poll_checkout_status(
+        checkout_id=checkout_id, transaction_id=transaction_id, payment_method=payment_method
+    )
+
+
+def _pending_checkouts(profile: PollProfile):
+    """
+    Offene SumUp-Zahlungen eines Profils (z.B. nach Neustart) - Polling
+    wieder aufnehmen
+
+    Nur junge Zahlungen; ältere erledigt der Sweeper ("sumup_sweep").
+    """
+    # Alles außer Payment Link (auch NULL) pollt wie bisher als Terminal
+    if profile.name == "payment_link":
+        of_profile = Transaction.payment_method == PaymentMethod.SUMUP_PAYMENT_LINK
+    else:
+        of_profile = Transaction.payment_method.is_distinct_from(PaymentMethod.SUMUP_PAYMENT_LINK)
+
+    async def recover(db: AsyncSession) -> List[Tuple[str, Dict[str, Any]]]:
+        result = await db.execute(
+            select(Transaction.id, Transaction.sumup_checkout_id)
+            .where(
+                Transaction.status == TransactionStatus.pending,
+                Transaction.sumup_checkout_id.is_not(None),
+                of_profile,
+                ~_older_than_poll_profile(),
+            )
+        )
+        return [
+            (
+                row.sumup_checkout_id,
+                {
+                    "checkout_id": row.sumup_checkout_id,
+                    "transaction_id": row.id,
+                    "payment_method": profile.name,
+                },
+            )
+            for row in result.all()
+        ]
+
+    return recover
+
+
+for _profile in POLL_PROFILES.values():
+    task_manager.register(
+        _profile.task,
+        _poll_checkout_task,
+        concurrency=_profile.concurrency,
+        recover=_pending_checkouts(_profile),
+    )
+
+
+async def _sweep_task(db: AsyncSession) -> None:
+    await SumUpService(db).sweep_stale_pending()
+
+
+async def _startup_sweep(db: AsyncSession) -> List[Tuple[str, Dict[str, Any]]]:
+    """Beim Start einmal fegen - Zahlungen, deren Poller mit dem alten Prozess starb"""
+    return [("sweep", {})]
+
+
+task_manager.register(
+    "sumup_sweep",
+    _sweep_task,
+    concurrency=1,
+    recover=_startup_sweep,
+)
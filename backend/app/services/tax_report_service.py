@@ -0,0 +1,244 @@
+"""
+Tax Report Service - MwSt-Auswertung und DATEV-Export (set-basiert)
+"""
+import csv
+from datetime import date, timedelta
+from io import StringIO
+from typing import AsyncIterator, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import Date, Float, Numeric, String, and_, case, cast, func, literal, null, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.money import euros_sql
+from app.models.guest_tab import GuestTab
+from app.models.products import Product
+from app.models.transaction import Transaction
+from app.services.daily_sales_service import local_day_start_utc, local_sales_date
+from app.services.partition_service import PartitionService
+
+DATEV_COLUMNS = [
+    "Umsatz (ohne Soll/Haben-Kz)",
+    "Soll/Haben-Kennzeichen",
+    "WKZ Umsatz",
+    "Konto",
+    "Gegenkonto (ohne BU-Schlüssel)",
+    "BU-Schlüssel",
+    "Belegdatum",
+    "Belegfeld 1",
+    "Buchungstext",
+]
+
+# Zeilen pro Fetch beim Streamen (Server-seitiger Cursor)
+DATEV_BATCH_SIZE = 2000
+
+
+def _local_time(column):
+    # created_at ist naive UTC
+    return func.timezone(settings.TIMEZONE, func.timezone("UTC", column))
+
+
+def period_filter(date_from: Optional[date], date_to: Optional[date]) -> list:
+    """Transaction.created_at-Bedingungen für lokale Kalendertage [date_from, date_to]"""
+    where = []
+    if date_from is not None:
+        where.append(Transaction.created_at >= local_day_start_utc(date_from))
+    if date_to is not None:
+        where.append(Transaction.created_at < local_day_start_utc(date_to + timedelta(days=1)))
+    return where
+
+
+def taxable_lines(*where):
+    """
+    Verkaufszeilen mit MwSt-Satz (transaction_id, tax_rate, gross, created_at)
+
+    - Gast-Tabs: Satz des Produkts, Zeitpunkt = Abschluss-Transaktion des Tabs
+    - Mitglieder-Käufe vom Guthaben: Betrag ohne Produkt, 0% bei
+      MEMBER_TAX_EXEMPT, sonst Satz unbekannt (NULL)
+
+    Args:
+        *where: Zusätzliche Bedingungen auf Transaction (z.B. Zeitraum)
+    """
+    purchase = and_(
+        Transaction.transaction_type == "purchase",
+        Transaction.status == "successful",
+        *where,
+    )
+    member_rate = literal(0.0, Float) if settings.MEMBER_TAX_EXEMPT else null().cast(Float)
+
+    guest_lines = (
+        select(
+            Transaction.id.label("transaction_id"),
+            Product.tax_rate.label("tax_rate"),
+            GuestTab.total_amount.label("gross"),
+            Transaction.created_at.label("created_at"),
+        )
+        .select_from(GuestTab)
+        .join(Transaction, and_(Transaction.guest_id == GuestTab.guest_id, purchase))
+        .join(Product, Product.id == GuestTab.product_id)
+        .where(GuestTab.paid == True)
+    )
+    member_lines = (
+        select(
+            Transaction.id.label("transaction_id"),
+            member_rate.label("tax_rate"),
+            Transaction.amount.label("gross"),
+            Transaction.created_at.label("created_at"),
+        )
+        .where(purchase, Transaction.user_id.is_not(None), Transaction.guest_id.is_(None))
+    )
+    return union_all(guest_lines, member_lines).subquery("taxable_lines")
+
+
+def _revenue_account(tax_rate):
+    percent = func.round(cast(tax_rate * 100, Numeric))
+    return case(
+        (percent == 19, settings.DATEV_ACCOUNT_REVENUE_19),
+        (percent == 7, settings.DATEV_ACCOUNT_REVENUE_7),
+        else_=settings.DATEV_ACCOUNT_REVENUE_TAX_FREE,
+    )
+
+
+def _payment_account(payment_method):
+    return case(
+        (payment_method == "balance", settings.DATEV_ACCOUNT_MEMBER_BALANCE),
+        (payment_method.in_(["cloud_api", "payment_link"]), settings.DATEV_ACCOUNT_SUMUP),
+        else_=settings.DATEV_ACCOUNT_CASH,
+    )
+
+
+class TaxReportService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def ensure_not_archived(self, date_from: Optional[date]) -> None:
+        """
+        409, wenn der Zeitraum in archivierte Monate reicht
+
+        Archivierte Monate liegen nicht mehr in transactions, ihre Gast-Tabs
+        sind gelöscht - die Auswertung wäre stillschweigend unvollständig.
+
+        Args:
+            date_from: Erster Tag (lokal, None = gesamte Historie)
+        """
+        archived_until = await PartitionService(self.db).archived_until()
+        if archived_until is None:
+            return
+        first_complete_day = local_sales_date(archived_until) + timedelta(days=1)
+        if date_from is None or date_from < first_complete_day:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=(
+                    f"Zeitraum reicht in archivierte Monate - Auswertung erst ab "
+                    f"{first_complete_day.strftime('%d.%m.%Y')} möglich (Partition vorher wiederherstellen)"
+                )
+            )
+
+    async def tax_breakdown(
+        self,
+        date_from: Optional[date],
+        date_to: Optional[date],
+        period: str = "month",
+    ) -> List[dict]:
+        """
+        Netto/MwSt/Brutto je Zeitraum und Steuersatz in EINER Abfrage
+
+        Args:
+            date_from: Erster Tag (lokal)
+            date_to: Letzter Tag (lokal)
+            period: day, month, quarter oder year
+
+        Returns:
+            List[dict]: Zeilen sortiert nach Zeitraum, Steuersatz
+        """
+        await self.ensure_not_archived(date_from)
+        lines = taxable_lines(*period_filter(date_from, date_to))
+        period_start = cast(func.date_trunc(period, _local_time(lines.c.created_at)), Date).label("period_start")
+        gross = func.sum(lines.c.gross)
+        net = func.sum(lines.c.gross / (1 + lines.c.tax_rate))
+
+        result = await self.db.execute(
+            select(
+                period_start,
+                lines.c.tax_rate,
+                func.count().label("line_count"),
+                euros_sql(net).label("net"),
+                euros_sql(gross - net).label("tax"),
+                euros_sql(gross).label("gross"),
+            )
+            .group_by(period_start, lines.c.tax_rate)
+            .order_by(period_start, lines.c.tax_rate)
+        )
+        return [dict(row._mapping) for row in result.all()]
+
+    async def datev_csv(self, date_from: Optional[date], date_to: Optional[date]) -> AsyncIterator[bytes]:
+        """
+        DATEV-Buchungsstapel (CSV, Semikolon, cp1252) als Stream
+
+        Eine Buchung je Transaktion und Steuersatz (Verkäufe) bzw. je
+        Aufladung. Die Zeilen kommen über einen Server-seitigen Cursor in
+        Batches - der Speicherbedarf hängt nicht vom Zeitraum ab.
+        Archivierte Monate: vorher ensure_not_archived (vor dem Response-Start).
+        """
+        await self.ensure_not_archived(date_from)
+        where = period_filter(date_from, date_to)
+        lines = taxable_lines(*where)
+
+        sales = (
+            select(
+                lines.c.transaction_id,
+                lines.c.created_at,
+                lines.c.tax_rate,
+                func.sum(lines.c.gross).label("amount"),
+            )
+            .group_by(lines.c.transaction_id, lines.c.created_at, lines.c.tax_rate)
+            .subquery("sales")
+        )
+        # Buchung im DATEV-Spaltenformat direkt aus SQL (Dezimalkomma, TTMM)
+        def booking(amount, counter_account):
+            return (
+                func.replace(cast(euros_sql(amount), String), ".", ","),
+                literal("S"),
+                literal(settings.DEFAULT_CURRENCY),
+                _payment_account(Transaction.payment_method),
+                counter_account,
+                literal(""),
+                func.to_char(_local_time(Transaction.created_at), "DDMM"),
+                func.left(func.coalesce(Transaction.transaction_reference, ""), 36),
+                func.left(func.coalesce(Transaction.description, Transaction.transaction_type), 60),
+                Transaction.created_at.label("sort_at"),
+                Transaction.id.label("sort_id"),
+            )
+
+        sale_bookings = (
+            select(*booking(sales.c.amount, _revenue_account(sales.c.tax_rate)))
+            .join(sales, sales.c.transaction_id == Transaction.id)
+        )
+        # Guthaben-Aufladung: Geld an Verbindlichkeit Mitglieder
+        top_up_bookings = (
+            select(*booking(Transaction.amount, literal(settings.DATEV_ACCOUNT_MEMBER_BALANCE)))
+            .where(Transaction.transaction_type == "top_up", Transaction.status == "successful", *where)
+        )
+        bookings = union_all(sale_bookings, top_up_bookings).subquery("bookings")
+
+        # Core-Result statt ORM-Loading, Zeilen gehen unverändert an csv.writer
+        connection = await self.db.connection()
+        result = await connection.stream(
+            select(*list(bookings.c)[:len(DATEV_COLUMNS)])
+            .order_by(bookings.c.sort_at, bookings.c.sort_id)
+            .execution_options(yield_per=DATEV_BATCH_SIZE)
+        )
+
+        buffer = StringIO()
+        writer = csv.writer(buffer, delimiter=";", quoting=csv.QUOTE_MINIMAL, lineterminator="\r\n")
+        writer.writerow(DATEV_COLUMNS)
+
+        async for partition in result.partitions():
+            writer.writerows(partition)
+            yield buffer.getvalue().encode("cp1252", errors="replace")
+            buffer.seek(0)
+            buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue().encode("cp1252", errors="replace")
@@ -0,0 +1,70 @@
+"""
+Benchmark: RFID-Login über In-Process Index vs. DB-Lookup
+
+Aufruf (aus backend/, DB muss laufen):
+    python -m benchmarks.bench_rfid_login [iterations]
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+import app.db.base  # noqa: F401 - registriert alle Models
+from app.db.session import AsyncSessionLocal
+from app.services.auth_service import AuthService
+from app.services.rfid_index import rfid_index_watcher, rfid_token_index
+
+
+def _report(label: str, samples: list[float]) -> None:
+    samples_us = sorted(s * 1_000_000 for s in samples)
+    p99 = samples_us[int(len(samples_us) * 0.99) - 1]
+    print(
+        f"{label:<12} n={len(samples_us):>6}  "
+        f"mean={statistics.mean(samples_us):>10.1f}µs  "
+        f"p50={statistics.median(samples_us):>10.1f}µs  "
+        f"p99={p99:>10.1f}µs"
+    )
+
+
+async def main(iterations: int) -> None:
+    # Index ist nur mit LISTEN-Verbindung aktiv
+    await rfid_index_watcher.start()
+    count = len(rfid_token_index._entries)
+    if not count:
+        print("Keine User mit RFID-Token in der DB (oder kein LISTEN) - Benchmark abgebrochen")
+        await rfid_index_watcher.stop()
+        return
+
+    async with AsyncSessionLocal() as db:
+        tokens = list(rfid_token_index._entries.keys())
+        auth_service = AuthService(db)
+
+        db_samples = []
+        for i in range(iterations):
+            token = tokens[i % len(tokens)]
+            start = time.perf_counter()
+            try:
+                await auth_service.authenticate_rfid(token)
+            except Exception:
+                pass
+            db_samples.append(time.perf_counter() - start)
+
+        index_samples = []
+        for i in range(iterations):
+            token = tokens[i % len(tokens)]
+            start = time.perf_counter()
+            try:
+                await auth_service.resolve_rfid(token)
+            except Exception:
+                pass
+            index_samples.append(time.perf_counter() - start)
+
+    await rfid_index_watcher.stop()
+    print(f"{count} RFID-Tokens im Index")
+    _report("DB-Lookup", db_samples)
+    _report("Index", index_samples)
+    print(f"Speedup (p50): {statistics.median(db_samples) / statistics.median(index_samples):.0f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000))
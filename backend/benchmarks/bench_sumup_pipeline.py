@@ -0,0 +1,121 @@
+"""
+Benchmark: SumUp-Zahlungspipeline gegen den lokalen Simulator
+
+Legt N Aufladungen über POST /api/v1/sumup/topup an (cloud_api oder
+payment_link, admin) und wartet, bis Polling bzw. Sweeper alle
+abgeschlossen haben. Gemessen werden Anlage-Latenz, Zeit bis zum
+Endstatus und API-Aufrufe je Zahlung (aus GET /_sim/stats), dazu die
+Polling-Metrik im Vergleich zum früheren festen Takt. Die Aufladungen
+werden dem admin gutgeschrieben.
+
+Aufruf (aus backend/, DB muss laufen):
+    uvicorn simulators.sumup_api:app --port 8090 &
+    SUMUP_API_BASE_URL=http://localhost:8090 python -m benchmarks.bench_sumup_pipeline [payments] [concurrency] [method]
+"""
+import asyncio
+import sys
+import time
+
+import httpx
+from sqlalchemy import func, select
+
+from app.main import app
+from app.core.config import settings
+from app.core.tasks import task_manager
+from app.db.session import AsyncSessionLocal
+from app.models.transaction import Transaction
+from app.services.sumup_service import poll_metrics
+
+
+def _percentiles(label: str, samples: list[float]) -> None:
+    samples = sorted(samples)
+    if not samples:
+        print(f"{label:<22} keine Werte")
+        return
+    p50 = samples[len(samples) // 2]
+    p99 = samples[max(int(len(samples) * 0.99) - 1, 0)]
+    print(f"{label:<22} p50={p50 * 1000:>9.1f}ms  p99={p99 * 1000:>9.1f}ms  max={samples[-1] * 1000:>9.1f}ms")
+
+
+async def main(payments: int, concurrency: int, method: str) -> None:
+    if "api.sumup.com" in settings.SUMUP_API_BASE_URL:
+        print("SUMUP_API_BASE_URL zeigt auf die echte SumUp API - bitte auf den Simulator setzen")
+        return
+    if not settings.SUMUP_READER_ID:
+        settings.SUMUP_READER_ID = "rdr_SIMULATOR"
+
+    async with httpx.AsyncClient(base_url=settings.SUMUP_API_BASE_URL) as simulator:
+        await simulator.post("/_sim/reset")
+
+        # Ohne Startup-Event: Poll-Tasks selbst annehmen
+        await task_manager.start()
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app, raise_app_exceptions=False), base_url="http://bench") as client:
+            response = await client.post("/api/v1/auth/login", json={"username": "admin", "password": "admin123"})
+            client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+            semaphore = asyncio.Semaphore(concurrency)
+            create_samples: list[float] = []
+            transaction_ids: list[int] = []
+            create_errors = 0
+
+            async def create_topup() -> None:
+                nonlocal create_errors
+                async with semaphore:
+                    started = time.perf_counter()
+                    response = await client.post("/api/v1/sumup/topup", json={"amount": 1.0, "payment_method": method})
+                    if response.status_code != 200:
+                        create_errors += 1
+                        return
+                    create_samples.append(time.perf_counter() - started)
+                    transaction_ids.append(response.json()["transaction_id"])
+
+            started = time.perf_counter()
+            await asyncio.gather(*(create_topup() for _ in range(payments)))
+            created = time.perf_counter() - started
+
+            while True:
+                async with AsyncSessionLocal() as db:
+                    pending = (await db.execute(
+                        select(func.count()).where(Transaction.id.in_(transaction_ids), Transaction.status == "pending")
+                    )).scalar()
+                if not pending:
+                    break
+                await asyncio.sleep(0.5)
+            total = time.perf_counter() - started
+
+        await task_manager.stop()
+        stats = (await simulator.get("/_sim/stats")).json()
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Transaction.status, Transaction.created_at, Transaction.completed_at)
+            .where(Transaction.id.in_(transaction_ids))
+        )
+        rows = result.all()
+
+    statuses: dict[str, int] = {}
+    for row in rows:
+        statuses[row.status] = statuses.get(row.status, 0) + 1
+    settle_samples = [(row.completed_at - row.created_at).total_seconds() for row in rows if row.completed_at]
+    api_calls = sum(stats["requests"].values())
+
+    print(f"Zahlungen: {payments} ({method})  Parallel: {concurrency}  Status: {statuses}  Anlage fehlgeschlagen: {create_errors}")
+    print(f"Anlage: {created:.2f}s ({payments / created:.1f}/s)  Gesamt bis Endstatus: {total:.2f}s")
+    _percentiles("Anlage-Latenz", create_samples)
+    _percentiles("Bis Endstatus", settle_samples)
+    print(f"API-Aufrufe: {api_calls} ({api_calls / payments:.1f} je Zahlung)  injizierte Fehler: {sum(stats['injected_errors'].values())}")
+    for name, count in sorted(stats["requests"].items()):
+        print(f"  {name:<40}{count:>8}")
+    polling = poll_metrics.stats()[method]
+    print(
+        f"Status-Abfragen je Zahlung: {polling['calls_per_payment']}  "
+        f"fester Takt ({settings.SUMUP_POLLING_INTERVAL}s): {polling['fixed_interval_calls_per_payment']}  "
+        f"Einsparung: {polling['reduction_percent']}%"
+    )
+
+
+if __name__ == "__main__":
+    payments = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    method = sys.argv[3] if len(sys.argv) > 3 else "cloud_api"
+    asyncio.run(main(payments, concurrency, method))
@@ -0,0 +1,183 @@
+"""
+Benchmark: DB-Roundtrips pro Write-Endpoint
+
+Vergleicht das frühere Muster (ORM-Objekt ändern/anlegen, commit(), refresh())
+mit den aktuellen Endpoints (INSERT/UPDATE ... RETURNING, app/db/writes.py).
+Gezählt werden SQL-Statements plus BEGIN/COMMIT/ROLLBACK.
+
+Aufruf (aus backend/, DB mit init_db-Daten muss laufen):
+    python -m benchmarks.bench_write_roundtrips
+"""
+import asyncio
+from datetime import datetime
+from uuid import uuid4
+
+import httpx
+from sqlalchemy import event, select
+
+from app.main import app
+from app.db.session import AsyncSessionLocal, engine
+from app.models.guest import Guest
+from app.models.products import Product, ProductCategory
+from app.models.transaction import Transaction
+from app.models.user import User
+
+
+class RoundTripCounter:
+    def __init__(self):
+        self.count = 0
+        sync_engine = engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", self._on_statement)
+        for name in ("begin", "commit", "rollback"):
+            event.listen(sync_engine, name, self._on_tx)
+
+    def _on_statement(self, *args):
+        self.count += 1
+
+    def _on_tx(self, *args):
+        self.count += 1
+
+
+counter = RoundTripCounter()
+
+
+async def measure(coro_factory) -> int:
+    start = counter.count
+    await coro_factory()
+    return counter.count - start
+
+
+# ==========================================
+# LEGACY: add()/Attribut-Änderung + commit() + refresh()
+# ==========================================
+
+async def legacy_create_transaction():
+    async with AsyncSessionLocal() as db:
+        user = (await db.execute(select(User).where(User.username == "admin"))).scalar_one()
+        user.balance -= 1.0
+        txn = Transaction(
+            transaction_reference=f"BENCH-{uuid4().hex[:12]}", user_id=user.id,
+            transaction_type="purchase", amount=1.0, payment_method="balance",
+            status="successful", created_at=datetime.utcnow(),
+        )
+        db.add(txn)
+        await db.commit()
+        await db.refresh(txn)
+
+
+async def legacy_top_up():
+    async with AsyncSessionLocal() as db:
+        user = (await db.execute(select(User).where(User.username == "admin"))).scalar_one()
+        txn = Transaction(
+            transaction_reference=f"BENCH-{uuid4().hex[:12]}", user_id=user.id,
+            transaction_type="top_up", amount=1.0, payment_method="cash",
+            status="successful", created_at=datetime.utcnow(),
+        )
+        user.balance += 1.0
+        db.add(txn)
+        await db.commit()
+        await db.refresh(txn)
+
+
+async def legacy_create_user():
+    async with AsyncSessionLocal() as db:
+        await db.execute(select(User).where(User.username == "admin"))
+        suffix = uuid4().hex[:8]
+        for column, value in ((User.username, f"b{suffix}"), (User.email, f"b{suffix}@example.com")):
+            await db.execute(select(User).where(column == value))
+        user = User(
+            username=f"b{suffix}", email=f"b{suffix}@example.com", first_name="B",
+            last_name="B", hashed_password="x", balance=0.0, is_active=True,
+            created_at=datetime.utcnow(),
+        )
+        db.add(user)
+        await db.commit()
+        await db.refresh(user)
+
+
+async def legacy_create_product():
+    async with AsyncSessionLocal() as db:
+        await db.execute(select(User).where(User.username == "admin"))
+        product = Product(
+            name="Bench", category=ProductCategory.OTHER, member_price=1.0,
+            guest_price=1.0, tax_rate=0.19, is_available=False, sort_order=0,
+        )
+        db.add(product)
+        await db.commit()
+        await db.refresh(product)
+
+
+async def legacy_create_guest():
+    async with AsyncSessionLocal() as db:
+        guest = Guest(name="Bench", total_amount=0.0)
+        db.add(guest)
+        await db.commit()
+        await db.refresh(guest)
+        return guest.id
+
+
+async def legacy_update_guest(guest_id: int):
+    async with AsyncSessionLocal() as db:
+        guest = (await db.execute(select(Guest).where(Guest.id == guest_id))).scalar_one()
+        guest.name = f"Bench {uuid4().hex[:4]}"
+        await db.commit()
+        await db.refresh(guest)
+
+
+async def legacy_adjust_balance(user_id: int):
+    async with AsyncSessionLocal() as db:
+        await db.execute(select(User).where(User.username == "admin"))
+        user = (await db.execute(select(User).where(User.id == user_id))).scalar_one()
+        old_balance = user.balance
+        user.balance = old_balance + 1.0
+        user.updated_at = datetime.utcnow()
+        db.add(Transaction(
+            transaction_reference=f"BENCH-{uuid4().hex[:12]}", user_id=user_id,
+            transaction_type="admin_adjustment", amount=1.0, status="successful",
+            balance_before=old_balance, balance_after=user.balance,
+            created_at=datetime.utcnow(),
+        ))
+        await db.commit()
+        await db.refresh(user)
+
+
+async def main() -> None:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        response = await client.post("/api/v1/auth/login", json={"username": "admin", "password": "admin123"})
+        client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+        admin = (await client.get("/api/v1/members/me")).json()
+
+        # Legacy-Guest für update_guest anlegen
+        guest_id = await legacy_create_guest()
+
+        async def api(method: str, url: str, **kwargs):
+            response = await client.request(method, url, **kwargs)
+            response.raise_for_status()
+
+        suffix = uuid4().hex[:8]
+        cases = [
+            ("create_transaction", legacy_create_transaction,
+             lambda: api("POST", "/api/v1/transactions/", json={"amount": 1.0, "transaction_type": "purchase", "payment_method": "balance"})),
+            ("top_up_balance", legacy_top_up,
+             lambda: api("POST", "/api/v1/transactions/top-up", json={"amount": 1.0, "payment_method": "cash"})),
+            ("create_user", legacy_create_user,
+             lambda: api("POST", "/api/v1/users/", json={"username": f"n{suffix}", "email": f"n{suffix}@example.com", "first_name": "N", "last_name": "N", "password": "secret123"})),
+            ("create_product", legacy_create_product,
+             lambda: api("POST", "/api/v1/products/", json={"name": "Bench", "category": "other", "member_price": 1.0, "guest_price": 1.0, "is_available": False})),
+            ("create_guest", legacy_create_guest,
+             lambda: api("POST", "/api/v1/guests/", json={"name": "Bench"})),
+            ("update_guest", lambda: legacy_update_guest(guest_id),
+             lambda: api("PUT", f"/api/v1/guests/{guest_id}", json={"name": "Bench 2"})),
+            ("adjust_user_balance", lambda: legacy_adjust_balance(admin["id"]),
+             lambda: api("POST", f"/api/v1/users/{admin['id']}/adjust-balance", json={"amount": 1.0, "description": "Benchmark"})),
+        ]
+
+        print(f"{'Endpoint':<22}{'legacy':>8}{'RETURNING':>11}{'gespart':>9}")
+        for name, legacy, current in cases:
+            legacy_trips = await measure(legacy)
+            current_trips = await measure(current)
+            print(f"{name:<22}{legacy_trips:>8}{current_trips:>11}{legacy_trips - current_trips:>9}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
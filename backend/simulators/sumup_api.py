@@ -0,0 +1,319 @@
+"""
+Vereinskasse - SumUp API Simulator
+Datei: backend/simulators/sumup_api.py
+
+Lokaler Ersatz für die SumUp API (Entwicklung, Tests, Lasttests). Bildet
+die Endpoints nach, die app/services/sumup_service.py aufruft:
+
+    POST /checkouts                          Checkout anlegen (Cloud API, Payment Link)
+    GET  /checkouts/{id}                     Status (PENDING -> PAID/FAILED)
+    POST /merchants/{code}/readers           Terminal pairen
+    GET  /merchants/{code}/readers           Terminals auflisten
+    GET  /merchants/{code}/readers/{id}      Terminal-Status
+    GET  /me                                 Händlerprofil (Health-Check)
+
+Verhalten über Umgebungsvariablen SUMUP_SIM_* (siehe SimulatorSettings)
+oder zur Laufzeit über PUT /_sim/config:
+
+- Latenz (latency_ms + zufällig bis jitter_ms) je Request
+- error_rate: Anteil Requests mit 503 (Retries, Circuit Breaker testen)
+- Statusübergang: PENDING bis pay_after_seconds, dann PAID bzw. FAILED
+  mit decline_rate; abandon_rate bleibt für immer PENDING (Timeout, Sweeper)
+- Webhook: bei Endstatus POST {"event_type": "CHECKOUT_STATUS_CHANGED", "id": ...}
+  an return_url des Checkouts bzw. webhook_url
+
+Zustand liegt nur im Speicher. Start (aus backend/):
+
+    uvicorn simulators.sumup_api:app --port 8090
+
+und im Backend SUMUP_API_BASE_URL=http://localhost:8090 setzen.
+GET /_sim/stats zählt Requests je Endpoint und Checkouts je Status.
+"""
+
+import asyncio
+import logging
+import random
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import httpx
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from starlette.routing import Match
+
+logger = logging.getLogger("sumup_simulator")
+
+
+class SimulatorSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="SUMUP_SIM_")
+
+    latency_ms: float = 50.0
+    jitter_ms: float = 50.0
+    error_rate: float = 0.0
+    pay_after_seconds: float = 5.0
+    decline_rate: float = 0.05
+    abandon_rate: float = 0.0
+    webhook_url: Optional[str] = None
+    seed: Optional[int] = None
+
+
+class ConfigUpdate(BaseModel):
+    latency_ms: Optional[float] = None
+    jitter_ms: Optional[float] = None
+    error_rate: Optional[float] = None
+    pay_after_seconds: Optional[float] = None
+    decline_rate: Optional[float] = None
+    abandon_rate: Optional[float] = None
+    webhook_url: Optional[str] = None
+
+
+class StatusOverride(BaseModel):
+    status: str  # PAID, FAILED, PENDING
+
+
+class Checkout:
+    """
+    Simulierter Checkout - der Endstatus wird beim Anlegen ausgewürfelt
+    und ab pay_after_seconds sichtbar
+    """
+
+    def __init__(self, payload: Dict[str, Any], config: SimulatorSettings, rng: random.Random):
+        self.id = str(uuid.uuid4())
+        self.payload = payload
+        self.created_at = datetime.utcnow()
+        self.created = time.monotonic()
+        self.settle_after = config.pay_after_seconds
+
+        roll = rng.random()
+        if roll < config.abandon_rate:
+            self.outcome = "PENDING"
+        elif roll < config.abandon_rate + config.decline_rate:
+            self.outcome = "FAILED"
+        else:
+            self.outcome = "PAID"
+        self.forced: Optional[str] = None
+        self.transaction_code = f"T{uuid.uuid4().hex[:10].upper()}"
+        self.notified = False
+
+    @property
+    def status(self) -> str:
+        if self.forced is not None:
+            return self.forced
+        if time.monotonic() - self.created < self.settle_after:
+            return "PENDING"
+        return self.outcome
+
+    def to_dict(self) -> Dict[str, Any]:
+        status = self.status
+        data = {
+            "id": self.id,
+            "checkout_reference": self.payload.get("checkout_reference"),
+            "amount": self.payload.get("amount"),
+            "currency": self.payload.get("currency"),
+            "merchant_code": self.payload.get("merchant_code"),
+            "description": self.payload.get("description"),
+            "status": status,
+            "date": self.created_at.isoformat(),
+        }
+        if status == "PAID":
+            data["transaction_code"] = self.transaction_code
+            data["transactions"] = [{
+                "transaction_code": self.transaction_code,
+                "amount": self.payload.get("amount"),
+                "currency": self.payload.get("currency"),
+                "status": "SUCCESSFUL",
+            }]
+        return data
+
+
+class Simulator:
+    def __init__(self, config: SimulatorSettings):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.reset()
+
+    def reset(self) -> None:
+        self.checkouts: Dict[str, Checkout] = {}
+        self.references: Dict[str, str] = {}
+        self.readers: Dict[str, Dict[str, Any]] = {}
+        self.requests: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.webhooks_sent = 0
+        self.webhooks_failed = 0
+        self.pending_webhooks: set = set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "config": self.config.model_dump(),
+            "requests": dict(self.requests),
+            "injected_errors": dict(self.errors),
+            "checkouts": dict(Counter(checkout.status for checkout in self.checkouts.values())),
+            "readers": len(self.readers),
+            "webhooks_sent": self.webhooks_sent,
+            "webhooks_failed": self.webhooks_failed,
+        }
+
+
+simulator = Simulator(SimulatorSettings())
+app = FastAPI(title="SumUp API Simulator")
+
+
+def _route_name(request: Request) -> str:
+    """Endpoint als Pfad-Template (ohne IDs) für die Statistik"""
+    for route in app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return f"{request.method} {route.path}"
+    return f"{request.method} {request.url.path}"
+
+
+@app.middleware("http")
+async def simulate_network(request: Request, call_next):
+    """Latenz und Fehlerquote für alle API-Endpoints (nicht /_sim)"""
+    if request.url.path.startswith("/_sim"):
+        return await call_next(request)
+
+    if not request.headers.get("authorization", "").startswith("Bearer "):
+        return JSONResponse(status_code=401, content={"error_code": "NOT_AUTHORIZED", "message": "Missing bearer token"})
+
+    config = simulator.config
+    delay = config.latency_ms + simulator.rng.random() * config.jitter_ms
+    if delay > 0:
+        await asyncio.sleep(delay / 1000)
+
+    if simulator.rng.random() < config.error_rate:
+        response = JSONResponse(
+            status_code=503,
+            content={"error_code": "SERVICE_UNAVAILABLE", "message": "Simulated outage"},
+        )
+    else:
+        response = await call_next(request)
+
+    name = _route_name(request)
+    simulator.requests[name] += 1
+    if response.status_code == 503:
+        simulator.errors[name] += 1
+    return response
+
+
+def _checkout(checkout_id: str) -> Checkout:
+    checkout = simulator.checkouts.get(checkout_id)
+    if checkout is None:
+        raise HTTPException(status_code=404, detail={"error_code": "NOT_FOUND", "message": "Resource not found"})
+    return checkout
+
+
+async def _notify(checkout: Checkout) -> None:
+    """Webhook einmalig, sobald der Checkout einen Endstatus hat"""
+    url = checkout.payload.get("return_url") or simulator.config.webhook_url
+    if not url or checkout.notified or checkout.status == "PENDING":
+        return
+    checkout.notified = True
+    try:
+        async with httpx.AsyncClient(timeout=5.0) as client:
+            response = await client.post(url, json={"event_type": "CHECKOUT_STATUS_CHANGED", "id": checkout.id})
+            response.raise_for_status()
+        simulator.webhooks_sent += 1
+    except Exception as e:
+        simulator.webhooks_failed += 1
+        logger.warning(f"Webhook {url} fehlgeschlagen: {e}")
+
+
+async def _settle_later(checkout: Checkout) -> None:
+    await asyncio.sleep(checkout.settle_after)
+    await _notify(checkout)
+
+
+@app.post("/checkouts")
+async def create_checkout(payload: Dict[str, Any]):
+    reference = payload.get("checkout_reference")
+    if not reference or payload.get("amount") is None:
+        raise HTTPException(status_code=400, detail={"error_code": "INVALID", "message": "Validation error"})
+    if reference in simulator.references:
+        raise HTTPException(status_code=409, detail={"error_code": "DUPLICATED_CHECKOUT", "message": "Checkout already exists"})
+
+    checkout = Checkout(payload, simulator.config, simulator.rng)
+    simulator.checkouts[checkout.id] = checkout
+    simulator.references[reference] = checkout.id
+    if checkout.outcome != "PENDING" and (payload.get("return_url") or simulator.config.webhook_url):
+        task = asyncio.create_task(_settle_later(checkout))
+        simulator.pending_webhooks.add(task)
+        task.add_done_callback(simulator.pending_webhooks.discard)
+    return checkout.to_dict()
+
+
+@app.get("/checkouts/{checkout_id}")
+async def get_checkout(checkout_id: str):
+    checkout = _checkout(checkout_id)
+    return checkout.to_dict()
+
+
+@app.get("/me")
+async def get_merchant_profile():
+    return {"merchant_profile": {"merchant_code": "SIMULATOR", "company_name": "SumUp Simulator"}}
+
+
+@app.post("/merchants/{merchant_code}/readers")
+async def pair_reader(merchant_code: str, payload: Dict[str, Any]):
+    if len(str(payload.get("pairing_code", ""))) < 8:
+        raise HTTPException(status_code=422, detail={"error_code": "INVALID_PAIRING_CODE", "message": "Invalid pairing code"})
+    reader_id = f"rdr_{uuid.uuid4().hex[:20].upper()}"
+    now = datetime.utcnow().isoformat()
+    simulator.readers[reader_id] = {
+        "id": reader_id,
+        "name": payload.get("name"),
+        "status": "ONLINE",
+        "device": {"identifier": payload.get("pairing_code"), "model": "solo"},
+        "created_at": now,
+        "updated_at": now,
+    }
+    return simulator.readers[reader_id]
+
+
+@app.get("/merchants/{merchant_code}/readers")
+async def list_readers(merchant_code: str):
+    return {"items": list(simulator.readers.values())}
+
+
+@app.get("/merchants/{merchant_code}/readers/{reader_id}")
+async def get_reader(merchant_code: str, reader_id: str):
+    reader = simulator.readers.get(reader_id)
+    if reader is None:
+        raise HTTPException(status_code=404, detail={"error_code": "NOT_FOUND", "message": "Reader not found"})
+    return reader
+
+
+# ==========================================
+# STEUERUNG
+# ==========================================
+
+@app.get("/_sim/stats")
+async def get_stats():
+    return simulator.stats()
+
+
+@app.put("/_sim/config")
+async def update_config(update: ConfigUpdate):
+    values = update.model_dump(exclude_unset=True)
+    simulator.config = simulator.config.model_copy(update=values)
+    return simulator.config.model_dump()
+
+
+@app.post("/_sim/reset")
+async def reset():
+    simulator.reset()
+    return simulator.stats()
+
+
+@app.put("/_sim/checkouts/{checkout_id}/status")
+async def force_status(checkout_id: str, override: StatusOverride):
+    """Status eines Checkouts festlegen (z.B. Zahlung am Terminal abbrechen)"""
+    checkout = _checkout(checkout_id)
+    checkout.forced = override.status
+    await _notify(checkout)
+    return checkout.to_dict()
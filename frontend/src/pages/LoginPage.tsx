@@ -48,7 +48,7 @@ export const LoginPage: React.FC = () => {
 
   // Search users with token
   useEffect(() => {
-    if (searchTerm.length < 2 || !searchToken) {
+    if (searchTerm.trim().length < 3 || !searchToken) {
       setFilteredUsers([])
       setShowDropdown(false)
       return